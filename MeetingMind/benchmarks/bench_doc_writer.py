@@ -0,0 +1,134 @@
+# Benchmark for Google Docs API usage while writing minutes.
+# Replays a simulated meeting's stream of details against an in-memory fake of the Docs API and reports
+# API calls per minute of meeting for the original per-detail writer (one documents().get, a scan of the
+# body and one batchUpdate per detail, kept here as baseline_append_detail so later changes to
+# append_detail_to_doc do not move the baseline) and the batched GoogleDocWriter.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_doc_writer
+import asyncio
+import json
+import os
+import random
+
+from src.services.doc_writer_service import FakeDocsService, GoogleDocWriter, paragraph_text
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_MINUTES = os.path.join(PROJECT_ROOT, "tests", "sample_data", "sample_minute_structure.json")
+
+MEETING_MINUTES = 30
+MEAN_SECONDS_BETWEEN_DETAILS = 8
+TIME_SCALE = 0.001  # Real seconds per meeting second
+
+
+def template_paragraphs(agenda):
+    """Render the agenda with the minutes template heading convention."""
+    paragraphs = ["Meeting Minutes\n"]
+
+    def add_subsections(subsections):
+        for subsection_id, subsection in subsections.items():
+            paragraphs.append(f"#### {subsection_id} {subsection['title']}\n")
+            add_subsections(subsection.get("subsections", {}))
+
+    for section_id, section in agenda.items():
+        paragraphs.append(f"### **{section_id}. {section['title']}**\n")
+        add_subsections(section.get("subsections", {}))
+    return paragraphs
+
+
+def leaf_section_ids(agenda):
+    ids = []
+    for section_id, section in agenda.items():
+        if section.get("subsections"):
+            ids.extend(section["subsections"])
+        else:
+            ids.append(f"{section_id}.")
+    return ids
+
+
+def detail_stream(section_ids):
+    """Yield (meeting second, section id, detail) for a meeting that moves through the agenda."""
+    rng = random.Random(0)
+    second = 0.0
+    count = 0
+    while True:
+        second += rng.expovariate(1 / MEAN_SECONDS_BETWEEN_DETAILS)
+        if second > MEETING_MINUTES * 60:
+            return
+        section_id = section_ids[min(len(section_ids) - 1, int(second / (MEETING_MINUTES * 60) * len(section_ids)))]
+        count += 1
+        yield second, section_id, f"Detail {count} recorded during the discussion."
+
+
+async def run_batched(agenda, flush_interval):
+    docs = FakeDocsService(template_paragraphs(agenda))
+    writer = GoogleDocWriter("doc", service=docs, flush_interval=flush_interval * TIME_SCALE)
+    writer.start()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for second, section_id, detail in detail_stream(leaf_section_ids(agenda)):
+        await asyncio.sleep(max(0, start + second * TIME_SCALE - loop.time()))
+        writer.append_detail(section_id, detail)
+    await writer.close()
+    return docs
+
+
+def baseline_append_detail(service, doc_id, section_id, detail):
+    """append_detail_to_doc as it was before batching: fetch the document, scan it, insert one bullet."""
+    document = service.documents().get(documentId=doc_id).execute()
+    if '.' in section_id and not section_id.endswith('.'):
+        pattern = f"#### {section_id} "
+    else:
+        pattern = f"### **{section_id.rstrip('.')}. "
+
+    found_section = False
+    insert_position = None
+    for element in document.get('body').get('content'):
+        text = paragraph_text(element)
+        if text is None:
+            continue
+        if not found_section:
+            if text.startswith(pattern):
+                found_section = True
+                insert_position = element.get('endIndex')
+            continue
+        if text.startswith("### **") or text.startswith("#### "):
+            break
+        if text.strip().startswith("- "):
+            insert_position = element.get('endIndex')
+
+    if insert_position:
+        requests = [{'insertText': {'location': {'index': insert_position}, 'text': f"- {detail}\n"}}]
+        service.documents().batchUpdate(documentId=doc_id, body={'requests': requests}).execute()
+        return True
+    return False
+
+
+def run_per_detail(agenda):
+    docs = FakeDocsService(template_paragraphs(agenda))
+    for _, section_id, detail in detail_stream(leaf_section_ids(agenda)):
+        baseline_append_detail(docs, "doc", section_id, detail)
+    return docs
+
+
+async def main():
+    with open(SAMPLE_MINUTES, 'r') as f:
+        agenda = json.load(f)["agenda"]
+    details = sum(1 for _ in detail_stream(leaf_section_ids(agenda)))
+    print(f"{MEETING_MINUTES}-minute meeting, {details} details")
+    print(f"{'writer':>22} {'get':>6} {'batchUpdate':>12} {'calls/min':>10}")
+
+    docs = run_per_detail(agenda)
+    total = sum(docs.calls.values())
+    print(f"{'per-detail baseline':>22} {docs.calls['get']:>6} {docs.calls['batchUpdate']:>12} "
+          f"{total / MEETING_MINUTES:>10.2f}")
+
+    for flush_interval in (2, 5, 10, 30):
+        docs = await run_batched(agenda, flush_interval)
+        total = sum(docs.calls.values())
+        print(f"{f'GoogleDocWriter {flush_interval}s':>22} {docs.calls['get']:>6} {docs.calls['batchUpdate']:>12} "
+              f"{total / MEETING_MINUTES:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
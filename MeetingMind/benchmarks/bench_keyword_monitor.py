@@ -0,0 +1,54 @@
+# Benchmark for the local keyword pre-filter.
+# Counts the LLM calls the keyword monitor avoids on the sample transcript (minutes updates, where
+# keyword-less lines are only skipped before the first topic or when they are filler, and listen-in
+# checks for one profile) and measures matching throughput in lines per second.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_keyword_monitor
+import json
+import os
+import time
+
+from src.agents.keyword_monitor import KeywordMonitor, is_filler
+
+PROFILE = "Adi"
+THROUGHPUT_LINES = 100_000
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(project_root, "tests", "sample_data", "sample_transcript.json")) as f:
+        messages = [line["message"] for line in json.load(f)["meeting"]["minutes"]]
+
+    start = time.perf_counter()
+    monitor = KeywordMonitor.from_files()
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Automaton: {len(monitor.goto)} nodes, built in {build_ms:.1f} ms")
+
+    signals = [monitor.scan(message) for message in messages]
+    matched = [signal for signal in signals if signal]
+    # A topic is taken to be active from the first matched line on (the agent needs an update for that)
+    updates = 0
+    topic_active = False
+    for message, signal in zip(messages, signals):
+        if signal or (topic_active and not is_filler(message)):
+            updates += 1
+        topic_active = topic_active or bool(signal)
+    # Listen-in checks only happen after an update; count every matched line as one (upper bound)
+    woken = sum(1 for signal in matched if monitor.mentions(signal, PROFILE))
+    asked = sum(1 for signal in matched if monitor.concerns(signal, PROFILE) and not monitor.mentions(signal, PROFILE))
+    print(f"Minutes updates: {len(messages)} lines, {updates} LLM calls, "
+          f"{len(messages) - updates} avoided ({(len(messages) - updates) / len(messages):.0%})")
+    print(f"Listen-in checks for {PROFILE}: {len(matched)} without the filter, {asked} LLM calls, "
+          f"{woken} woken by name, {len(matched) - asked} avoided")
+
+    lines = (messages * (THROUGHPUT_LINES // len(messages) + 1))[:THROUGHPUT_LINES]
+    start = time.perf_counter()
+    for message in lines:
+        monitor.scan(message)
+    elapsed = time.perf_counter() - start
+    print(f"Throughput: {len(lines) / elapsed:,.0f} lines/sec ({elapsed / len(lines) * 1e6:.1f} us/line)")
+
+
+if __name__ == "__main__":
+    main()
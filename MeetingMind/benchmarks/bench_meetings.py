@@ -0,0 +1,75 @@
+# Load test for running many meetings in one process.
+# Starts N synthetic meetings on a MeetingManager (shared fake LLM with a fixed latency, shared global
+# concurrency budget), replays them on a ScaledClock, and reports line-to-minutes latency: p50/p99
+# over every line, and the spread of per-meeting p99 as a fairness check.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_meetings [meetings ...]
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+from src.services.llm_service import FakeBackend, LLMService
+from src.services.meeting_manager import MeetingManager, percentiles
+from src.transcript.clock import ScaledClock
+
+MEETINGS = (1, 10, 50)
+MEETING_SECONDS = 120
+SECONDS_PER_LINE = 5
+SPEED = 20
+LLM_LATENCY = 0.2
+MAX_CONCURRENCY = 16
+
+
+def write_transcript(path):
+    start = datetime.datetime(2025, 3, 8, 10, 0, 0)
+    lines = [{"timestamp": (start + datetime.timedelta(seconds=i * SECONDS_PER_LINE)).strftime("%I:%M:%S %p"),
+              "speaker": "Rohan", "message": f"Point {i} about the library budget."}
+             for i in range(1, MEETING_SECONDS // SECONDS_PER_LINE)]
+    with open(path, 'w') as f:
+        json.dump({"meeting": {"date": "March 8, 2025", "time": "10:00:00 AM", "minutes": lines}}, f)
+
+
+async def run(meetings, transcript_path, output_dir):
+    response = json.dumps({"section": "2", "subsection": "2.1", "details": "A point about the library budget."})
+    llm = LLMService(backend=FakeBackend(lambda messages: response, latency=LLM_LATENCY),
+                     max_concurrency=MAX_CONCURRENCY, requests_per_minute=None, tokens_per_minute=None)
+    manager = MeetingManager(llm=llm, max_concurrency=MAX_CONCURRENCY, output_dir=output_dir)
+    start = time.perf_counter()
+    for i in range(meetings):
+        # Stagger the starts a little, as real meetings would be
+        await manager.start_session(f"meeting{i}", transcript_path, clock=ScaledClock(SPEED))
+        await asyncio.sleep(SECONDS_PER_LINE / SPEED / meetings)
+    await manager.wait_all()
+    elapsed = time.perf_counter() - start
+    await manager.shutdown()
+    return manager, llm, elapsed
+
+
+async def main(meeting_counts=MEETINGS):
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript_path = os.path.join(tmp, "transcript.json")
+        write_transcript(transcript_path)
+        print(f"{MEETING_SECONDS} s meetings at {SPEED}x, LLM latency {LLM_LATENCY * 1000:.0f} ms, "
+              f"{MAX_CONCURRENCY} requests in flight")
+        print(f"{'meetings':>8} {'LLM calls':>10} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'meeting p99 min/max ms':>23} {'wall s':>7}")
+        for count in meeting_counts:
+            # The agents print per line; keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                manager, llm, elapsed = await run(count, transcript_path, os.path.join(tmp, f"run{count}"))
+            overall = manager.latency_report()
+            per_meeting = [info["latency_p99"] for info in manager.list_sessions()]
+            spread = percentiles(per_meeting)
+            print(f"{count:>8} {llm.stats['requests']:>10} {overall['p50'] * 1000:>8.0f} {overall['p99'] * 1000:>8.0f} "
+                  f"{min(per_meeting) * 1000:>11.0f} / {spread['max'] * 1000:<9.0f} {elapsed:>7.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(tuple(int(arg) for arg in sys.argv[1:]) or MEETINGS))
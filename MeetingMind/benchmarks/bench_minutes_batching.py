@@ -0,0 +1,94 @@
+# Benchmark for MinutesAgent adaptive batching against a stub LLM.
+# Reports processed lines/sec and queue lag (line arrival -> minutes updated) at different arrival rates.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_minutes_batching
+import asyncio
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+
+from src.agents.minutes_agent import MinutesAgent
+from src.services.llm_service import FakeBackend, LLMService
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_TRANSCRIPT = os.path.join(PROJECT_ROOT, "tests", "sample_data", "sample_transcript.json")
+
+LLM_LATENCY = 0.25  # Seconds per request, independent of size
+
+
+def stub_llm(messages):
+    """Answer single-line and batched prompts with one update per transcript line."""
+    prompt = messages[-1]["content"]
+    indexes = [int(i) for i in re.findall(r"^\s*\[(\d+)\] ", prompt, re.MULTILINE)]
+    if indexes:
+        return json.dumps({"updates": [{"line": i, "section": "10", "details": f"Point {i}"} for i in indexes]})
+    return json.dumps({"section": "10", "details": "Point"})
+
+
+class LagRecordingMinutesAgent(MinutesAgent):
+    """MinutesAgent that records the queue lag of every processed line."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.arrivals = {}
+        self.lags = []
+
+    async def update(self, transcript_line):
+        self.arrivals[id(transcript_line)] = time.perf_counter()
+        await self.transcript_queue.put(transcript_line)
+
+    async def _process_transcript_line(self, transcript_line):
+        await super()._process_transcript_line(transcript_line)
+        self._record([transcript_line])
+
+    async def _process_transcript_batch(self, transcript_lines):
+        await super()._process_transcript_batch(transcript_lines)
+        self._record(transcript_lines)
+
+    def _record(self, lines):
+        now = time.perf_counter()
+        for line in lines:
+            self.lags.append(now - self.arrivals.pop(id(line)))
+
+
+async def run_case(lines, rate, batch_mode, output_path):
+    llm = LLMService(backend=FakeBackend(stub_llm, latency=LLM_LATENCY), requests_per_minute=None,
+                     tokens_per_minute=None)
+    agent = LagRecordingMinutesAgent(batch_mode=batch_mode, output_path=output_path, llm=llm)
+    start = time.perf_counter()
+    for line in lines:
+        await agent.update(dict(line))
+        await asyncio.sleep(1 / rate)
+    await agent.transcript_queue.join()
+    elapsed = time.perf_counter() - start
+    agent.processing_task.cancel()
+    return {
+        "lines_per_sec": len(lines) / elapsed,
+        "mean_lag": statistics.mean(agent.lags),
+        "max_lag": max(agent.lags),
+        "llm_calls": llm.stats["requests"],
+    }
+
+
+async def main(num_lines=40, rates=(1, 5, 20, 50)):
+    with open(SAMPLE_TRANSCRIPT, 'r') as f:
+        sample = json.load(f)['meeting']['minutes']
+    lines = [sample[i % len(sample)] for i in range(num_lines)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "minutes.json")
+        print(f"{'rate':>6} {'mode':>8} {'lines/s':>9} {'mean lag':>9} {'max lag':>9} {'calls':>6}")
+        for rate in rates:
+            for batch_mode in (False, True):
+                result = await run_case(lines, rate, batch_mode, output_path)
+                print(f"{rate:>6} {'batch' if batch_mode else 'single':>8} "
+                      f"{result['lines_per_sec']:>9.2f} {result['mean_lag']:>8.2f}s "
+                      f"{result['max_lag']:>8.2f}s {result['llm_calls']:>6}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
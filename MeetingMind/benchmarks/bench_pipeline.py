@@ -0,0 +1,78 @@
+# Benchmark for pipelined minutes generation.
+# Queues a synthetic transcript that walks through the agenda and runs MinutesAgent with K LLM
+# requests in flight (K=1 is the serial worker) against a fake LLM with a fixed latency. Some lines get
+# "no update" answers: acknowledgements, and questions that could continue the current topic. Reports
+# throughput, conflicts replayed at topic changes, null answers replayed because the line may continue
+# the new topic, and whether the minutes match the serial run.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_pipeline [K ...]
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from src.agents.minutes_agent import MinutesAgent
+from src.services.llm_service import FakeBackend, LLMService
+
+DEPTHS = (1, 2, 4, 8, 16)
+LINES = 120
+LINES_PER_TOPIC = 15
+LLM_LATENCY = 0.05
+NULL_EVERY = 5  # Every fifth line is an acknowledgement or a question, alternately
+TOPICS = [("2", "2.1"), ("2", "2.2"), ("2", "2.3"), ("3", "3.1"), ("3", "3.2"), ("3", "3.3"), ("4", "4.1"), ("4", "4.2")]
+
+
+def message(index):
+    if index % NULL_EVERY != NULL_EVERY - 1:
+        return f"Point {index} of the meeting."
+    if index // NULL_EVERY % 2:
+        return f"Point {index}: any questions on that?"
+    return f"Point {index}: okay, sounds good."
+
+
+def answer(messages):
+    index = int(re.search(r"Rohan: Point (\d+)", messages[-1]["content"]).group(1))
+    if index % NULL_EVERY == NULL_EVERY - 1:
+        return json.dumps({"section": None, "subsection": None, "details": None})
+    section, subsection = TOPICS[index // LINES_PER_TOPIC % len(TOPICS)]
+    return json.dumps({"section": section, "subsection": subsection, "details": f"Point {index}"})
+
+
+async def run(depth, output_path):
+    llm = LLMService(backend=FakeBackend(answer, latency=LLM_LATENCY), max_concurrency=64,
+                     requests_per_minute=None, tokens_per_minute=None)
+    # The agent prints per line; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = MinutesAgent(output_path=output_path, llm=llm, pipeline_depth=depth)
+        start = time.perf_counter()
+        for i in range(LINES):
+            await agent.update({"timestamp": "10:00:00 AM", "speaker": "Rohan", "message": message(i)})
+        await agent.drain()
+        elapsed = time.perf_counter() - start
+        await agent.close()
+    return agent, llm, elapsed
+
+
+async def main(depths=DEPTHS):
+    print(f"{LINES} lines, {LINES_PER_TOPIC} per topic, LLM latency {LLM_LATENCY * 1000:.0f} ms")
+    print(f"{'K':>3} {'lines/s':>8} {'speedup':>8} {'LLM calls':>10} {'conflicts':>10} {'null re-asks':>13} {'same minutes':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        serial = None
+        for depth in depths:
+            agent, llm, elapsed = await run(depth, os.path.join(tmp, f"minutes_{depth}.json"))
+            minutes = agent.get_minutes()
+            if serial is None:
+                serial = (elapsed, minutes)
+            print(f"{depth:>3} {LINES / elapsed:>8.1f} {serial[0] / elapsed:>7.1f}x {llm.stats['requests']:>10} "
+                  f"{agent.pipeline_stats['conflicts']:>10} {agent.pipeline_stats['null_reasks']:>13} "
+                  f"{str(minutes == serial[1]):>13}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(tuple(int(arg) for arg in sys.argv[1:]) or DEPTHS))
@@ -0,0 +1,64 @@
+# Benchmark for prompt size over a long meeting.
+# Replays a synthetic 2-hour transcript (one line every 10 seconds) through MinutesAgent with a fake LLM
+# that walks through the agenda, and compares the compact prompt against the old full-JSON prompt.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_prompt_size
+import asyncio
+import datetime
+import json
+import os
+import tempfile
+
+from src.agents.minutes_agent import MinutesAgent
+from src.models.agenda import Subsection
+from src.services.llm_service import FakeBackend, LLMService, estimate_tokens
+
+MEETING_MINUTES = 120
+SECONDS_PER_LINE = 10
+LINES_PER_TOPIC = 25
+
+
+def agenda_leaves(agenda):
+    """Return (section, subsection) pairs for every agenda topic, in meeting order."""
+    return [(topic.section_id, topic.id) if isinstance(topic, Subsection) else (topic.id, None)
+            for topic in agenda.topics]
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        calls = 0
+        leaves = []
+
+        def fake_llm(messages):
+            nonlocal calls
+            section, subsection = leaves[(calls // LINES_PER_TOPIC) % len(leaves)]
+            calls += 1
+            return json.dumps({"section": section, "subsection": subsection,
+                               "details": f"Point {calls} about the current topic, with a typical amount of detail."})
+
+        llm = LLMService(backend=FakeBackend(fake_llm), requests_per_minute=None, tokens_per_minute=None)
+        agent = MinutesAgent(output_path=os.path.join(tmp, "minutes.json"), llm=llm)
+        agent.processing_task.cancel()
+        leaves.extend(agenda_leaves(agent.minutes.agenda))
+
+        start = datetime.datetime(2025, 3, 8, 10, 0, 0)
+        legacy_tokens = []
+        num_lines = MEETING_MINUTES * 60 // SECONDS_PER_LINE
+        for i in range(num_lines):
+            timestamp = (start + datetime.timedelta(seconds=i * SECONDS_PER_LINE)).strftime("%I:%M:%S %p")
+            line = {"timestamp": timestamp, "speaker": "Rohan",
+                    "message": "We discussed the next steps for this item and agreed on an owner."}
+            # Size of the prompt the agent used to send: the whole minutes structure as indented JSON
+            legacy_tokens.append(estimate_tokens(agent.minutes.to_json()) + 350)
+            await agent._process_transcript_line(line)
+
+        print(f"{'minute':>7} {'compact':>9} {'full JSON':>10}")
+        for minute in range(0, MEETING_MINUTES + 1, 15):
+            index = min(num_lines - 1, minute * 60 // SECONDS_PER_LINE)
+            print(f"{minute:>7} {agent.prompt_tokens_log[index]:>9} {legacy_tokens[index]:>10}")
+        print(f"Total prompt tokens: compact={sum(agent.prompt_tokens_log)} full JSON={sum(legacy_tokens)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+# Benchmark for listen-in decision latency.
+# Replays the sample transcript through ContextAgent twice: asking the LLM for every line (a fake
+# backend with a fixed latency stands in for gpt-4), and with the embedding relevance engine, which
+# only asks the LLM when a score falls in the uncertain band.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_relevance [llm_latency_seconds]
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from src.agents.context_agent import ContextAgent
+from src.agents.relevance_engine import RelevanceEngine
+from src.models.minutes import Minutes
+from src.services.llm_service import FakeBackend, LLMService
+
+PROFILE = "Adi"
+ROLES = ("Vice President",)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def replay(agent, messages):
+    latencies = []
+    for message in messages:
+        start = time.perf_counter()
+        await agent.should_listen_in(transcript=message)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main(llm_latency=0.8):
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(project_root, "tests", "sample_data", "sample_transcript.json")) as f:
+        messages = [line["message"] for line in json.load(f)["meeting"]["minutes"]]
+    with open(os.path.join(project_root, "tests", "sample_data", "sample_minute_structure.json")) as f:
+        minutes = Minutes.from_json(f.read())
+    with open(os.path.join(project_root, "config", "role_description.json")) as f:
+        role_descriptions = json.load(f)
+
+    def llm():
+        return LLMService(backend=FakeBackend(lambda messages: "No", latency=llm_latency),
+                          requests_per_minute=None, tokens_per_minute=None)
+
+    engine = RelevanceEngine(role_descriptions, minutes.agenda)
+    start = time.perf_counter()
+    await engine.prepare()
+    print(f"Embedded {len(engine.role_vectors)} roles and {len(engine.item_vectors)} agenda items "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    runs = [("LLM only", ContextAgent(PROFILE, llm=llm(), roles=ROLES)),
+            ("embeddings", ContextAgent(PROFILE, llm=llm(), roles=ROLES, relevance=engine))]
+    print(f"{'mode':>10} {'LLM calls':>10} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, agent in runs:
+        latencies = await replay(agent, messages)
+        print(f"{name:>10} {len(agent.llm.backend.calls):>10} {statistics.fmean(latencies) * 1000:>9.1f} "
+              f"{percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(float(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,66 @@
+# Benchmark for listen-in cost as the number of attendees grows.
+# For each scope change in the sample transcript, compares one ContextAgent per attendee (one LLM
+# call each) with a single RelevanceService, either asking the LLM about everyone in one call or
+# scoring everyone with the embedding matrix first. The fake LLM has a fixed latency.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_relevance_profiles
+import asyncio
+import json
+import os
+import time
+
+from src.agents.context_agent import ContextAgent
+from src.agents.relevance_engine import RelevanceEngine
+from src.agents.relevance_service import Profile, RelevanceService
+from src.models.minutes import Minutes
+from src.services.llm_service import FakeBackend, LLMService
+
+ATTENDEES = (1, 9, 50, 200)
+SCOPE_CHANGES = 10
+LLM_LATENCY = 0.3
+
+
+def fake_llm(answer):
+    return LLMService(backend=FakeBackend(answer, latency=LLM_LATENCY), max_concurrency=1000,
+                      requests_per_minute=None, tokens_per_minute=None)
+
+
+async def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(project_root, "tests", "sample_data", "sample_transcript.json")) as f:
+        messages = [line["message"] for line in json.load(f)["meeting"]["minutes"]][:SCOPE_CHANGES]
+    with open(os.path.join(project_root, "tests", "sample_data", "sample_minute_structure.json")) as f:
+        minutes = Minutes.from_json(f.read())
+    with open(os.path.join(project_root, "config", "role_description.json")) as f:
+        role_descriptions = json.load(f)
+    roles = list(role_descriptions)
+    engine = RelevanceEngine(role_descriptions, minutes.agenda)
+
+    print(f"{'attendees':>9} {'mode':>12} {'LLM calls':>10} {'prompt tokens':>14} {'ms/update':>10}")
+    for count in ATTENDEES:
+        profiles = [Profile(f"Person{i}", (roles[i % len(roles)],)) for i in range(count)]
+
+        llm = fake_llm(lambda messages: "No")
+        agents = [ContextAgent(profile.name, llm=llm, roles=profile.roles) for profile in profiles]
+        start = time.perf_counter()
+        for message in messages:
+            await asyncio.gather(*(agent.should_listen_in(message) for agent in agents))
+        per_agent = (time.perf_counter() - start) / len(messages)
+
+        results = [("per-profile", llm, per_agent)]
+        for name, service_engine in (("shared LLM", None), ("shared+emb", engine)):
+            llm_shared = fake_llm(lambda messages: json.dumps({profile.name: False for profile in profiles}))
+            service = RelevanceService(profiles, role_descriptions, llm=llm_shared, engine=service_engine)
+            start = time.perf_counter()
+            for scope_id, message in enumerate(messages):
+                await service.on_scope(scope_id, message, message)
+            results.append((name, llm_shared, (time.perf_counter() - start) / len(messages)))
+
+        for name, service_llm, elapsed in results:
+            print(f"{count:>9} {name:>12} {service_llm.stats['requests']:>10} "
+                  f"{service_llm.stats['prompt_tokens']:>14} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+# Benchmark for instant replay on a virtual clock.
+# Pushes a synthetic multi-hour transcript through TranscriptProcessor and MinutesAgent (with a fake
+# LLM) on a VirtualClock, and reports how long the whole meeting takes to process.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_replay [hours]
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+from src.agents.minutes_agent import MinutesAgent
+from src.services.llm_service import FakeBackend, LLMService
+from src.transcript.clock import VirtualClock
+from src.transcript.processor import TranscriptProcessor
+
+SECONDS_PER_LINE = 5
+
+
+def write_transcript(path, hours):
+    start = datetime.datetime(2025, 3, 8, 10, 0, 0)
+    lines = [{"timestamp": (start + datetime.timedelta(seconds=i * SECONDS_PER_LINE)).strftime("%I:%M:%S %p"),
+              "speaker": "Rohan", "message": f"Point {i} about the library budget."}
+             for i in range(1, int(hours * 3600 / SECONDS_PER_LINE))]
+    with open(path, 'w') as f:
+        json.dump({"meeting": {"date": "March 8, 2025", "time": "10:00:00 AM", "minutes": lines}}, f)
+    return len(lines)
+
+
+async def main(hours=3.0):
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript_path = os.path.join(tmp, "transcript.json")
+        num_lines = write_transcript(transcript_path, hours)
+
+        response = json.dumps({"section": "2", "subsection": "2.1", "details": "A point about the library budget."})
+        llm = LLMService(backend=FakeBackend(lambda messages: response),
+                         requests_per_minute=None, tokens_per_minute=None)
+        processor = TranscriptProcessor(clock=VirtualClock())
+        agent = MinutesAgent(output_path=os.path.join(tmp, "minutes.json"), llm=llm)
+        processor.register_observer(agent)
+
+        start = time.perf_counter()
+        # The agents print per line; keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            await processor.simulate_meeting(transcript_path)
+            await agent.close()
+        elapsed = time.perf_counter() - start
+        agent.processing_task.cancel()
+
+        print(f"Replayed {hours:g} h of meeting ({num_lines} lines, {llm.stats['requests']} LLM calls) "
+              f"in {elapsed:.2f} s: {num_lines / elapsed:,.0f} lines/sec, {hours * 3600 / elapsed:,.0f}x real time")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(float(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,65 @@
+# Benchmark for locating where a bullet goes in a large minutes Google Doc.
+# Compares scanning every paragraph per bullet (the old append_detail_to_doc behaviour) with a
+# SectionIndex built once and shifted after each insert, on a synthetic 5,000-paragraph document.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_section_index
+import random
+import time
+
+from src.services.doc_writer_service import FakeDocsService, SectionIndex, utf16_length
+
+NUM_PARAGRAPHS = 5000
+NUM_SECTIONS = 10
+SUBSECTIONS_PER_SECTION = 5
+NUM_BULLETS = 500
+
+
+def synthetic_paragraphs():
+    """Headings in the minutes template convention, padded out with bullets and notes."""
+    headings = []
+    for section in range(1, NUM_SECTIONS + 1):
+        headings.append(f"### **{section}. Section {section}**\n")
+        headings.extend(f"#### {section}.{sub} Subsection {section}.{sub}\n"
+                        for sub in range(1, SUBSECTIONS_PER_SECTION + 1))
+    per_heading = (NUM_PARAGRAPHS - len(headings) - 1) // len(headings)
+    paragraphs = ["Meeting Minutes\n"]
+    for heading in headings:
+        paragraphs.append(heading)
+        paragraphs.extend(f"- Earlier point {i} recorded under this heading.\n" for i in range(per_heading))
+    return paragraphs
+
+
+def main():
+    docs = FakeDocsService(synthetic_paragraphs())
+    document = docs.documents().get(documentId="doc").execute()
+    paragraphs = len(document['body']['content']) - 1
+    rng = random.Random(0)
+    section_ids = [f"{rng.randint(1, NUM_SECTIONS)}.{rng.randint(1, SUBSECTIONS_PER_SECTION)}"
+                   for _ in range(NUM_BULLETS)]
+
+    # Old behaviour: walk the whole document for every bullet
+    start = time.perf_counter()
+    for section_id in section_ids:
+        SectionIndex.from_document(document).insert_position(section_id)
+    scan_seconds = time.perf_counter() - start
+
+    # Index built once, then shifted locally after each insert
+    start = time.perf_counter()
+    index = SectionIndex.from_document(document)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for section_id in section_ids:
+        position = index.insert_position(section_id)
+        index.apply_inserts([(position, utf16_length("- New point.\n"))], index.revision_id)
+    indexed_seconds = time.perf_counter() - start
+
+    print(f"Document: {paragraphs} paragraphs, {len(index.sections)} headings, {NUM_BULLETS} bullets")
+    print(f"Full scan per bullet:   {scan_seconds / NUM_BULLETS * 1e6:>10.1f} us/bullet")
+    print(f"Index build (once):     {build_seconds * 1e6:>10.1f} us")
+    print(f"Indexed lookup + shift: {indexed_seconds / NUM_BULLETS * 1e6:>10.1f} us/bullet")
+    print(f"Speedup per bullet:     {scan_seconds / indexed_seconds:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Benchmark for startup time.
+# 1. Runs `python -X importtime -c "import main"` and lists the slowest imports, checking that the
+#    OpenAI and Google client stacks are not among them (they load on first use).
+# 2. Starts a fresh interpreter that builds the pipeline from main.start_pipeline (with a fake LLM) and
+#    processes the first transcript line, and measures the time from process start to that line's
+#    minutes update against TARGET_SECONDS. The child writes its minutes and caches to a temporary
+#    directory, so running the benchmark leaves the repository untouched.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_startup
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+TARGET_SECONDS = 0.5
+RUNS = 5
+LAZY_MODULES = ("openai", "googleapiclient", "google_auth_oauthlib", "dotenv", "httpx")
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+FIRST_LINE = """
+import asyncio, json, os, sys
+from main import start_pipeline
+from src.services.llm_service import FakeBackend, LLMService, set_llm_service
+from src.transcript.clock import VirtualClock
+
+async def run():
+    answer = '{"section": "2", "subsection": "2.1", "details": "Library budget"}'
+    set_llm_service(LLMService(backend=FakeBackend(lambda messages: answer),
+                               requests_per_minute=None, tokens_per_minute=None))
+    out_dir = %r
+    processor, agent, _, _ = await start_pipeline(VirtualClock(), output_path=os.path.join(out_dir, "minutes.json"),
+                                                  journal_path=os.path.join(out_dir, "minutes.journal"),
+                                                  cache_dir=out_dir)
+    with open("tests/sample_data/sample_transcript.json") as f:
+        line = json.load(f)["meeting"]["minutes"][3]
+    await processor.add_transcript_line(line)
+    await agent.drain()
+    loaded = [name for name in %r if name in sys.modules]
+    print("FIRST_LINE", ",".join(loaded) or "-", flush=True)
+    await agent.close()
+
+asyncio.run(run())
+"""
+
+
+def import_times(project_root):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=project_root, capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            modules.append((int(match.group(2)), (len(match.group(3)) - 1) // 2, match.group(4)))
+    return modules
+
+
+def time_to_first_line(project_root):
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        child = subprocess.Popen([sys.executable, "-c", FIRST_LINE % (out_dir, LAZY_MODULES)], cwd=project_root,
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        loaded = None
+        for line in child.stdout:
+            if line.startswith("FIRST_LINE"):
+                elapsed = time.perf_counter() - start
+                loaded = line.split()[1]
+                break
+        child.wait()
+    if loaded is None:
+        raise RuntimeError("The pipeline exited before processing the first line")
+    return elapsed, loaded
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    modules = import_times(project_root)
+    total = next(cumulative for cumulative, depth, name in modules if name == "main" and depth == 0)
+    print(f"import main: {total / 1000:.0f} ms")
+    # Direct imports of main and everything they pull in, slowest first
+    for cumulative, depth, name in sorted((m for m in modules if m[1] == 1), reverse=True)[:8]:
+        print(f"  {cumulative / 1000:>7.1f} ms  {name}")
+    imported = {name.split(".")[0] for _, _, name in modules}
+    print(f"Lazy client modules imported by `import main`: {sorted(imported & set(LAZY_MODULES)) or 'none'}")
+
+    times = []
+    for _ in range(RUNS):
+        elapsed, loaded = time_to_first_line(project_root)
+        times.append(elapsed)
+    best = min(times)
+    print(f"Process start -> first line processed: best {best * 1000:.0f} ms, "
+          f"median {sorted(times)[len(times) // 2] * 1000:.0f} ms over {RUNS} runs "
+          f"(target {TARGET_SECONDS * 1000:.0f} ms: {'met' if best <= TARGET_SECONDS else 'missed'})")
+    print(f"Lazy client modules loaded by then: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Benchmark for the cost of tracing and metrics.
+# 1. Per-call cost of a span, a counter increment and a histogram observation.
+# 2. Replays synthetic lines through TranscriptProcessor and a pipelined MinutesAgent against a fake LLM,
+#    with recording disabled, with recording only, and with recording plus the background trace writer,
+#    and reports throughput, the overhead, and p50/p99 per stage from the span histograms.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_telemetry
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from src.agents.minutes_agent import MinutesAgent
+from src.services.llm_service import FakeBackend, LLMService
+from src.services.telemetry_service import Telemetry, TraceWriter, set_telemetry
+from src.transcript.processor import TranscriptProcessor
+
+CALLS = 200_000
+LINES = 2000
+LLM_LATENCY = 0.005
+ANSWER = json.dumps({"section": "2", "subsection": "2.1", "details": "Library budget"})
+
+
+class NullTelemetry(Telemetry):
+    """Baseline: the same calls, nothing recorded."""
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def record_span(self, name, start, end, trace_id=None, **attrs):
+        pass
+
+
+def per_call_costs():
+    telemetry = Telemetry(trace_capacity=CALLS)
+    costs = {}
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        with telemetry.span("bench"):
+            pass
+    costs["span"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        telemetry.inc("bench_total", model="gpt-4")
+    costs["counter"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        telemetry.observe("bench_seconds", 0.02)
+    costs["histogram"] = time.perf_counter() - start
+    return {name: elapsed / CALLS * 1e9 for name, elapsed in costs.items()}
+
+
+async def replay(telemetry, trace_path=None):
+    set_telemetry(telemetry)
+    writer = TraceWriter(telemetry, trace_path) if trace_path else None
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        if writer:
+            writer.start()
+        llm = LLMService(backend=FakeBackend(lambda messages: ANSWER, latency=LLM_LATENCY), max_concurrency=64,
+                         requests_per_minute=None, tokens_per_minute=None)
+        processor = TranscriptProcessor()
+        agent = MinutesAgent(output_path=os.path.join(tmp, "minutes.json"), llm=llm, pipeline_depth=16)
+        processor.register_observer(agent)
+        start = time.perf_counter()
+        for i in range(LINES):
+            await processor.add_transcript_line({"timestamp": "10:00:00 AM", "speaker": "Rohan",
+                                                 "message": f"Point {i} on the library budget."})
+        await agent.drain()
+        elapsed = time.perf_counter() - start
+        await agent.close()
+        if writer:
+            await writer.close()
+    return elapsed
+
+
+def main():
+    costs = per_call_costs()
+    print("Per call: " + ", ".join(f"{name} {ns:.0f} ns" for name, ns in costs.items()))
+
+    baseline = asyncio.run(replay(NullTelemetry()))
+    recorded = asyncio.run(replay(Telemetry()))
+    telemetry = Telemetry()
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = os.path.join(tmp, "trace.json")
+        traced = asyncio.run(replay(telemetry, trace_path))
+        trace_bytes = os.path.getsize(trace_path)
+    print(f"{LINES} lines, LLM latency {LLM_LATENCY * 1000:.0f} ms, 16 requests in flight")
+    print(f"  recording off:           {LINES / baseline:>7.0f} lines/s")
+    print(f"  recording:               {LINES / recorded:>7.0f} lines/s ({(recorded / baseline - 1) * 100:+.1f}% time)")
+    print(f"  recording + trace file:  {LINES / traced:>7.0f} lines/s ({(traced / baseline - 1) * 100:+.1f}% time), "
+          f"{telemetry.spans_recorded} spans, {trace_bytes / 1024:.0f} KiB")
+
+    print(f"{'stage':>26} {'count':>6} {'p50 <=':>8} {'p99 <=':>8}")
+    for (name, labels), histogram in sorted(telemetry.histograms.items()):
+        stage = dict(labels).get("span", name)
+        print(f"{stage:>26} {histogram.count:>6} {histogram.quantile(0.5) * 1000:>6.0f}ms "
+              f"{histogram.quantile(0.99) * 1000:>6.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Benchmark for transcript persistence over a 10k-line meeting.
+# Compares rewriting the whole transcript JSON on every line (the old save_transcript behaviour)
+# with the append-only JSON Lines log, reporting wall time, time spent in add_transcript_line and bytes written.
+# The rewrite approach is O(n^2), so it is measured on fewer lines by default.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_transcript_log
+import asyncio
+import datetime
+import json
+import os
+import tempfile
+import time
+
+from src.transcript.processor import TranscriptProcessor
+from src.transcript.transcript_log import FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER
+
+NUM_LINES = 10000
+REWRITE_LINES = 1000
+
+
+def synthetic_lines(count):
+    start = datetime.datetime(2025, 3, 8, 10, 0, 0)
+    return [{"timestamp": (start + datetime.timedelta(seconds=i)).strftime("%I:%M:%S %p"),
+             "speaker": "Rohan (President)",
+             "message": f"Point {i}: we agreed to follow up with the library about the budget next week."}
+            for i in range(count)]
+
+
+def bench_rewrite(path, lines):
+    transcript = []
+    bytes_written = 0
+    start = time.perf_counter()
+    for line in lines:
+        transcript.append(line)
+        with open(path, 'w') as f:
+            json.dump({"meeting": {"date": "March 08, 2025", "time": "10:00:00 AM", "minutes": transcript}}, f, indent=4)
+        bytes_written += os.path.getsize(path)
+    return time.perf_counter() - start, bytes_written
+
+
+async def bench_log(path, lines, fsync_policy):
+    processor = TranscriptProcessor(transcript_file_path=path, fsync_policy=fsync_policy)
+    start = time.perf_counter()
+    in_call = 0.0
+    for line in lines:
+        call_start = time.perf_counter()
+        await processor.add_transcript_line(line)
+        in_call += time.perf_counter() - call_start
+        if len(processor.transcript) % 100 == 0:
+            await asyncio.sleep(0)  # Let the background writer run as it would between live lines
+    await processor.close()
+    elapsed = time.perf_counter() - start
+    return elapsed, in_call, processor.transcript_log.bytes_written
+
+
+async def main():
+    lines = synthetic_lines(NUM_LINES)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transcript.json")
+        print(f"{'method':>26} {'lines':>7} {'wall':>9} {'in add_line':>12} {'MB written':>11}")
+
+        elapsed, bytes_written = bench_rewrite(path, lines[:REWRITE_LINES])
+        print(f"{'rewrite JSON per line':>26} {REWRITE_LINES:>7} {elapsed:>8.2f}s {elapsed:>11.2f}s "
+              f"{bytes_written / 1e6:>11.1f}")
+
+        for fsync_policy in (FSYNC_NEVER, FSYNC_INTERVAL, FSYNC_ALWAYS):
+            elapsed, in_call, bytes_written = await bench_log(path, lines, fsync_policy)
+            print(f"{f'JSON Lines log ({fsync_policy})':>26} {NUM_LINES:>7} {elapsed:>8.2f}s {in_call:>11.2f}s "
+                  f"{bytes_written / 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
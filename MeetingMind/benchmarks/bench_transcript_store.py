@@ -0,0 +1,112 @@
+# Benchmark for the in-memory transcript at 100k lines.
+# Compares a list of line dicts (the old TranscriptProcessor.transcript) with TranscriptStore: memory
+# held (tracemalloc), time to add every line through TranscriptProcessor, and the latency of "lines since
+# this topic started", time-range and per-speaker queries against linear scans of the dicts.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_transcript_store
+import asyncio
+import datetime
+import gc
+import time
+import tracemalloc
+
+from src.transcript.models import TIMESTAMP_FORMAT, TranscriptStore
+from src.transcript.processor import TranscriptProcessor
+
+NUM_LINES = 100_000
+SPEAKERS = ["Rohan (President)", "Adi (Vice President)", "Kriti (Treasurer)", "Oishi (Secretary)", "Diya", "Harsh"]
+START = datetime.datetime(2025, 3, 8, 9, 0, 0)
+SPACING_MS = 500  # Two lines a second keeps 100k lines within one day
+QUERIES = 200
+
+
+def synthetic_lines(count):
+    return [{"timestamp": (START + datetime.timedelta(milliseconds=i * SPACING_MS)).strftime(TIMESTAMP_FORMAT),
+             "speaker": SPEAKERS[i % len(SPEAKERS)],
+             "message": f"Point {i}: we agreed to follow up with the library about the budget next week."}
+            for i in range(count)]
+
+
+def measure(build):
+    """Bytes still allocated after build() returns (the result is kept alive until then)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def build_dicts():
+    # Copies, so the strings are allocated while tracing as they would be for lines arriving live
+    return [{"timestamp": (START + datetime.timedelta(milliseconds=i * SPACING_MS)).strftime(TIMESTAMP_FORMAT),
+             "speaker": SPEAKERS[i % len(SPEAKERS)],
+             "message": f"Point {i}: we agreed to follow up with the library about the budget next week."}
+            for i in range(NUM_LINES)]
+
+
+def build_store():
+    store = TranscriptStore(START)
+    for i in range(NUM_LINES):
+        store.append(i * SPACING_MS, SPEAKERS[i % len(SPEAKERS)],
+                     f"Point {i}: we agreed to follow up with the library about the budget next week.")
+    return store
+
+
+def scan_since(lines, timestamp):
+    # Without pre-parsed offsets every timestamp has to be parsed to compare it
+    since = datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT).time()
+    return [line for line in lines if datetime.datetime.strptime(line["timestamp"], TIMESTAMP_FORMAT).time() >= since]
+
+
+def timed(fn, repeat=QUERIES):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+async def ingest(lines):
+    processor = TranscriptProcessor()
+    processor.start_time = START
+    start = time.perf_counter()
+    for i, line in enumerate(lines):
+        await processor.add_transcript_line(line, offset=i * SPACING_MS / 1000)
+    return processor, time.perf_counter() - start
+
+
+def main():
+    print(f"{NUM_LINES} lines, {len(SPEAKERS)} speakers")
+    dict_bytes, store_bytes = measure(build_dicts), measure(build_store)
+    print(f"Memory: list of dicts {dict_bytes / 2**20:.1f} MiB, TranscriptStore {store_bytes / 2**20:.1f} MiB "
+          f"({dict_bytes / store_bytes:.1f}x less)")
+
+    lines = synthetic_lines(NUM_LINES)
+    processor, elapsed = asyncio.run(ingest(lines))
+    print(f"add_transcript_line: {elapsed / NUM_LINES * 1e6:.1f} us/line")
+    store = processor.transcript
+
+    # The last topic started 100 lines ago
+    topic_start = lines[-100]["timestamp"]
+    offsets = [i * SPACING_MS / 1000 for i in range(NUM_LINES)]  # Seconds, as a scan over pre-parsed offsets would use
+    end = offsets[-1]
+    rows = [
+        ("lines since topic start (100)", lambda: scan_since(lines, topic_start), lambda: processor.lines_since(topic_start)),
+        ("5-minute window mid-meeting",
+         lambda: [lines[i] for i, offset in enumerate(offsets) if 25_000 <= offset < 25_300],
+         lambda: processor.lines_between(25_000, 25_300)),
+        ("one speaker, last 10 minutes",
+         lambda: [line for i, line in enumerate(lines) if offsets[i] >= end - 600 and line["speaker"] == SPEAKERS[1]],
+         lambda: processor.lines_by_speaker(SPEAKERS[1], start_seconds=end - 600)),
+    ]
+    print(f"{'query':>30} {'linear scan':>12} {'bisect':>10} {'same':>5}")
+    for name, scan, query in rows:
+        scan_time, expected = timed(scan, repeat=3)
+        query_time, result = timed(query)
+        print(f"{name:>30} {scan_time * 1000:>10.2f}ms {query_time * 1e6:>8.1f}us {str(result == expected):>5}")
+
+
+if __name__ == "__main__":
+    main()
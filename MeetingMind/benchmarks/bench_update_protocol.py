@@ -0,0 +1,65 @@
+# Benchmark for the structured minutes-update protocol.
+# Replays lines where most answers are "no update" through MinutesAgent with a fake LLM that generates
+# tokens at a fixed rate, and compares the streamed, schema-constrained request (early return on a null
+# section) with reading every answer to the end, as the free-form prompt did.
+#
+# Usage (from the MeetingMind directory):
+#   python -m benchmarks.bench_update_protocol
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+
+from src.agents.minutes_agent import MinutesAgent
+from src.services.llm_service import FakeBackend, LLMService
+
+LINES = 60
+RELEVANT_EVERY = 3  # One line in three updates the minutes
+TOKEN_LATENCY = 0.01  # Seconds per generated token
+NULL_ANSWER = json.dumps({"section": None, "subsection": None, "details": None})
+UPDATE_ANSWER = json.dumps({"section": "2", "subsection": "2.1",
+                            "details": "The library budget was approved at 100 pounds."})
+
+
+def answer(messages):
+    index = int(re.search(r"Library point (\d+)", messages[-1]["content"]).group(1))
+    return UPDATE_ANSWER if index % RELEVANT_EVERY == 0 else NULL_ANSWER
+
+
+async def run(stream):
+    backend = FakeBackend(answer, latency=0.05, token_latency=TOKEN_LATENCY)
+    llm = LLMService(backend=backend, requests_per_minute=None, tokens_per_minute=None)
+    # The agent prints per line; keep the benchmark output readable
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        agent = MinutesAgent(output_path=os.path.join(tmp, "minutes.json"), llm=llm)
+        agent.processing_task.cancel()
+        if not stream:
+            complete = llm.complete
+
+            async def read_to_end(messages, stop_when=None, **kwargs):
+                return await complete(messages, **kwargs)
+            llm.complete = read_to_end
+
+        start = time.perf_counter()
+        for i in range(LINES):
+            await agent._process_transcript_line(
+                {"timestamp": "10:00:00 AM", "speaker": "Rohan", "message": f"Library point {i}."})
+        elapsed = time.perf_counter() - start
+        await agent.close()
+    return llm.stats["completion_tokens"], elapsed
+
+
+async def main():
+    print(f"{LINES} lines, 1 in {RELEVANT_EVERY} relevant, {TOKEN_LATENCY * 1000:.0f} ms per generated token")
+    print(f"{'mode':>12} {'completion tokens':>18} {'ms/line':>8}")
+    for name, stream in (("read to end", False), ("streamed", True)):
+        tokens, elapsed = await run(stream)
+        print(f"{name:>12} {tokens:>18} {elapsed / LINES * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
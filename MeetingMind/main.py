@@ -1,12 +1,25 @@
 import asyncio
+import json
+import os
+
+from src.transcript.clock import make_clock
 from src.transcript.processor import TranscriptProcessor
 from src.agents.minutes_agent import MinutesAgent
-from src.agents.context_agent import ContextAgent
-import os
-from dotenv import load_dotenv
+from src.agents.keyword_monitor import KeywordMonitor
+from src.agents.notify_agent import NotifyAgent
+from src.agents.relevance_engine import RelevanceEngine
+from src.agents.relevance_service import RelevanceService, load_user_profiles
+from src.agents.summary_agent import SummaryAgent
+from src.agents.update_protocol import UPDATE_MODEL
+from src.models.minutes import Minutes
+from src.services.cache_service import LLMResponseCache
+from src.services.embedding_service import EmbeddingCache
+from src.services.llm_service import LLMService, get_llm_service, set_llm_service
+from src.services.snapshot_service import write_text_atomic
+from src.services.telemetry_service import MetricsServer, TraceWriter, get_telemetry
 
-# Load the .env file
-load_dotenv()
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+MINUTES_DOC_ID = '1W6BTAWwDpQL_X3dD02Z4j9AbHHTDSek0iOWc0f6MkDM'  # minutes template doc ID
 
 # async def check_listen_in(context_agent):
 #     while True:
@@ -15,23 +28,92 @@ load_dotenv()
 #             print("Adi should listen in!")
 #         await asyncio.sleep(5)  # Check every 5 seconds
 
+def print_listen_in(name, relevant, scope_id):
+    if relevant:
+        print(f"{name} should listen in on {scope_id}!")
+
+def _read_text(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+async def load_config(project_root=PROJECT_ROOT):
+    """Read the role descriptions, user profiles and minutes template concurrently, off the event loop."""
+    role_text, profiles, template = await asyncio.gather(
+        asyncio.to_thread(_read_text, os.path.join(project_root, "config", "role_description.json")),
+        asyncio.to_thread(load_user_profiles, os.path.join(project_root, "config", "user_profiles.json")),
+        asyncio.to_thread(_read_text, os.path.join(project_root, "tests", "sample_data", "sample_minute_structure.json")),
+    )
+    return json.loads(role_text), profiles, template
+
+async def start_pipeline(clock, google_doc_id=None, transcript_path=None, output_path=None, journal_path=None,
+                         cache_dir=None):
+    """Build the processor and agents; returns (processor, minutes_agent, relevance_service, notify_agent).
+
+    output_path and journal_path are the minutes snapshot and its delta journal (default: final_minutes.json
+    in the project, no journal); cache_dir holds the embedding cache (default: .cache in the project).
+    """
+    role_descriptions, profiles, template = await load_config()
+    processor = TranscriptProcessor(transcript_file_path=transcript_path, clock=clock)
+    # Local keyword matching wakes attendees named in the transcript; KEYWORD_GATE=1 also lets it skip the
+    # minutes agent's LLM call for small talk (opt-in until its accuracy has been checked on real meetings)
+    keyword_monitor = KeywordMonitor(Minutes.from_json(template), role_descriptions)
+    # Clear-cut listen-in decisions come from embeddings; role and agenda vectors are cached across runs
+    relevance_engine = RelevanceEngine(
+        role_descriptions, keyword_monitor.agenda,
+        cache=EmbeddingCache(os.path.join(cache_dir or os.path.join(PROJECT_ROOT, ".cache"), "embeddings.npz"))
+    )
+    # One evaluation per topic change answers for every attendee in config/user_profiles.json
+    relevance_service = RelevanceService(profiles, role_descriptions,
+                                         engine=relevance_engine, keyword_monitor=keyword_monitor)
+    # Listen-in pings go to Discord when a webhook is configured, batched and deduped by the notify agent
+    notify_agent = NotifyAgent() if os.getenv("DISCORD_WEBHOOK_URL") else None
+    for profile in relevance_service.profiles:
+        relevance_service.subscribe(profile.name, print_listen_in)
+        if notify_agent:
+            relevance_service.subscribe(profile.name, notify_agent.on_relevance)
+    # MINUTES_MODEL picks the update model; ones without structured outputs fall back to JSON mode or the prompt
+    minutes_agent = MinutesAgent(google_doc_id=google_doc_id, relevance_service=relevance_service,
+                                 keyword_monitor=keyword_monitor if os.getenv("KEYWORD_GATE") == "1" else None,
+                                 minutes=Minutes.from_json(template),
+                                 model=os.getenv("MINUTES_MODEL", UPDATE_MODEL),
+                                 output_path=output_path, journal_path=journal_path)
+    processor.register_observer(minutes_agent)
+    return processor, minutes_agent, relevance_service, notify_agent
+
 async def main():
-    # Get the project root directory
-    project_root = os.path.dirname(os.path.abspath(__file__))
-    
+    # Load the .env file (the only place it is read)
+    from dotenv import load_dotenv
+    load_dotenv()
+
     # Set paths for input and output files
-    sample_transcript_path = os.path.join(project_root, "tests", "sample_data", "sample_transcript.json")
-    output_transcript_path = os.path.join(project_root, "output_transcript.json")
+    sample_transcript_path = os.path.join(PROJECT_ROOT, "tests", "sample_data", "sample_transcript.json")
+    output_transcript_path = os.path.join(PROJECT_ROOT, "output_transcript.json")
+
+    # Share one LLM client whose responses are cached, so replaying a transcript is nearly free.
+    # Set LLM_CACHE_BYPASS=1 for runs that should always hit the API.
+    llm_cache = LLMResponseCache(
+        path=os.path.join(PROJECT_ROOT, ".cache", "llm_cache.sqlite3"),
+        bypass=os.getenv("LLM_CACHE_BYPASS") == "1"
+    )
+    set_llm_service(LLMService(cache=llm_cache))
+
+    # Spans of every line go to a JSON trace file (open it in Perfetto or chrome://tracing) and metrics
+    # are served for Prometheus at http://127.0.0.1:METRICS_PORT/metrics
+    telemetry = get_telemetry()
+    trace_writer = TraceWriter(telemetry, os.getenv("TRACE_PATH", os.path.join(PROJECT_ROOT, ".cache", "trace.json")))
+    trace_writer.start()
+    metrics_server = MetricsServer(telemetry, port=int(os.getenv("METRICS_PORT", "9464")))
+    try:
+        await metrics_server.start()
+    except OSError as e:
+        print(f"Metrics endpoint not started: {e}")
     
     # Create processor and agents
-    processor = TranscriptProcessor(transcript_file_path=output_transcript_path)
-    minutes_doc_id = '1W6BTAWwDpQL_X3dD02Z4j9AbHHTDSek0iOWc0f6MkDM'  # minutes template doc ID
-    context_agent = ContextAgent(profile="Adi")
-    minutes_agent = MinutesAgent(google_doc_id = minutes_doc_id, context_agent=context_agent)
-    
-    
-    # Load the transcript
-    processor.register_observer(minutes_agent)
+    # SIMULATION_SPEED replays the meeting N times faster than real time; 0 replays it instantly
+    clock = make_clock(float(os.getenv("SIMULATION_SPEED", "1")))
+    processor, minutes_agent, relevance_service, notify_agent = await start_pipeline(
+        clock, google_doc_id=MINUTES_DOC_ID, transcript_path=output_transcript_path
+    )
     
     # #start the listen_in task
     # listen_in_task = asyncio.create_task(check_listen_in(context_agent))
@@ -46,6 +128,29 @@ async def main():
     # await asyncio.gather(listen_in_task, simulate_task)
 
     await processor.simulate_meeting(sample_transcript_path, time_limit_seconds=120)
+
+    await minutes_agent.close()
+    await processor.close()
+
+    # Consolidated summary of the meeting; chunk summaries are cached, so re-runs only redo what changed
+    summary_agent = SummaryAgent(cache=LLMResponseCache(path=os.path.join(PROJECT_ROOT, ".cache", "summary_cache.sqlite3")))
+    summary = await summary_agent.summarise(processor.get_full_transcript(), minutes_agent.minutes.agenda,
+                                            minutes_agent.topic_starts)
+    write_text_atomic(os.path.join(PROJECT_ROOT, "meeting_summary.json"), json.dumps(summary, indent=2))
+    summary_agent.cache.close()
+    if notify_agent:
+        await notify_agent.close()
+        print(f"Notification stats: {notify_agent.stats}")
+    print(f"LLM cache stats: {llm_cache.stats}")
+    print(f"LLM calls skipped by keyword matching: {minutes_agent.skipped_lines}")
+    print(f"Relevance stats: {relevance_service.stats}")
+    print(f"Summary stats: {summary_agent.stats}")
+
+    # Close the pooled HTTP connections of the shared LLM client
+    await get_llm_service().aclose()
+    await metrics_server.close()
+    await trace_writer.close()
+    print(f"Trace written to {trace_writer.path} ({trace_writer.events_written} spans)")
     
     
 
@@ -1,16 +1,20 @@
 import json
-from openai import OpenAI
-import asyncio
 import os
+from src.services.llm_service import DEFAULT_MODEL, get_llm_service
 
 class ContextAgent:
-    def __init__(self, profile):
+    def __init__(self, profile, llm=None, keyword_monitor=None, roles=(), relevance=None):
         self.profile = profile
-        api_key = os.getenv("API_KEY")
-        self.api_key = api_key
+        self.roles = roles  # Role names of the profile, as in role_description.json
         self.current_timestamp = 0
         self.listen_in = False
-        self.client = OpenAI(api_key=self.api_key)
+        self.llm = llm or get_llm_service()  # Shared async LLM client
+        # Local keyword matcher; transcript lines that do not concern the profile skip the LLM
+        self.keyword_monitor = keyword_monitor
+        # Embedding relevance engine; the LLM is only asked when its score is uncertain
+        self.relevance = relevance
+        self.last_score = None
+        self.skipped_checks = 0
         self.role_descriptions = self.load_role_descriptions()
 
     def load_role_descriptions(self):
@@ -25,10 +29,8 @@ class ContextAgent:
         return role_descriptions
 
     async def analyze_context(self, lines): # if lines is empty, the agent should be able to give a response of no
-        # try:
-        response = await asyncio.to_thread(
-            self.client.chat.completions.create,
-            model="gpt-4",
+        content = await self.llm.chat(
+            model=DEFAULT_MODEL,
             messages=[
                 {"role": "system", "content": "You are a meeting assistant to notify meeting attendee to pay attention when the current part involves or will involve them."},
                 {
@@ -39,22 +41,31 @@ class ContextAgent:
             temperature=0.7,
             max_tokens=300
         )
-
-        content = response.choices[0].message.content.strip()
         return content
-        # except OpenAI.APIConnectionError as e:
-        #     print("The server could not be reached")
-        #     print(e.__cause__)  # an underlying Exception, likely raised within httpx.
-        # except OpenAI.RateLimitError as e:
-        #     print("A 429 status code was received; we should back off a bit.")
-        # except OpenAI.APIStatusError as e:
-        #     print("Another non-200-range status code was received")
-        #     print(e.status_code)
-        #     print(e.response)
-        # return "no"
 
-    async def should_listen_in(self, lines=None):
+    async def should_listen_in(self, lines=None, transcript=None):
         # lines = self.get_minutes_within_current_topic()
+        if self.keyword_monitor is not None and transcript is not None:
+            signal = self.keyword_monitor.scan(transcript)
+            if self.keyword_monitor.mentions(signal, self.profile):
+                # Named directly: wake up without asking the LLM
+                self.listen_in = True
+                self.skipped_checks += 1
+                return self.listen_in
+            if not self.keyword_monitor.concerns(signal, self.profile, self.roles):
+                self.listen_in = False
+                self.skipped_checks += 1
+                return self.listen_in
+
+        if self.relevance is not None:
+            self.last_score = await self.relevance.score(transcript if transcript is not None else str(lines),
+                                                         self.profile, self.roles)
+            decision = self.relevance.decide(self.last_score)
+            if decision is not None:
+                self.listen_in = decision
+                self.skipped_checks += 1
+                return self.listen_in
+
         context_analysis = await self.analyze_context(lines)
         if context_analysis.lower() == "yes":
             self.listen_in = True
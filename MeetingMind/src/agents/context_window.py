@@ -0,0 +1,85 @@
+# Sliding-window topic context for listen-in checks.
+# Keeps a ring buffer of the most recent transcript lines of each topic, and runs the relevance check
+# in a background task only when the topic changes or after every N new lines on the same topic, so
+# minutes generation never waits for it. A check still running when the topic moves on is stale and
+# is cancelled.
+import asyncio
+from collections import deque
+
+
+class ContextWindow:
+    """Per-topic ring buffers of transcript lines plus debounced background relevance checks.
+
+    Args:
+        check: Async callable(topic_id, scope, lines) running one relevance check.
+        every_lines: New lines on the same topic that trigger another check.
+        max_lines: Lines kept per topic.
+    """
+
+    def __init__(self, check, every_lines=5, max_lines=20):
+        self.check = check
+        self.every_lines = every_lines
+        self.max_lines = max_lines
+        self.buffers = {}  # Topic id -> deque of recent lines
+        self.current_topic = None
+        self.lines_since_check = 0
+        self.task = None
+        self.task_topic = None
+        self.stats = {"lines": 0, "checks": 0, "cancelled": 0, "errors": 0}
+
+    def lines(self, topic_id):
+        """Recent lines of a topic, oldest first."""
+        return list(self.buffers.get(topic_id, ()))
+
+    def add_line(self, topic_id, scope, line):
+        """Record a line under a topic and start a check if one is due. Never blocks."""
+        buffer = self.buffers.get(topic_id)
+        if buffer is None:
+            buffer = self.buffers[topic_id] = deque(maxlen=self.max_lines)
+        buffer.append(line)
+        self.stats["lines"] += 1
+        self.lines_since_check += 1
+
+        if topic_id != self.current_topic:
+            self.current_topic = topic_id
+            self._start_check(topic_id, scope)
+        elif self.lines_since_check >= self.every_lines and not self._running():
+            # On the same topic a running check is left to finish; the next line starts the new one
+            self._start_check(topic_id, scope)
+
+    def _running(self):
+        return self.task is not None and not self.task.done()
+
+    def _start_check(self, topic_id, scope):
+        if self._running():
+            self.task.cancel()
+            self.stats["cancelled"] += 1
+        self.lines_since_check = 0
+        self.task_topic = topic_id
+        self.task = asyncio.create_task(self._run_check(topic_id, scope, self.lines(topic_id)))
+
+    async def _run_check(self, topic_id, scope, lines):
+        try:
+            await self.check(topic_id, scope, lines)
+            self.stats["checks"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Error checking relevance for topic {topic_id}: {e}")
+
+    async def drain(self):
+        """Wait for the check in flight, if any."""
+        if self.task is not None:
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def close(self):
+        """Cancel the check in flight."""
+        if self._running():
+            self.task.cancel()
+            self.stats["cancelled"] += 1
+        await self.drain()
+        self.task = None
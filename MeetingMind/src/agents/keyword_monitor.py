@@ -0,0 +1,200 @@
+# Local keyword matcher used to gate LLM calls.
+# Builds an Aho-Corasick automaton over word tokens from the agenda titles, the role names and
+# descriptions, and the attendee names. Each transcript line is scanned in one pass. Before any topic
+# is under way, lines with no match (small talk such as "Good. Let's move to the main updates.") can
+# skip the LLM; once a topic is active only filler (acknowledgements with no other content) is skipped,
+# since a continuation rarely repeats the topic's keywords. Lines that name the profile wake it up
+# without asking the LLM.
+import json
+import os
+import re
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+
+from src.models.minutes import Minutes
+
+# Kinds of keyword
+TOPIC = "topic"
+ROLE = "role"
+PERSON = "person"
+
+# Words that carry no signal on their own, including generic meeting vocabulary
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be been before but by can could did do does
+for from get go going got had has have he her here him his how i if in into is it its just let
+like ll make me more most move my no not now of off on one or our out over re s she should so
+some than that the their them then there these they this those to up us ve was we well were what
+when where which who will with would yes you your
+agenda alright business final first good great item last lastly main matter meeting minute next
+noted other point thank thanks today update
+""".split())
+
+# Acknowledgements and pleasantries; a line whose keywords are all in here is filler
+FILLER_WORDS = frozenset("""
+absolutely agree agreed awesome cool correct exactly fine hello indeed morning nice okay perfect right
+sound sure true yeah yep
+""".split())
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_PROPER_NOUN_PATTERN = re.compile(r"(?<![.!?]\s)(?<!^)\b([A-Z][A-Za-z]*(?:\s+[A-Z][A-Za-z]*)*)")
+
+
+def normalize_word(word):
+    """Fold simple plurals so "Elections" matches "election"."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lower-case, accent-free word tokens of text ("Café" becomes "cafe")."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return [normalize_word(word) for word in _WORD_PATTERN.findall(text)]
+
+
+def keywords(text):
+    """Tokens of text that are worth matching on their own."""
+    return [token for token in tokenize(text) if token not in STOPWORDS and len(token) > 2]
+
+
+def is_filler(text):
+    """True if text has no content words besides acknowledgements ("Okay, sounds good.")."""
+    return all(token in FILLER_WORDS for token in keywords(text))
+
+
+@dataclass(slots=True)
+class Signal:
+    """What a transcript line matched; falsy when it matched nothing."""
+    topics: set = field(default_factory=set)  # Agenda item ids
+    roles: set = field(default_factory=set)  # Role names from role_description.json
+    people: set = field(default_factory=set)  # Attendee names, lower-cased
+
+    def __bool__(self):
+        return bool(self.topics or self.roles or self.people)
+
+
+class KeywordMonitor:
+    """Aho-Corasick matcher over word tokens for agenda topics, roles and people.
+
+    Args:
+        minutes: Minutes model whose agenda titles (and attendees) provide keywords.
+        role_descriptions: Role name -> description, as in config/role_description.json.
+        attendees: Names to match; defaults to the minutes' attendees and absences.
+    """
+
+    def __init__(self, minutes, role_descriptions=None, attendees=None):
+        self.agenda = minutes.agenda
+        self.goto = [{}]  # Node -> {token: node}
+        self.fail = [0]
+        self.outputs = [[]]  # Node -> [(kind, value)] of the patterns ending there
+        self.stats = {"lines": 0, "matched": 0}
+
+        for item in self.agenda.items.values():
+            self._add_phrase(item.title, TOPIC, item.id)
+        for role, description in (role_descriptions or {}).items():
+            self._add_phrase(role, ROLE, role)
+        for role, term in self._role_terms(role_descriptions or {}):
+            self._add_pattern([token for token in tokenize(term) if token not in STOPWORDS], ROLE, role)
+        if attendees is None:
+            attendees = list(minutes.attendees) + list(minutes.absences)
+        for name in attendees:
+            self._add_pattern(tokenize(name), PERSON, name.lower())
+        self._build_failure_links()
+
+    @classmethod
+    def from_files(cls, minutes_path=None, role_description_path=None):
+        """Build the monitor from the sample minutes structure and config/role_description.json."""
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        minutes_path = minutes_path or os.path.join(project_root, "tests", "sample_data", "sample_minute_structure.json")
+        role_description_path = role_description_path or os.path.join(project_root, "config", "role_description.json")
+        with open(minutes_path, 'r') as f:
+            minutes = Minutes.from_json(f.read())
+        with open(role_description_path, 'r') as f:
+            role_descriptions = json.load(f)
+        return cls(minutes, role_descriptions)
+
+    @staticmethod
+    def _role_terms(role_descriptions):
+        """Capitalised names in each description ("Careers Fair", "CLIC"), minus those most roles share."""
+        terms = {role: {match.group(1) for match in _PROPER_NOUN_PATTERN.finditer(description)}
+                 for role, description in role_descriptions.items()}
+        counts = {}
+        for role_terms in terms.values():
+            for term in role_terms:
+                counts[term] = counts.get(term, 0) + 1
+        # A name used by most roles (e.g. the society's own) does not point at any of them
+        limit = max(1, len(role_descriptions) // 2)
+        return [(role, term) for role, role_terms in terms.items() for term in role_terms if counts[term] <= limit]
+
+    def _add_phrase(self, phrase, kind, value):
+        """Add a phrase as a whole and each of its keywords."""
+        tokens = [token for token in tokenize(phrase) if token not in STOPWORDS]
+        self._add_pattern(tokens, kind, value)
+        for token in keywords(phrase):
+            self._add_pattern([token], kind, value)
+
+    def _add_pattern(self, tokens, kind, value):
+        if not tokens:
+            return
+        node = 0
+        for token in tokens:
+            next_node = self.goto[node].get(token)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][token] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            node = next_node
+        if (kind, value) not in self.outputs[node]:
+            self.outputs[node].append((kind, value))
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token, 0)
+                # A node also reports every pattern ending at its failure target
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def scan(self, text, count=True):
+        """Return the Signal of a transcript message; count=False leaves stats alone for a second look."""
+        signal = Signal()
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        node = 0
+        for token in tokenize(text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for kind, value in outputs[node]:
+                if kind == TOPIC:
+                    signal.topics.add(value)
+                elif kind == ROLE:
+                    signal.roles.add(value)
+                else:
+                    signal.people.add(value)
+        if count:
+            self.stats["lines"] += 1
+            if signal:
+                self.stats["matched"] += 1
+        return signal
+
+    def mentions(self, signal, profile):
+        """True if the line names the profile directly."""
+        return profile.lower() in signal.people
+
+    def concerns(self, signal, profile, roles=()):
+        """True if the line names the profile, one of its roles, or a topic it speaks on or is relevant to."""
+        if self.mentions(signal, profile) or signal.roles.intersection(roles):
+            return True
+        for item_id in signal.topics:
+            item = self.agenda.get(item_id)
+            if item is not None and (item.speaker == profile or profile in (item.relevance or ())):
+                return True
+        return False
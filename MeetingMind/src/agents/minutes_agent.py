@@ -1,47 +1,104 @@
-import openai
-from dotenv import load_dotenv
 import os
 import json
 import re
 import asyncio
-from copy import deepcopy
+import time
+from collections import deque
 from typing import List, Dict, Any
-from src.services.google_doc_service import append_detail_to_doc
-
-# Load the .env file
-load_dotenv()
-
-# Get the OpenAI API key from the environment variables
-openai.api_key = os.getenv("API_KEY")
+from src.services.doc_writer_service import GoogleDocWriter
+from src.services.snapshot_service import SnapshotWriter, load_snapshot, write_text_atomic
+from src.services.llm_service import estimate_tokens, get_llm_service
+from src.services.telemetry_service import current_trace, get_telemetry
+from src.agents.context_window import ContextWindow
+from src.agents.keyword_monitor import is_filler
+from src.agents.prompt_context import AgendaPromptBuilder
+from src.agents.update_protocol import (
+    NO_UPDATE, UPDATE_MAX_TOKENS, UPDATE_MODEL, UpdateParseError, batch_update_schema, is_null_section,
+    parse_batch_updates, parse_update, repair_messages, response_format_for, update_schema, validate_update
+)
+from src.models.agenda import Agenda
+from src.models.minutes import Minutes
 
 class MinutesAgent:
-    def __init__(self, name="MinutesAgent", google_doc_id = None, context_agent=None):
+    def __init__(self, name="MinutesAgent", google_doc_id = None, context_agent=None,
+                 batch_mode=False, max_batch_lines=20, max_batch_tokens=1500, max_batch_wait=0.0,
+                 output_path=None, llm=None, recent_details=5, doc_writer=None,
+                 snapshot_interval=1.0, journal_path=None, keyword_monitor=None, relevance_service=None,
+                 listen_in_every_lines=5, context_lines=20, latency_window=1000, max_update_retries=1,
+                 pipeline_depth=1, minutes=None, model=UPDATE_MODEL, temperature=0):
         self.name = name
+        self.llm = llm or get_llm_service()  # Shared async LLM client
+        self.model = model  # Older models get JSON mode or a prompt-only request instead of the schema
+        self.temperature = temperature  # 0: sampling noise only adds parse failures and retries
+        self.prompt_builder = AgendaPromptBuilder(recent_details=recent_details)  # Compact agenda context
+        self.prompt_tokens_log = []  # Prompt tokens of every LLM call, in order
+        # Updates are schema-constrained JSON; unparseable answers get max_update_retries repair attempts
+        self.max_update_retries = max_update_retries
+        self.update_schema = None
+        self.update_schema_key = None
+        self.batch_schema = None
+        self.batch_schema_key = None
+        self.parse_stats = {"null_updates": 0, "parse_failures": 0, "retries": 0, "dropped": 0}
+        # Local keyword matcher; lines without a keyword match skip the LLM
+        self.keyword_monitor = keyword_monitor
+        self.skipped_lines = 0
         self.processing_lock = asyncio.Lock()  # Lock for synchronizing updates
         self.transcript_queue = asyncio.Queue()  # Queue for transcript lines
         self.processing_task = None  # Task for processing the queue
+        self.enqueued_at = {}  # id(line) -> (perf_counter() when the line was queued, its trace id)
+        self.telemetry = get_telemetry()
+        self.line_latencies = deque(maxlen=latency_window)  # Line queued -> minutes updated, in seconds
         self.google_doc_id = google_doc_id
+        # Details are queued to the doc writer and flushed to the Google Doc in batches
+        self.doc_writer = doc_writer or (GoogleDocWriter(google_doc_id) if google_doc_id else None)
         self.current_scope = None
+
+        # Adaptive batching: drain whatever is queued (up to the budgets) into one LLM call
+        self.batch_mode = batch_mode
+        self.max_batch_lines = max_batch_lines  # Maximum transcript lines per request
+        self.max_batch_tokens = max_batch_tokens  # Estimated transcript tokens per request
+        self.max_batch_wait = max_batch_wait  # Seconds to wait for more lines after the first one
+        # Pipelined mode (single lines only): up to pipeline_depth LLM requests in flight for consecutive
+        # lines, each built on the agenda snapshot of its dispatch, committed strictly in transcript order
+        self.pipeline_depth = pipeline_depth
+        # conflicts: updates replayed because the minutes moved on; null_reasks: "no update" answers
+        # replayed because the line may continue the topic an earlier line moved to
+        self.pipeline_stats = {"speculated": 0, "committed": 0, "conflicts": 0, "null_reasks": 0, "max_in_flight": 0}
         # Get the project root directory
         self.project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         # self.prev_minutes_structure = None
-        # self.minutes_structure = None
+        self.minutes = None  # Minutes model; serialised to the JSON shape only for snapshots
 
         self.context_agent = context_agent
+        self.relevance_service = relevance_service  # Listen-in decisions for every attendee
+        # Recent lines per topic; listen-in checks run in the background on a topic change or every N lines
+        self.context_window = ContextWindow(
+            self._check_listen_in, every_lines=listen_in_every_lines, max_lines=context_lines
+        ) if context_agent or relevance_service else None
 
         self.current_topic_start_timestamp = None  # Track the starting timestamp of the current topic
+        self.topic_starts = []  # Every topic change in order, for chunking the transcript by topic
         self.current_timestamp = None  # Track the current timestamp
         
         # Set paths for files
         self.sample_minute_path = os.path.join(
             self.project_root, "tests", "sample_data", "sample_minute_structure.json"
         )
-        self.output_path = os.path.join(
+        self.output_path = output_path or os.path.join(
             self.project_root, "final_minutes.json"
         )
         
-        # Load the initial minutes structure
-        self.load_minutes_structure()
+        # Minutes are written by a background snapshotter rather than after every update
+        self.snapshotter = SnapshotWriter(
+            self.output_path, self.get_minutes, interval=snapshot_interval, journal_path=journal_path
+        )
+
+        # Load the initial minutes structure unless the caller already has it
+        if minutes is not None:
+            self.minutes = minutes
+        else:
+            self.load_minutes_structure()
+        self.snapshotter.mark_dirty()
         
         # Start the background processing task
         self.start_processing()
@@ -50,181 +107,436 @@ class MinutesAgent:
         """Load the initial minutes structure from the sample file."""
         try:
             with open(self.sample_minute_path, 'r') as f:
-                self.minutes_structure = json.load(f)
-            
-            # Save the initial structure to the output file
-            self.save_minutes()
+                self.minutes = Minutes.from_json(f.read())
             print(f"Loaded minutes structure from {self.sample_minute_path}")
         except Exception as e:
             print(f"Error loading minutes structure: {e}")
-            self.minutes_structure = {}
+            self.minutes = Minutes(agenda=Agenda({}))
     
     def start_processing(self):
         """Start the background task to process queued transcript lines."""
-        self.processing_task = asyncio.create_task(self.process_queue())
+        pipelined = self.pipeline_depth > 1 and not self.batch_mode
+        self.processing_task = asyncio.create_task(self.process_queue_pipelined() if pipelined else self.process_queue())
+        self.telemetry.set_gauge("minutes_queue_depth", self.transcript_queue.qsize, agent=self.name)
+        # The initial structure is written by the snapshotter, off the constructor's path
+        self.snapshotter.start(snapshot_now=True)
+        if self.doc_writer:
+            self.doc_writer.start()
     
     async def process_queue(self):
-        """Process transcript lines from the queue one at a time."""
+        """Process transcript lines from the queue, one at a time or in batches."""
         while True:
+            # Get the next transcript line from the queue
+            transcript_line = await self.transcript_queue.get()
+            batch = [transcript_line]
             try:
-                # Get the next transcript line from the queue
-                transcript_line = await self.transcript_queue.get()
-                
-                # Process the transcript line
-                await self._process_transcript_line(transcript_line)
-                
-                # Mark the task as done
-                self.transcript_queue.task_done()
-                
+                if self.batch_mode:
+                    batch.extend(await self._drain_batch(transcript_line))
+
+                # A batch is traced under its first line
+                with self.telemetry.span("minutes.process", self._dequeued(batch), lines=len(batch)):
+                    # Process the transcript line(s)
+                    if len(batch) == 1:
+                        await self._process_transcript_line(transcript_line)
+                    else:
+                        await self._process_transcript_batch(batch)
+
+                    self._track_context(batch)
+
             except Exception as e:
                 print(f"Error processing transcript line: {e}")
-                continue
+            finally:
+                # Mark every line of the batch as done
+                self._finish_lines(batch)
+
+    def _trace_of(self, line):
+        return self.enqueued_at.get(id(line), (None, None))[1]
+
+    def _dequeued(self, lines):
+        """Record how long the lines waited in transcript_queue; returns the trace id of the first."""
+        now = time.perf_counter()
+        for line in lines:
+            enqueued, trace_id = self.enqueued_at.get(id(line), (now, None))
+            self.telemetry.record_span("minutes.queue_wait", enqueued, now, trace_id)
+        return self._trace_of(lines[0])
+
+    def _finish_lines(self, lines):
+        """Record line-to-minutes latency and mark the lines done in the queue."""
+        finished = time.perf_counter()
+        for line in lines:
+            entry = self.enqueued_at.pop(id(line), None)
+            if entry is not None:
+                latency = finished - entry[0]
+                self.line_latencies.append(latency)
+                self.telemetry.observe("line_latency_seconds", latency)
+            self.transcript_queue.task_done()
+
+    async def process_queue_pipelined(self):
+        """Keep up to pipeline_depth LLM requests in flight for consecutive lines; commit results in order."""
+        in_flight = deque()  # (line, request task or None if the line needs no LLM call, topic at dispatch)
+        getter = None
+        try:
+            while True:
+                # Commit every finished result at the head, strictly in transcript order
+                while in_flight and (in_flight[0][1] is None or in_flight[0][1].done()):
+                    await self._commit_speculative(*in_flight.popleft())
+
+                if getter is None and len(in_flight) < self.pipeline_depth:
+                    getter = asyncio.ensure_future(self.transcript_queue.get())
+                waits = [getter] if getter is not None else []
+                if in_flight:
+                    waits.append(in_flight[0][1])
+                done, _ = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+
+                if getter in done:
+                    in_flight.append(self._speculate(getter.result()))
+                    getter = None
+                    self.pipeline_stats["max_in_flight"] = max(self.pipeline_stats["max_in_flight"], len(in_flight))
+        finally:
+            if getter is not None:
+                getter.cancel()
+            for _, task, _ in in_flight:
+                if task is not None:
+                    task.cancel()
+
+    @staticmethod
+    def _topic_key(topic):
+        return (topic.get("section"), topic.get("subsection")) if topic else None
+
+    def _speculate(self, transcript_line):
+        """Start the LLM request for a line on the current agenda snapshot."""
+        trace_id = self._dequeued([transcript_line])
+        if not self._has_signal(transcript_line):
+            return transcript_line, None, None
+        self.pipeline_stats["speculated"] += 1
+        topic = self.current_topic_start_timestamp
+        message = f"{transcript_line['speaker']}: {transcript_line['message']}"
+        # The request task copies the context, so its LLM spans land in the line's trace
+        with self.telemetry.use_trace(trace_id):
+            task = asyncio.create_task(self.generate_agenda_update_async(message, self.minutes, current_topic=topic))
+        return transcript_line, task, topic
+
+    def _conflicts(self, update, topic, transcript_line):
+        """True if a speculative update no longer fits the minutes it will be committed to.
+
+        It must still validate against the agenda, and if an earlier line moved the current topic after
+        the request was sent, only an update to the new current topic is kept as is. A null update is
+        kept unless the new topic's context could turn it into an update (see _may_continue).
+        """
+        if update["section"] is not None:
+            try:
+                validate_update(update, self.minutes.agenda)
+            except UpdateParseError:
+                return True
+        current = self._topic_key(self.current_topic_start_timestamp)
+        if self._topic_key(topic) == current:
+            return False
+        if update["section"] is None:
+            return self._may_continue(transcript_line)
+        return (update["section"], update["subsection"]) != current
+
+    def _may_continue(self, transcript_line):
+        """True if a line answered "no update" could belong to the current topic once it is in the prompt.
+
+        Filler stays null whatever the topic, and so does a line that names only other agenda items;
+        anything else may be a continuation of the current topic.
+        """
+        message = transcript_line['message']
+        if is_filler(message):
+            return False
+        if self.keyword_monitor is None:
+            return True
+        topics = self.keyword_monitor.scan(message, count=False).topics
+        return not topics or bool(topics.intersection(self._topic_key(self.current_topic_start_timestamp)))
+
+    async def _commit_speculative(self, transcript_line, task, topic):
+        try:
+            if task is None:
+                return
+            update = await task
+            with self.telemetry.span("minutes.commit", self._trace_of(transcript_line)):
+                async with self.processing_lock:
+                    if self._conflicts(update, topic, transcript_line):
+                        # Built on a stale snapshot: ask again with the minutes as they are now
+                        self.pipeline_stats["null_reasks" if update["section"] is None else "conflicts"] += 1
+                        message = f"{transcript_line['speaker']}: {transcript_line['message']}"
+                        update = await self.generate_agenda_update_async(message, self.minutes)
+                    self._apply_update(update, transcript_line)
+                    self.pipeline_stats["committed"] += 1
+                self._track_context([transcript_line])
+        except Exception as e:
+            print(f"Error processing transcript line: {e}")
+        finally:
+            self._finish_lines([transcript_line])
+
+    async def _drain_batch(self, first_line):
+        """Collect queued lines after first_line until the line, token or time budget is spent."""
+        extra = []
+        tokens = estimate_tokens(first_line['message'])
+        deadline = time.monotonic() + self.max_batch_wait
+
+        while len(extra) + 1 < self.max_batch_lines:
+            try:
+                line = self.transcript_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    line = await asyncio.wait_for(self.transcript_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            extra.append(line)
+            tokens += estimate_tokens(line['message'])
+            if tokens >= self.max_batch_tokens:
+                break
+        return extra
     
     async def update(self, transcript_line):
         """Called when a new transcript line is added. Adds the line to the processing queue."""
         print(f"{self.name} received: {transcript_line['speaker']} said: {transcript_line['message']}")
         
         # Add to the processing queue instead of processing immediately
+        self.enqueued_at[id(transcript_line)] = (time.perf_counter(), current_trace.get())
         await self.transcript_queue.put(transcript_line)
     
+    def _has_signal(self, transcript_line):
+        """True if the line is worth an LLM call (always, without a keyword monitor).
+
+        Lines without an agenda, role or attendee keyword are skipped only while no topic is active;
+        under an active topic only filler is skipped, so continuations keep their context.
+        """
+        message = transcript_line['message']
+        if self.keyword_monitor is None or self.keyword_monitor.scan(message):
+            return True
+        if self.current_topic_start_timestamp is not None and not is_filler(message):
+            return True
+        self.skipped_lines += 1
+        return False
+
     async def _process_transcript_line(self, transcript_line):
         """Process a single transcript line - called from the queue processor."""
+        if not self._has_signal(transcript_line):
+            return
+
         # Generate agenda update using OpenAI
         transcript_message = f"{transcript_line['speaker']}: {transcript_line['message']}"
         
         # Use the lock to ensure only one update is processed at a time
         async with self.processing_lock:
-            update = await self.generate_agenda_update_async(transcript_message, self.minutes_structure)
+            update = await self.generate_agenda_update_async(transcript_message, self.minutes)
             
             # Process the update and modify the minutes structure if needed
-            if update and isinstance(update, dict) and update.get("section") is not None and update.get("details"):
+            self._apply_update(update, transcript_line)
+
+    async def _process_transcript_batch(self, transcript_lines):
+        """Process several queued transcript lines with a single LLM call."""
+        transcript_lines = [line for line in transcript_lines if self._has_signal(line)]
+        if not transcript_lines:
+            return
+        transcript_messages = [f"{line['speaker']}: {line['message']}" for line in transcript_lines]
 
-                self.update_minutes_structure(update, transcript_line['timestamp'])
-                 # Update Google Doc with the new detail
-                self.update_google_doc(
-                    update.get("section"), 
-                    update.get("subsection"), 
-                    update.get("details")
-                )
+        async with self.processing_lock:
+            updates = await self.generate_agenda_batch_update_async(transcript_messages, self.minutes)
 
-                # Save the updated structure
-                self.save_minutes()
+            # Apply updates in transcript order, each with the timestamp of its own line
+            for update in sorted(updates, key=lambda u: u.get("line", 0)):
+                index = update.get("line")
+                if not isinstance(index, int) or not 0 <= index < len(transcript_lines):
+                    continue
+                self._apply_update(update, transcript_lines[index])
 
-                should_listen_in = await self.context_agent.should_listen_in(self.current_scope)
-                if should_listen_in:
-                    print("Adi should listen in!")
+    def _apply_update(self, update, transcript_line):
+        """Apply one section/subsection update (from transcript_line) to the minutes and the Google Doc."""
+        if not (update and isinstance(update, dict) and update.get("section") is not None and update.get("details")):
+            return False
 
-    
-    async def generate_agenda_update_async(self, transcript_message, last_agenda):
-        """Async version of generate_agenda_update."""
-        messages = [
-            {"role": "system", "content": "You are an assistant helping to organize a meeting minutes based on the latest transcript."},
-            {"role": "user", "content": f"""
-            The meeting agenda structure is as follows:
-            {json.dumps(last_agenda, indent=2)}
-
-            The latest transcript message is:
-            {transcript_message}
-
-            Your task is to:
-            1. Identify IF the section or subsection in the agenda corresponds to the transcript.
-            2. ONLY if the transcript contains relevant information, update that section/subsection.
-            3. The updated content should be a summary of detailed extracted from the transcript message.
-                Each updated content will be added to a running list of details for that section/subsection.
-            4. Return ONLY a JSON object in this format:
-            {{
-                "section": "2", 
-                "subsection": "2.1", // only include if updating a subsection
-                "details": "Updated content" // Single, specific point from the transcript message
-            }}
-
-            If the transcript doesn't contain any information relevant to the agenda, return:
-            {{
-                "section": null,
-                "details": null
-            }}
-            """}
-        ]
-
-        # Use asyncio to run the OpenAI call asynchronously
-        response = await asyncio.to_thread(
-            openai.chat.completions.create,
-            model="gpt-4",  # You can use gpt-4 or gpt-3.5-turbo
-            messages=messages,
-            temperature=0.7,
-            max_tokens=300
+        with self.telemetry.span("minutes.update_structure"):
+            if not self.update_minutes_structure(update, transcript_line['timestamp'], transcript_line.get('index')):
+                return False
+        # Update Google Doc with the new detail
+        self.update_google_doc(
+            update.get("section"), 
+            update.get("subsection"), 
+            update.get("details")
         )
+        return True
 
-        content = response.choices[0].message.content.strip()
-        
-        # Extract JSON from response
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
+    def _track_context(self, transcript_lines):
+        """Add processed lines to the current topic's context window."""
+        if self.context_window is None or self.current_scope is None:
+            return
+        for line in transcript_lines:
+            self.context_window.add_line(self.current_scope.id, self.current_scope, line)
+
+    async def _check_listen_in(self, topic_id, scope, transcript_lines):
+        """Ask the context agent (and the relevance service) whether to join the topic. Runs in the background."""
+        transcript = "\n".join(line['message'] for line in transcript_lines)
+        with self.telemetry.span("context.check", topic=topic_id):
+            if self.relevance_service:
+                await self.relevance_service.evaluate(topic_id, scope.to_dict(), transcript)
+            if not self.context_agent:
+                return
+            should_listen_in = await self.context_agent.should_listen_in(scope.to_dict(), transcript=transcript)
+        if should_listen_in:
+            print(f"{self.context_agent.profile} should listen in!")
+
+    async def _complete(self, messages, max_tokens=300, **kwargs):
+        """Send a chat completion request and return the stripped response text."""
+        response = await self.llm.complete(
+            messages,
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        # Track prompt size per call so we can check it stays flat as the meeting grows
+        self.prompt_tokens_log.append(response.prompt_tokens)
+        print(f"{self.name} LLM call #{len(self.prompt_tokens_log)}: {response.prompt_tokens} prompt tokens")
+        return response.content.strip()
+
+    def _update_schema(self, agenda):
+        """response_format for the agenda and model, rebuilt only when the agenda changes."""
+        key = (id(agenda), len(agenda))
+        if key != self.update_schema_key:
+            self.update_schema = response_format_for(self.model, update_schema(agenda))
+            self.update_schema_key = key
+        return self.update_schema
+
+    def _batch_schema(self, agenda):
+        key = (id(agenda), len(agenda))
+        if key != self.batch_schema_key:
+            self.batch_schema = response_format_for(self.model, batch_update_schema(agenda))
+            self.batch_schema_key = key
+        return self.batch_schema
+
+    @staticmethod
+    def _format_kwargs(response_format):
+        return {"response_format": response_format} if response_format is not None else {}
+
+    async def generate_agenda_update_async(self, transcript_message, last_agenda, current_topic=None):
+        """Ask for the section/subsection update of one transcript message.
+
+        current_topic overrides the agent's current topic in the prompt (pipelined mode sends the
+        topic the request was dispatched on).
+
+        Returns a validated update, or NO_UPDATE when nothing in the message is relevant or the answer
+        could not be parsed even after max_update_retries repair attempts.
+        """
+        task = f"""The latest transcript message is:
+{transcript_message}
+
+If the message contains information relevant to a section or subsection of the agenda, answer with that
+section id, the subsection id (or null) and one specific point summarising the message, which will be
+added to the running list of details for that item:
+{{"section": "2", "subsection": "2.1", "details": "Single, specific point from the message"}}
+
+Otherwise answer:
+{{"section": null, "subsection": null, "details": null}}
+
+Reply with only the JSON object."""
+        if current_topic is None:
+            current_topic = self.current_topic_start_timestamp
+        messages = self.prompt_builder.build_messages(last_agenda, current_topic, task)
+        agenda = last_agenda.agenda
+
+        for attempt in range(self.max_update_retries + 1):
+            # Streamed, so a "section": null answer ends the request after a few tokens
+            content = await self._complete(messages, max_tokens=UPDATE_MAX_TOKENS,
+                                           stop_when=is_null_section,
+                                           **self._format_kwargs(self._update_schema(agenda)))
             try:
-                update_json = json.loads(json_match.group())
-                return update_json
-            except json.JSONDecodeError:
-                print("Error decoding JSON from OpenAI response")
-                return {"section": None, "details": None}
-        else:
-            return {"section": None, "details": None}
+                update = parse_update(content, agenda)
+            except UpdateParseError as e:
+                self.parse_stats["parse_failures"] += 1
+                print(f"Invalid minutes update ({e}): {content[:80]!r}")
+                if attempt < self.max_update_retries:
+                    self.parse_stats["retries"] += 1
+                    messages = repair_messages(messages, content, e)
+                continue
+            if update["section"] is None:
+                self.parse_stats["null_updates"] += 1
+            return update
+
+        self.parse_stats["dropped"] += 1
+        return dict(NO_UPDATE)
+
+    async def generate_agenda_batch_update_async(self, transcript_messages, last_agenda):
+        """Generate agenda updates for several transcript messages in one request.
+
+        Returns a list of updates, each tagged with the index of the line it came from. Answers that
+        cannot be parsed get the same max_update_retries repair attempts as single updates.
+        """
+        numbered_lines = "\n".join(f"[{i}] {message}" for i, message in enumerate(transcript_messages))
+        task = f"""The latest transcript messages, in order, are:
+{numbered_lines}
+
+Your task is to:
+1. For EACH numbered message, identify IF a section or subsection in the agenda corresponds to it.
+2. ONLY if a message contains relevant information, produce an update for that section/subsection.
+3. The updated content should be a summary of detailed extracted from that transcript message.
+    Each updated content will be added to a running list of details for that section/subsection.
+4. Return ONLY a JSON object in this format, omitting messages with nothing relevant:
+{{"updates": [{{"line": 0, "section": "2", "subsection": "2.1", "details": "Single, specific point from that message"}}]}}
+
+"line" is the index of the transcript message, "subsection" is null when the update is for the section
+itself, and "details" is one specific point from that message.
+
+If no message contains information relevant to the agenda, return:
+{{"updates": []}}"""
+        messages = self.prompt_builder.build_messages(last_agenda, self.current_topic_start_timestamp, task)
+        agenda = last_agenda.agenda
+        response_format = self._format_kwargs(self._batch_schema(agenda))
+
+        for attempt in range(self.max_update_retries + 1):
+            # Allow roughly one short update per line
+            content = await self._complete(messages, max_tokens=min(4000, 100 * len(transcript_messages) + 100),
+                                           **response_format)
+            try:
+                updates, invalid = parse_batch_updates(content, agenda)
+            except UpdateParseError as e:
+                self.parse_stats["parse_failures"] += 1
+                print(f"Invalid minutes batch update ({e}): {content[:80]!r}")
+                if attempt < self.max_update_retries:
+                    self.parse_stats["retries"] += 1
+                    messages = repair_messages(messages, content, e)
+                continue
+            self.parse_stats["parse_failures"] += invalid
+            return updates
+
+        self.parse_stats["dropped"] += 1
+        return []
     
-    def update_minutes_structure(self, update, timestamp):
-        """Update the minutes structure with the new information."""
+    def update_minutes_structure(self, update, timestamp, line_index=None):
+        """Update the minutes structure with the new information. Returns True if a detail was added.
+
+        line_index is the line's position in the transcript (TranscriptProcessor adds it as "index"); it is
+        recorded with topic changes so the transcript can be split by topic without matching timestamps.
+        """
         section = update.get("section")
         subsection = update.get("subsection", None)
         details = update.get("details", "")
 
-        self.prev_minutes_structure = deepcopy(self.minutes_structure)
-        
-        # Skip updating if section is missing or details is empty
-        if not section or section not in self.minutes_structure["agenda"] or not details:
-            return
-        
-        self.current_scope = self.minutes_structure["agenda"][section]
-            
+        # Skip updating if details is empty or the section/subsection is not on the agenda
+        if not section or not details:
+            return False
+        item = self.minutes.add_detail(section, subsection, details)
+        if item is None:
+            return False
+
+        self.current_scope = item
         if not subsection:
-            # Update main section
-            if "details" not in self.minutes_structure["agenda"][section]:
-                self.minutes_structure["agenda"][section]["details"] = [details]
-            elif isinstance(self.minutes_structure["agenda"][section]["details"], list):
-                self.minutes_structure["agenda"][section]["details"].append(details)
-            else:
-                # Handle empty string case
-                existing_details = self.minutes_structure["agenda"][section]["details"]
-                if existing_details == "":
-                    self.minutes_structure["agenda"][section]["details"] = [details]
-                else:
-                    self.minutes_structure["agenda"][section]["details"] = [existing_details, details]
             print(f"Added point to section {section}: {details[:30]}...")
         else:
-            # Handle nested subsections
-            section_data = self.minutes_structure["agenda"][section]
-            
-            # Check if the section has subsections
-            if "subsections" not in section_data:
-                return
-                    
-            # Check if the exact subsection exists
-            if subsection in section_data["subsections"]:
-                subsection_data = section_data["subsections"][subsection]
-                if "details" not in subsection_data:
-                    subsection_data["details"] = [details]
-                elif isinstance(subsection_data["details"], list):
-                    subsection_data["details"].append(details)
-                else:
-                    # Handle empty string case
-                    existing_details = subsection_data["details"]
-                    if existing_details == "":
-                        subsection_data["details"] = [details]
-                    else:
-                        subsection_data["details"] = [existing_details, details]
-                print(f"Added point to subsection {section}.{subsection}: {details[:30]}...")
-            self.current_scope = section_data["subsections"][subsection]
+            print(f"Added point to subsection {section}.{subsection}: {details[:30]}...")
+
+        # The snapshotter writes the minutes in the background; the delta goes to its journal
+        self.snapshotter.mark_dirty({"section": section, "subsection": subsection, "details": details})
 
         # Update the current topic start timestamp if starting a new section or subsection
         if not self.current_topic_start_timestamp or section != self.current_topic_start_timestamp.get("section") or subsection != self.current_topic_start_timestamp.get("subsection"):
             self.current_topic_start_timestamp = {"section": section, "subsection": subsection, "timestamp": timestamp}
+            self.topic_starts.append({**self.current_topic_start_timestamp, "index": line_index})
         
         # Update the current timestamp
         self.current_timestamp = timestamp
@@ -248,89 +560,92 @@ class MinutesAgent:
             print(f"The relevance for the next section/subsection is: {next_relevance}")
         else:
             print("No relevance found for the next section/subsection.")
+        return True
 
-        
     def get_next_state(self):
         """Compute the next section/subsection index, name, speaker, and relevance."""
         
         # Ensure the current section and subsection are available
         if not self.current_topic_start_timestamp:
             print("No current topic timestamp available.")
-            return None, None, None, None, None  # Return None for index, name, speaker, and relevance
+            return None, None, None, None  # Return None for index, name, speaker, and relevance
         
-        current_section = self.current_topic_start_timestamp.get("section")
-        current_subsection = self.current_topic_start_timestamp.get("subsection")
-        
-        # Ensure 'agenda' exists in the minutes structure
-        if "agenda" not in self.minutes_structure:
-            print("No agenda structure found.")
-            return None, None, None, None, None  # Return None if no agenda structure
-        
-        # Get the agenda and prepare a list for sorting
-        agenda = self.minutes_structure["agenda"]
-        combined_items = []
-
-        # Populate the list with sections and/or subsections
-        for section_key, section in agenda.items():
-            if "subsections" in section and section["subsections"]:
-                # If the section has subsections, include only the subsections
-                for subsection_key, subsection in section["subsections"].items():
-                    combined_items.append((int(section_key), float(subsection_key), subsection, subsection_key))  
-                    # (Section Int, Subsection Float, Subsection Data, Subsection Index)
-            else:
-                # If the section has no subsections, include the section itself
-                combined_items.append((int(section_key), None, section, None))  
-                # (Section Int, None, Section Data, None)
-
-        # Sort the list: First by section, then by subsection (placing main sections before subsections)
-        combined_items = sorted(combined_items, key=lambda x: (x[0], x[1] if x[1] is not None else 0))
-
-        # Flag to indicate if we found the current section/subsection
-        found_current = False
-
-        # Iterate over the sorted items
-        for section_key, subsection_key, item_data, subsection_index in combined_items:
-            # If we have already found the current section/subsection, return the next one
-            if found_current:
-                next_index = f"{section_key}.{subsection_index}" if subsection_index is not None else str(section_key)
-                next_name = item_data.get("title")  # Fetch section or subsection name
-                next_speaker = item_data.get("speaker")
-                next_relevance = item_data.get("relevance", [])
-                return next_index, next_name, next_speaker, next_relevance
-            
-            # Check if this section/subsection matches the current one
-            if str(section_key) == current_section and (str(subsection_key) == current_subsection or current_subsection is None):
-                found_current = True
+        current = self.minutes.agenda.get_topic(self.current_topic_start_timestamp.get("section"),
+                                                self.current_topic_start_timestamp.get("subsection"))
+        if current is None:
+            print("Current topic is not on the agenda.")
+            return None, None, None, None
+
+        # Topics are linked in meeting order when the agenda is loaded
+        next_item = current.next_topic
+        if next_item is None:
+            print("No next section or subsection found.")
+            return None, None, None, None  # Return None if no next section/subsection found
 
-        print("No next section or subsection found.")
-        return None, None, None, None, None  # Return None if no next section/subsection found
+        return next_item.id, next_item.title, next_item.speaker, next_item.relevance or []
 
 
     def update_google_doc(self, section, subsection, details):
-        """Update the Google Doc with a newly added detail."""
-        if not hasattr(self, 'google_doc_id') or not self.google_doc_id:
+        """Queue a newly added detail for the Google Doc."""
+        if not self.doc_writer:
             return
         
         # Determine the section identifier
         section_id = f"{section}." if not subsection else subsection
-        
-        try:
-            append_detail_to_doc(self.google_doc_id, section_id, details)
-        except Exception as e:
-            print(f"Error updating Google Doc: {e}")
+        self.doc_writer.append_detail(section_id, details)
+
+    async def drain(self):
+        """Wait until every queued transcript line and the listen-in check in flight are processed."""
+        await self.transcript_queue.join()
+        if self.context_window:
+            await self.context_window.drain()
+
+    async def close(self, drain=True):
+        """Stop the queue worker, then write the final minutes snapshot and any details still waiting for the Google Doc.
+
+        With drain=True the lines already queued are processed first; otherwise they are dropped.
+        """
+        if self.processing_task and not self.processing_task.done():
+            if drain:
+                await self.transcript_queue.join()
+            self.processing_task.cancel()
+            await asyncio.gather(self.processing_task, return_exceptions=True)
+        self.telemetry.remove_gauge("minutes_queue_depth", agent=self.name)
+        if self.context_window:
+            if drain:
+                await self.context_window.drain()
+            else:
+                await self.context_window.close()
+        await self.snapshotter.close()
+        if self.doc_writer:
+            await self.doc_writer.close()
     
     def save_minutes(self):
-        """Save the current minutes structure to a file."""
+        """Save the current minutes structure to a file immediately (atomic write)."""
         try:
-            with open(self.output_path, 'w') as f:
-                json.dump(self.minutes_structure, f, indent=2)
-
+            write_text_atomic(self.output_path, self.minutes.to_json())
         except Exception as e:
             print(f"Error saving minutes: {e}")
+
+    def restore_minutes(self):
+        """Recover the minutes after a crash from the last snapshot plus the delta journal."""
+        state, deltas, last_seq = load_snapshot(self.output_path, self.snapshotter.journal_path)
+        if state is None and not deltas:
+            return False
+        if state is not None:
+            self.minutes = Minutes.from_dict(state)
+        # Without a snapshot (a crash before the first one) the journal replays onto the template
+        # Continue the journal's sequence and rewrite the snapshot on the next pass
+        self.snapshotter.seq = last_seq
+        self.snapshotter.mark_dirty()
+        for delta in deltas:
+            self.minutes.add_detail(delta["section"], delta.get("subsection"), delta["details"])
+        print(f"Restored minutes from {self.output_path} and {len(deltas)} journalled updates")
+        return True
     
     def get_minutes(self):
-        """Return the generated minutes."""
-        return self.minutes_structure
+        """Return the generated minutes in their JSON shape."""
+        return self.minutes.to_dict()
     
     def get_current_topic(self):
         return self.current_scope
@@ -0,0 +1,167 @@
+# Non-blocking Discord notifications for attendees who should listen in.
+# notify() only records the notification: the same (recipient, key) is not repeated within the dedupe
+# window, and a recipient is not pinged more than once per cooldown. A background sender waits a short
+# batch window so a burst of notifications goes out as one message, and messages that fail are kept
+# in a retry queue, in order, until they are sent or run out of attempts.
+import asyncio
+import random
+import time
+from collections import deque
+
+from src.services.discord_service import DISCORD_MESSAGE_LIMIT, DiscordError, DiscordWebhook
+from src.services.telemetry_service import get_telemetry
+
+
+class NotifyAgent:
+    """Batches, dedupes and delivers notifications through a Discord webhook.
+
+    Args:
+        webhook: DiscordWebhook; defaults to one for DISCORD_WEBHOOK_URL.
+        batch_window: Seconds to wait after the first notification of a burst before sending.
+        dedupe_window: Seconds during which the same (recipient, key) is dropped.
+        cooldown: Minimum seconds between two messages mentioning the same recipient; notifications
+            arriving during the cooldown are held and merged into the next message.
+        mentions: Optional name -> Discord user id, so recipients are @-mentioned.
+        max_retries: Attempts per message after the first.
+        base_delay: Backoff for failures that come without a retry_after.
+        name: Label of the agent's metrics.
+    """
+
+    def __init__(self, webhook=None, batch_window=1.0, dedupe_window=300.0, cooldown=30.0, mentions=None,
+                 max_retries=5, base_delay=1.0, name="NotifyAgent"):
+        self.name = name
+        self.webhook = webhook or DiscordWebhook()
+        self.batch_window = batch_window
+        self.dedupe_window = dedupe_window
+        self.cooldown = cooldown
+        self.mentions = mentions or {}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.pending = {}  # Recipient -> messages waiting to be merged, in arrival order
+        self.last_seen = {}  # (recipient, key) -> time.monotonic() it was accepted, oldest first
+        self.last_sent = {}  # Recipient -> time.monotonic() of the last message mentioning them
+        self.outbox = deque()  # [content, attempts]; failed messages stay at the front
+        self.wakeup = asyncio.Event()
+        self.send_lock = asyncio.Lock()
+        self.task = None
+        self.stats = {"notifications": 0, "deduped": 0, "messages": 0, "sent": 0, "retries": 0, "failed": 0}
+        self.telemetry = get_telemetry()
+        self.telemetry.set_gauge("notify_outbox_depth", self.outbox.__len__, agent=self.name)
+
+    def notify(self, recipient, message, key=None):
+        """Queue a notification. Never blocks; returns False if it was a duplicate."""
+        now = time.monotonic()
+        self._forget_expired(now)
+        dedupe_key = (recipient, key if key is not None else message)
+        if dedupe_key in self.last_seen:
+            self.stats["deduped"] += 1
+            return False
+        self.last_seen[dedupe_key] = now
+        self.pending.setdefault(recipient, []).append(message)
+        self.stats["notifications"] += 1
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        self.wakeup.set()
+        return True
+
+    def _forget_expired(self, now):
+        # Keys are only added when absent, so last_seen is in acceptance order and expired keys are in front
+        while self.last_seen:
+            key = next(iter(self.last_seen))
+            if now - self.last_seen[key] < self.dedupe_window:
+                break
+            del self.last_seen[key]
+
+    async def on_relevance(self, name, relevant, scope_id):
+        """RelevanceService subscriber: notify an attendee who should now listen in."""
+        if relevant:
+            self.notify(name, f"should listen in on {scope_id}", key=scope_id)
+
+    def _label(self, recipient):
+        user_id = self.mentions.get(recipient)
+        return f"<@{user_id}>" if user_id else f"**{recipient}**"
+
+    def _merge_pending(self, force=False):
+        """Move the notifications of recipients out of cooldown into outbox messages.
+
+        Returns seconds until the next held recipient leaves cooldown, or None.
+        """
+        now = time.monotonic()
+        lines = []
+        next_ready = None
+        for recipient in list(self.pending):
+            ready_at = self.last_sent.get(recipient, float("-inf")) + self.cooldown
+            if now < ready_at and not force:
+                wait = ready_at - now
+                next_ready = wait if next_ready is None else min(next_ready, wait)
+                continue
+            lines.append(f"{self._label(recipient)}: " + "; ".join(self.pending.pop(recipient)))
+            self.last_sent[recipient] = now
+
+        # One message per burst, split only where it would exceed Discord's length limit
+        messages = []
+        for line in lines:
+            line = line[:DISCORD_MESSAGE_LIMIT]
+            if messages and len(messages[-1]) + 1 + len(line) <= DISCORD_MESSAGE_LIMIT:
+                messages[-1] += "\n" + line
+            else:
+                messages.append(line)
+        self.outbox.extend([content, 0] for content in messages)
+        self.stats["messages"] += len(messages)
+        return next_ready
+
+    async def _send_outbox(self):
+        """Send queued messages in order, retrying failures from the front of the queue."""
+        async with self.send_lock:
+            while self.outbox:
+                message = self.outbox[0]
+                try:
+                    with self.telemetry.span("notify.send", attempt=message[1]):
+                        await self.webhook.send(message[0])
+                except DiscordError as e:
+                    self.telemetry.inc("notify_errors_total", status=e.status_code or "connection")
+                    message[1] += 1
+                    if not e.retryable or message[1] > self.max_retries:
+                        self.outbox.popleft()
+                        self.stats["failed"] += 1
+                        print(f"Dropping Discord notification after {message[1]} attempts: {e}")
+                        continue
+                    self.stats["retries"] += 1
+                    if e.retry_after is None:
+                        # The webhook client already waits out a retry_after before its next request
+                        await asyncio.sleep(self.base_delay * 2 ** (message[1] - 1) * random.uniform(0.5, 1.0))
+                    continue
+                self.outbox.popleft()
+                self.stats["sent"] += 1
+                self.telemetry.inc("notify_messages_sent_total")
+
+    async def _run(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            # Let the rest of the burst arrive
+            await asyncio.sleep(self.batch_window)
+            next_ready = self._merge_pending()
+            try:
+                await self._send_outbox()
+            except Exception as e:
+                print(f"Error sending Discord notifications: {e}")
+            if next_ready is not None:
+                asyncio.get_running_loop().call_later(max(0.0, next_ready - self.batch_window), self.wakeup.set)
+
+    async def flush(self):
+        """Send everything pending now, ignoring the batch window and cooldowns."""
+        self._merge_pending(force=True)
+        await self._send_outbox()
+
+    async def close(self):
+        """Stop the sender, deliver what is still pending and close the HTTP pool."""
+        if self.task is not None:
+            # Cancelling mid-request could send a message twice; let the one in flight finish first
+            async with self.send_lock:
+                self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        await self.flush()
+        await self.webhook.aclose()
+        self.telemetry.remove_gauge("notify_outbox_depth", agent=self.name)
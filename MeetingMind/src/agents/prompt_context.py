@@ -0,0 +1,71 @@
+# Builds compact prompt context for the minutes agent.
+# Instead of re-serialising the whole minutes structure (with every accumulated detail) on each call,
+# the prompt starts with a stable prefix (instructions + agenda skeleton of ids and titles) and ends
+# with a small window of recent details for the active topic plus the new transcript line(s).
+# Keeping the prefix byte-identical between calls lets the provider reuse its prompt cache.
+
+SYSTEM_INSTRUCTIONS = """You are an assistant helping to organize a meeting minutes based on the latest transcript.
+The meeting agenda lists each section and subsection as "<id>: <title>", indented by nesting level.
+Details are added to the agenda item (a section, or a subsection such as "2.1") that a transcript message is about.
+Only record information that is relevant to an agenda item; small talk produces no update."""
+
+
+class AgendaPromptBuilder:
+    """Turns the Minutes model into a compact, cache-friendly prompt context.
+
+    Args:
+        recent_details: How many of the active topic's latest details to include.
+    """
+
+    def __init__(self, recent_details=5):
+        self.recent_details = recent_details
+        self._skeleton_key = None
+        self._system_prompt = None
+
+    def _skeleton_lines(self, items, depth, lines):
+        for item in items:
+            lines.append(f"{'  ' * depth}{item.id}: {item.title}")
+            if item.subsections:
+                self._skeleton_lines(item.subsections.values(), depth + 1, lines)
+
+    def agenda_skeleton(self, minutes):
+        """Return the agenda as indented "<id>: <title>" lines, without details."""
+        lines = []
+        self._skeleton_lines(minutes.agenda, 0, lines)
+        return "\n".join(lines)
+
+    def system_prompt(self, minutes):
+        """Return the stable prompt prefix, rebuilt only when the agenda itself changes."""
+        key = (id(minutes.agenda), len(minutes.agenda))
+        if key != self._skeleton_key:
+            self._skeleton_key = key
+            self._system_prompt = f"{SYSTEM_INSTRUCTIONS}\n\nMeeting agenda:\n{self.agenda_skeleton(minutes)}"
+        return self._system_prompt
+
+    def active_topic_context(self, minutes, current_topic):
+        """Describe the active agenda item and its most recent details.
+
+        current_topic is a dict with "section" and optional "subsection" keys, or None.
+        """
+        if not current_topic or not current_topic.get("section"):
+            return "Current topic: none yet (the meeting has just started)."
+
+        item = minutes.agenda.get_topic(current_topic["section"], current_topic.get("subsection"))
+        if item is None:
+            return "Current topic: none yet (the meeting has just started)."
+
+        details = item.details or []
+        recent = details[-self.recent_details:] if self.recent_details else []
+
+        lines = [f"Current topic: {item.id}: {item.title}"]
+        if recent:
+            lines.append("Most recent details recorded for it:")
+            lines.extend(f"- {detail}" for detail in recent)
+        return "\n".join(lines)
+
+    def build_messages(self, minutes, current_topic, task):
+        """Return chat messages with the stable prefix first and the per-call content last."""
+        return [
+            {"role": "system", "content": self.system_prompt(minutes)},
+            {"role": "user", "content": f"{self.active_topic_context(minutes, current_topic)}\n\n{task}"}
+        ]
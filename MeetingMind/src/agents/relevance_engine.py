@@ -0,0 +1,119 @@
+# Embedding-based relevance scoring for the context agent.
+# Role descriptions and agenda items are embedded once (and cached to disk); a profile is
+# represented by the vectors of its roles and of the agenda items it speaks on or is relevant to.
+# Each line or scope is embedded and scored with one matrix-vector product; only scores in the
+# uncertain band between `low` and `high` are left for the LLM to decide.
+import asyncio
+
+from src.services.embedding_service import EmbeddingCache, HashingEmbedder
+
+
+def agenda_item_text(agenda, item):
+    """Text embedded for an agenda item: its title, prefixed by its parent's for subsections."""
+    parent = agenda.get(getattr(item, "section_id", ""))
+    return f"{parent.title}: {item.title}" if parent is not None else item.title
+
+
+class RelevanceEngine:
+    """Scores transcript text against profiles with embeddings.
+
+    Args:
+        role_descriptions: Role name -> description, as in config/role_description.json.
+        agenda: Agenda model whose items are embedded.
+        embedder: Object with a name and async embed(texts) returning unit rows; defaults to a
+            HashingEmbedder fitted on the role descriptions and agenda titles.
+        cache: EmbeddingCache for the role and agenda vectors.
+        low, high: Scores below low are "no", at or above high "yes"; in between is uncertain.
+            The defaults suit the hashing embedder and need recalibrating for other embedders.
+    """
+
+    def __init__(self, role_descriptions, agenda, embedder=None, cache=None, low=0.12, high=0.3):
+        self.role_descriptions = role_descriptions
+        self.agenda = agenda
+        self.embedder = embedder or HashingEmbedder(corpus=list(role_descriptions.values()) +
+                                                    [agenda_item_text(agenda, item) for item in agenda.items.values()])
+        self.cache = cache or EmbeddingCache()
+        self.low = low
+        self.high = high
+        self.role_vectors = None  # Role name -> vector
+        self.item_vectors = None  # Agenda item id -> vector
+        self.profile_matrices = {}
+        self.stacked_matrices = {}
+        self.prepare_lock = asyncio.Lock()
+        self.stats = {"scored": 0, "uncertain": 0}
+
+    async def prepare(self):
+        """Embed the role descriptions and agenda items once."""
+        async with self.prepare_lock:
+            if self.role_vectors is not None:
+                return
+            roles = list(self.role_descriptions)
+            items = list(self.agenda.items.values())
+            texts = [f"{role}: {self.role_descriptions[role]}" for role in roles] + \
+                    [agenda_item_text(self.agenda, item) for item in items]
+            vectors = await self.cache.embed(self.embedder, texts)
+            self.role_vectors = dict(zip(roles, vectors[:len(roles)]))
+            self.item_vectors = dict(zip((item.id for item in items), vectors[len(roles):]))
+            await asyncio.to_thread(self.cache.save)
+
+    def profile_matrix(self, profile, roles=()):
+        """Rows for the profile's roles and the agenda items it speaks on or is relevant to."""
+        import numpy as np
+        key = (profile, tuple(roles))
+        if key not in self.profile_matrices:
+            rows = [self.role_vectors[role] for role in roles if role in self.role_vectors]
+            rows.extend(self.item_vectors[item.id] for item in self.agenda.items.values()
+                        if item.speaker == profile or profile in (item.relevance or ()))
+            self.profile_matrices[key] = np.vstack(rows) if rows else None
+        return self.profile_matrices[key]
+
+    async def score(self, text, profile, roles=()):
+        """Highest cosine similarity between the text and the profile's vectors."""
+        import numpy as np
+        await self.prepare()
+        matrix = self.profile_matrix(profile, roles)
+        self.stats["scored"] += 1
+        if matrix is None:
+            return 0.0
+        vector = (await self.embedder.embed([text]))[0]
+        return float(np.max(matrix @ vector))
+
+    def stacked_matrix(self, profiles):
+        """All profiles' rows in one matrix, with the row where each profile starts (None if it has none)."""
+        import numpy as np
+        key = tuple((name, tuple(roles)) for name, roles in profiles)
+        if key not in self.stacked_matrices:
+            blocks, starts, offset = [], [], 0
+            for name, roles in profiles:
+                matrix = self.profile_matrix(name, roles)
+                starts.append(offset if matrix is not None else None)
+                if matrix is not None:
+                    blocks.append(matrix)
+                    offset += len(matrix)
+            self.stacked_matrices[key] = (np.vstack(blocks) if blocks else None, starts)
+        return self.stacked_matrices[key]
+
+    async def score_profiles(self, text, profiles):
+        """Score the text against every (name, roles) profile with one embedding and one matrix product.
+
+        Returns a score per profile, in order.
+        """
+        import numpy as np
+        await self.prepare()
+        matrix, starts = self.stacked_matrix(profiles)
+        self.stats["scored"] += 1
+        if matrix is None:
+            return [0.0] * len(profiles)
+        similarities = matrix @ (await self.embedder.embed([text]))[0]
+        present = [start for start in starts if start is not None]
+        maxima = iter(np.maximum.reduceat(similarities, present).tolist())
+        return [next(maxima) if start is not None else 0.0 for start in starts]
+
+    def decide(self, score):
+        """True or False when the score is clear, None when the LLM should decide."""
+        if score >= self.high:
+            return True
+        if score < self.low:
+            return False
+        self.stats["uncertain"] += 1
+        return None
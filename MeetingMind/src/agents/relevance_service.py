@@ -0,0 +1,159 @@
+# Listen-in relevance for every attendee at once.
+# Keeps a registry of profiles (config/user_profiles.json) and evaluates relevance once per scope
+# change for all of them: names mentioned in the transcript wake their profile, the embedding
+# engine scores every profile with one matrix product, and the profiles it is unsure about are
+# settled with a single structured LLM call. Changes are fanned out to per-profile subscribers.
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+
+from src.agents.update_protocol import UPDATE_MODEL, UpdateParseError, loads_answer, response_format_for
+from src.services.llm_service import get_llm_service
+
+
+def relevance_schema(names):
+    """response_format for a name -> true/false answer covering exactly the given profiles."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "listen_in",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {name: {"type": "boolean"} for name in names},
+                "required": list(names),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class Profile:
+    name: str
+    roles: tuple = ()
+
+
+def load_user_profiles(path=None):
+    """Load profiles from config/user_profiles.json ({"Name": {"roles": [...]}})."""
+    if path is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        path = os.path.join(project_root, "config", "user_profiles.json")
+    with open(path, 'r') as f:
+        profiles = json.load(f)
+    return [Profile(name, tuple(data.get("roles", ()))) for name, data in profiles.items()]
+
+
+class RelevanceService:
+    """Decides, for every registered profile, whether it should listen in on the current scope.
+
+    Args:
+        profiles: Profile registry.
+        role_descriptions: Role name -> description, sent to the LLM.
+        llm: LLMService; defaults to the shared one.
+        engine: Optional RelevanceEngine for local scoring.
+        keyword_monitor: Optional KeywordMonitor; profiles named in the transcript are woken directly.
+        model: LLM model; the answer format is picked to suit it as for minutes updates.
+    """
+
+    def __init__(self, profiles, role_descriptions, llm=None, engine=None, keyword_monitor=None, model=UPDATE_MODEL):
+        self.profiles = list(profiles)
+        self.role_descriptions = role_descriptions
+        self.llm = llm or get_llm_service()
+        self.model = model
+        self.engine = engine
+        self.keyword_monitor = keyword_monitor
+        self.relevant = {profile.name: False for profile in self.profiles}
+        self.subscribers = {}  # Profile name -> callbacks
+        self.last_scope_id = None
+        self.stats = {"evaluations": 0, "unchanged_scope": 0, "llm_calls": 0, "notifications": 0}
+
+    def register(self, profile):
+        self.profiles.append(profile)
+        self.relevant.setdefault(profile.name, False)
+
+    def subscribe(self, name, callback):
+        """Call callback(name, relevant, scope_id) whenever the profile's relevance changes.
+
+        callback may be sync or async.
+        """
+        self.subscribers.setdefault(name, []).append(callback)
+
+    async def on_scope(self, scope_id, scope, transcript=None):
+        """Evaluate relevance when the scope changes; repeated calls for the same scope are free."""
+        if scope_id is not None and scope_id == self.last_scope_id:
+            self.stats["unchanged_scope"] += 1
+            return self.relevant
+        self.last_scope_id = scope_id
+        return await self.evaluate(scope_id, scope, transcript)
+
+    async def evaluate(self, scope_id, scope, transcript=None):
+        """Decide relevance for every profile and notify the ones whose relevance changed."""
+        self.stats["evaluations"] += 1
+        decisions = {profile.name: None for profile in self.profiles}
+
+        if self.keyword_monitor is not None and transcript is not None:
+            signal = self.keyword_monitor.scan(transcript)
+            for profile in self.profiles:
+                if self.keyword_monitor.mentions(signal, profile.name):
+                    decisions[profile.name] = True
+
+        text = transcript if transcript is not None else str(scope)
+        undecided = [profile for profile in self.profiles if decisions[profile.name] is None]
+        if self.engine is not None and undecided:
+            scores = await self.engine.score_profiles(text, [(profile.name, profile.roles) for profile in undecided])
+            for profile, score in zip(undecided, scores):
+                decisions[profile.name] = self.engine.decide(score)
+            undecided = [profile for profile in undecided if decisions[profile.name] is None]
+
+        if undecided:
+            decisions.update(await self.analyze_context(scope, undecided))
+
+        changed = [name for name, relevant in decisions.items() if relevant != self.relevant.get(name)]
+        self.relevant.update(decisions)
+        await self._notify(changed, scope_id)
+        return self.relevant
+
+    async def analyze_context(self, scope, profiles):
+        """Ask the LLM about several profiles in one call; returns name -> bool."""
+        attendees = "\n".join(f"- {profile.name}: {', '.join(profile.roles) or 'no role'}" for profile in profiles)
+        self.stats["llm_calls"] += 1
+        response_format = response_format_for(self.model, relevance_schema([profile.name for profile in profiles]))
+        content = await self.llm.chat(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a meeting assistant to notify meeting attendee to pay attention when the current part involves or will involve them."},
+                {
+                    "role": "user",
+                    "content": f"Analyze the following script and answer, for each attendee, if they should be participating in the discussion based on their roles and the role descriptions in the provided text. Respond with a JSON object mapping each attendee's name to true or false only.\n\nAttendees:\n{attendees}\n\nRole Descriptions:\n{self.role_descriptions}\n\nScript:\n{scope}"
+                }
+            ],
+            temperature=0,
+            max_tokens=20 + 10 * len(profiles),
+            **({"response_format": response_format} if response_format is not None else {})
+        )
+        try:
+            answers = loads_answer(content)
+        except UpdateParseError as e:
+            print(f"Invalid listen-in answer ({e}): {content[:80]!r}")
+            answers = {}
+        if not isinstance(answers, dict):
+            answers = {}
+        return {profile.name: answers.get(profile.name) is True for profile in profiles}
+
+    async def _notify(self, names, scope_id):
+        calls = []
+        for name in names:
+            for callback in self.subscribers.get(name, ()):
+                calls.append(self._call(callback, name, scope_id))
+        self.stats["notifications"] += len(calls)
+        await asyncio.gather(*calls)
+
+    async def _call(self, callback, name, scope_id):
+        try:
+            result = callback(name, self.relevant[name], scope_id)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            print(f"Error notifying {name}: {e}")
@@ -0,0 +1,179 @@
+# Map-reduce summary of a whole meeting.
+# The transcript is cut into chunks at the agenda topic changes the minutes agent recorded and, within a
+# topic, at content-defined points once half the token budget is reached (so an edit only moves the cuts
+# near it). Chunks are summarised concurrently under a cap, then merged per topic together with the
+# topic's minutes, and the topic summaries are merged fan_in at a time into one meeting summary. Every
+# request is cached by its content, so re-running after an edit only redoes the changed chunks and the
+# merges above them.
+import asyncio
+import zlib
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.services.cache_service import LLMResponseCache, make_cache_key
+from src.services.llm_service import DEFAULT_MODEL, estimate_tokens, get_llm_service
+
+CHUNK_TOKENS = 1500  # Most transcript tokens per chunk (a single longer line gets a chunk of its own)
+SUMMARY_MAX_TOKENS = 250
+FAN_IN = 4  # Summaries combined per merge request
+CUT_MODULUS = 8  # Past half the budget, a line ends its chunk if its hash is 0 modulo this
+
+SYSTEM_PROMPT = "You summarise meeting transcripts for the minutes of a student society committee meeting."
+
+
+@dataclass(slots=True, eq=False)
+class TranscriptChunk:
+    """Consecutive transcript lines of one agenda topic (topic_id None: before the first topic)."""
+    topic_id: Optional[str]
+    lines: List[dict] = field(default_factory=list)
+    tokens: int = 0
+
+
+def format_line(line):
+    return f"{line['timestamp']} {line['speaker']}: {line['message']}"
+
+
+def _starts_at(start, position, line):
+    # >= so a start that points at a line never seen (or out of order) still takes effect
+    if start.get("index") is not None:
+        return position >= start["index"]
+    return start["timestamp"] == line["timestamp"]
+
+
+def chunk_transcript(lines, topic_starts=(), chunk_tokens=CHUNK_TOKENS):
+    """Split transcript lines into chunks by topic and token budget.
+
+    topic_starts are the {"section", "subsection", "timestamp", "index"} topic changes recorded by
+    MinutesAgent, in order; a topic starts at the line with its index in the transcript (lines must be
+    the whole transcript), or, for a start without an index, at the first line with its timestamp.
+    """
+    chunks = []
+    starts = list(topic_starts)
+    next_start = 0
+    chunk = TranscriptChunk(None)
+    for position, line in enumerate(lines):
+        topic_id = chunk.topic_id
+        while next_start < len(starts) and _starts_at(starts[next_start], position, line):
+            topic_id = starts[next_start]["subsection"] or starts[next_start]["section"]
+            next_start += 1
+        if topic_id != chunk.topic_id:
+            if chunk.lines:
+                chunks.append(chunk)
+            chunk = TranscriptChunk(topic_id)
+
+        text = format_line(line)
+        tokens = estimate_tokens(text)
+        if chunk.lines and chunk.tokens + tokens > chunk_tokens:
+            chunks.append(chunk)
+            chunk = TranscriptChunk(topic_id)
+        chunk.lines.append(line)
+        chunk.tokens += tokens
+        if chunk.tokens >= chunk_tokens // 2 and zlib.crc32(text.encode("utf-8")) % CUT_MODULUS == 0:
+            chunks.append(chunk)
+            chunk = TranscriptChunk(topic_id)
+    if chunk.lines:
+        chunks.append(chunk)
+    return chunks
+
+
+class SummaryAgent:
+    """Summarises a finished meeting with concurrent, cached map-reduce requests.
+
+    Args:
+        llm: LLMService (default: the shared one).
+        max_concurrency: Summary requests in flight at once.
+        chunk_tokens: Transcript tokens per chunk.
+        fan_in: Summaries combined per merge request.
+        cache: LLMResponseCache for chunk and merge summaries (default: in memory); give it a path to
+            keep summaries across runs.
+    """
+
+    def __init__(self, llm=None, max_concurrency=4, chunk_tokens=CHUNK_TOKENS, fan_in=FAN_IN, cache=None,
+                 model=DEFAULT_MODEL):
+        self.llm = llm or get_llm_service()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.chunk_tokens = chunk_tokens
+        self.fan_in = max(2, fan_in)
+        self.cache = cache if cache is not None else LLMResponseCache()
+        self.model = model
+        self.in_flight = 0
+        self.stats = {"chunks": 0, "requests": 0, "cached": 0, "max_in_flight": 0}
+
+    async def _summarise(self, prompt):
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
+        key = make_cache_key(self.model, messages, 0, SUMMARY_MAX_TOKENS)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            self.stats["cached"] += 1
+            return cached
+
+        async with self.semaphore:
+            self.in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+            try:
+                summary = await self.llm.chat(messages, model=self.model, temperature=0,
+                                              max_tokens=SUMMARY_MAX_TOKENS, use_cache=False)
+            finally:
+                self.in_flight -= 1
+        self.stats["requests"] += 1
+        summary = summary.strip()
+        await self.cache.set(key, summary)
+        return summary
+
+    async def summarise_chunk(self, chunk, title):
+        transcript = "\n".join(format_line(line) for line in chunk.lines)
+        return await self._summarise(
+            f"Agenda topic: {title}\n\nTranscript excerpt:\n{transcript}\n\n"
+            "Summarise what was discussed and decided in this excerpt in at most three sentences."
+        )
+
+    async def merge(self, summaries, title, details=None):
+        """Combine consecutive summaries (and the topic's minutes, if given) into one."""
+        if len(summaries) == 1 and not details:
+            return summaries[0]
+        parts = "\n".join(f"{i}. {summary}" for i, summary in enumerate(summaries, 1))
+        minutes = "".join(f"\n- {detail}" for detail in details or [])
+        return await self._summarise(
+            f"Agenda topic: {title}\n\nSummaries of consecutive parts, in order:\n{parts}\n"
+            + (f"\nPoints recorded in the minutes:{minutes}\n" if minutes else "")
+            + "\nCombine them into one summary of at most four sentences, keeping every decision."
+        )
+
+    async def _reduce(self, summaries, title):
+        # Merge fan_in at a time, level by level, until one summary is left
+        while len(summaries) > 1:
+            groups = [summaries[i:i + self.fan_in] for i in range(0, len(summaries), self.fan_in)]
+            summaries = await asyncio.gather(*(self.merge(group, title) for group in groups))
+        return summaries[0]
+
+    async def _summarise_topic(self, topic_id, chunks, agenda):
+        item = agenda.get(topic_id) if agenda is not None and topic_id else None
+        title = item.title if item is not None else (topic_id or "Opening remarks")
+        summaries = await asyncio.gather(*(self.summarise_chunk(chunk, title) for chunk in chunks))
+        if len(summaries) > self.fan_in:
+            summaries = [await self._reduce(list(summaries), title)]
+        summary = await self.merge(list(summaries), title, item.details if item is not None else None)
+        return {"id": topic_id, "title": title, "summary": summary}
+
+    async def summarise(self, lines, agenda=None, topic_starts=()):
+        """Summarise a transcript (e.g. TranscriptProcessor.get_full_transcript()).
+
+        agenda is the minutes Agenda and topic_starts MinutesAgent.topic_starts. Returns
+        {"summary": ..., "topics": [{"id", "title", "summary"}, ...]} with topics in order of first mention.
+        """
+        chunks = chunk_transcript(lines, topic_starts, self.chunk_tokens)
+        self.stats["chunks"] += len(chunks)
+        by_topic = {}
+        for chunk in chunks:
+            by_topic.setdefault(chunk.topic_id, []).append(chunk)
+        if not by_topic:
+            return {"summary": "", "topics": []}
+
+        topics = await asyncio.gather(*(self._summarise_topic(topic_id, topic_chunks, agenda)
+                                        for topic_id, topic_chunks in by_topic.items()))
+        if len(topics) == 1:
+            summary = topics[0]["summary"]
+        else:
+            summary = await self._reduce([f"{topic['title']}: {topic['summary']}" for topic in topics],
+                                         "The whole meeting")
+        return {"summary": summary, "topics": list(topics)}
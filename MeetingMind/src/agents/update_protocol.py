@@ -0,0 +1,179 @@
+# Structured-output protocol for minutes updates.
+# The LLM answers with a fixed three-key JSON object whose section and subsection ids are constrained
+# to the live agenda by a JSON schema (response_format), so the answer is short enough for a tight
+# max_tokens and can be validated strictly instead of scraped with a regex. "section" comes first, so
+# a streamed "no update" answer can be recognised, and the stream closed, after a few tokens.
+# Answers that still fail to parse are repaired locally where possible; otherwise the caller retries.
+# Only some models accept a json_schema response_format; older ones get JSON mode or, failing that, no
+# response_format at all (the API rejects an unsupported one with a non-retryable 400), and rely on the
+# prompt plus the repair path.
+import json
+import re
+
+from src.models.agenda import Subsection
+from src.services.llm_service import DEFAULT_MODEL
+
+NO_UPDATE = {"section": None, "subsection": None, "details": None}
+UPDATE_MAX_TOKENS = 100  # The three keys plus one detail of a sentence or two
+UPDATE_MODEL = DEFAULT_MODEL  # Default model for minutes updates; supports structured outputs
+# Model name prefixes accepting {"type": "json_schema"}; gpt-4o-2024-05-13 predates structured outputs
+JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+JSON_SCHEMA_EXCLUDED = ("gpt-4o-2024-05-13", "o1-mini", "o1-preview")
+# Model name prefixes accepting {"type": "json_object"} (JSON mode); plain gpt-4 accepts neither
+JSON_OBJECT_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+JSON_OBJECT_EXCLUDED = ("gpt-3.5-turbo-0613", "gpt-3.5-turbo-0301", "gpt-3.5-turbo-16k")
+NULL_SECTION_PATTERN = re.compile(r'^\s*(?:```(?:json)?\s*)?\{\s*"section"\s*:\s*null\b')
+COMMENT_PATTERN = re.compile(r'\s*//[^\n]*')
+TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+
+
+class UpdateParseError(ValueError):
+    """The LLM's answer is not a valid update for the agenda."""
+
+
+def agenda_ids(agenda):
+    """(section ids, subsection ids) of an agenda, in meeting order."""
+    sections = [section.id for section in agenda]
+    subsections = [topic.id for topic in agenda.topics if isinstance(topic, Subsection)]
+    return sections, subsections
+
+
+def supports_json_schema(model):
+    return model.startswith(JSON_SCHEMA_MODELS) and not model.startswith(JSON_SCHEMA_EXCLUDED)
+
+
+def supports_json_object(model):
+    return model.startswith(JSON_SCHEMA_MODELS + JSON_OBJECT_MODELS) and not model.startswith(JSON_OBJECT_EXCLUDED)
+
+
+def response_format_for(model, schema):
+    """The strongest response_format the model accepts: schema, JSON mode, or None (prompt only)."""
+    if supports_json_schema(model):
+        return schema
+    if supports_json_object(model):
+        return {"type": "json_object"}
+    return None
+
+
+def _update_properties(sections, subsections, nullable_section=True):
+    return {
+        "section": {"type": ["string", "null"] if nullable_section else "string",
+                    "enum": sections + [None] if nullable_section else sections},
+        "subsection": {"type": ["string", "null"], "enum": subsections + [None]},
+        "details": {"type": ["string", "null"]},
+    }
+
+
+def _json_schema(name, schema):
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+
+def update_schema(agenda):
+    """response_format for one update, with section ids constrained to the agenda."""
+    sections, subsections = agenda_ids(agenda)
+    return _json_schema("minutes_update", {
+        "type": "object",
+        "properties": _update_properties(sections, subsections),
+        "required": ["section", "subsection", "details"],
+        "additionalProperties": False,
+    })
+
+
+def batch_update_schema(agenda):
+    """response_format for a batch of updates, each tagged with the index of its transcript line."""
+    sections, subsections = agenda_ids(agenda)
+    return _json_schema("minutes_batch_update", {
+        "type": "object",
+        "properties": {
+            "updates": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"line": {"type": "integer"},
+                                   **_update_properties(sections, subsections, nullable_section=False)},
+                    "required": ["line", "section", "subsection", "details"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["updates"],
+        "additionalProperties": False,
+    })
+
+
+def is_null_section(content):
+    """True once a (possibly partial) answer has committed to "section": null."""
+    return NULL_SECTION_PATTERN.match(content) is not None
+
+
+def loads_answer(content):
+    """json.loads, falling back to light repairs: code fences, surrounding prose, comments, trailing commas."""
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end < start:
+        raise UpdateParseError("no JSON object in the answer")
+    candidate = TRAILING_COMMA_PATTERN.sub(r'\1', COMMENT_PATTERN.sub("", content[start:end + 1]))
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError as e:
+        raise UpdateParseError(f"invalid JSON: {e.msg}") from e
+
+
+def validate_update(data, agenda):
+    """Check an update dict against the agenda; returns it with the three keys normalised."""
+    if not isinstance(data, dict):
+        raise UpdateParseError("the answer is not a JSON object")
+    section, subsection, details = data.get("section"), data.get("subsection"), data.get("details")
+    if section is None:
+        return dict(NO_UPDATE)
+    section = str(section)
+    if agenda.get_topic(section) is None:
+        raise UpdateParseError(f"section {section!r} is not on the agenda")
+    if subsection is not None:
+        subsection = str(subsection)
+        if agenda.get_topic(section, subsection) is None:
+            raise UpdateParseError(f"subsection {subsection!r} is not in section {section}")
+    if not isinstance(details, str) or not details.strip():
+        raise UpdateParseError("details must be a non-empty string")
+    return {"section": section, "subsection": subsection, "details": details.strip()}
+
+
+def parse_update(content, agenda):
+    """Parse and validate one update answer. Raises UpdateParseError."""
+    if is_null_section(content):
+        return dict(NO_UPDATE)
+    return validate_update(loads_answer(content), agenda)
+
+
+def parse_batch_updates(content, agenda):
+    """Parse a batch answer into validated updates tagged with their "line".
+
+    Raises UpdateParseError if the answer as a whole is unusable; single invalid updates are skipped
+    and counted in the returned (updates, invalid) pair.
+    """
+    data = loads_answer(content)
+    updates = data.get("updates") if isinstance(data, dict) else None
+    if not isinstance(updates, list):
+        raise UpdateParseError('the answer has no "updates" list')
+    valid, invalid = [], 0
+    for update in updates:
+        try:
+            checked = validate_update(update, agenda)
+        except UpdateParseError as e:
+            invalid += 1
+            print(f"Dropping invalid minutes update ({e})")
+            continue
+        if checked["section"] is not None:
+            valid.append({**checked, "line": update.get("line")})
+    return valid, invalid
+
+
+def repair_messages(messages, content, error):
+    """Messages for a retry: the bad answer and what was wrong with it."""
+    return messages + [
+        {"role": "assistant", "content": content},
+        {"role": "user", "content": f"Invalid update ({error}). Reply with only the JSON object, using section and subsection ids from the agenda."},
+    ]
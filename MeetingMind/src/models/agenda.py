@@ -0,0 +1,144 @@
+# Typed agenda model used by the minutes agent.
+# Sections and subsections are slotted dataclasses; Agenda keeps an index of every item by id and
+# links the agenda topics in meeting order, so lookups and "what comes next" are O(1).
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Keys every agenda item understands; anything else is kept in `extra` so round-trips are lossless
+_KNOWN_KEYS = ("title", "speaker", "relevance", "details", "subsections")
+
+
+def agenda_sort_key(item_id):
+    """Numeric ordering of ids such as "2", "2.1", "2.10" (so "2.10" sorts after "2.9")."""
+    try:
+        return (0, tuple(int(part) for part in item_id.split(".") if part))
+    except ValueError:
+        return (1, item_id)
+
+
+@dataclass(slots=True, eq=False)
+class AgendaItem:
+    """Common fields of sections and subsections.
+
+    details is None when the on-disk item has no "details" key (e.g. a section made of subsections).
+    """
+    id: str
+    title: str = ""
+    speaker: Optional[str] = None
+    relevance: Optional[List[str]] = None
+    details: Optional[List[str]] = None
+    subsections: Dict[str, "Subsection"] = field(default_factory=dict)
+    extra: dict = field(default_factory=dict)
+    # Next agenda topic in meeting order (for a section with subsections, its first one); set by Agenda
+    next_topic: Optional["AgendaItem"] = field(default=None, repr=False)
+
+    def add_detail(self, detail):
+        """Append a detail to the item's running list of details."""
+        if self.details is None:
+            self.details = [detail]
+        else:
+            self.details.append(detail)
+
+    @classmethod
+    def from_dict(cls, item_id, data, **kwargs):
+        details = data.get("details")
+        if details is not None and not isinstance(details, list):
+            # The template uses "" for "no details yet"
+            details = [details] if details else []
+        return cls(
+            id=item_id,
+            title=data.get("title", ""),
+            speaker=data.get("speaker"),
+            relevance=data.get("relevance"),
+            details=details,
+            subsections={sub_id: Subsection.from_dict(sub_id, sub_data, section_id=item_id)
+                         for sub_id, sub_data in data.get("subsections", {}).items()},
+            extra={key: value for key, value in data.items() if key not in _KNOWN_KEYS},
+            **kwargs
+        )
+
+    def to_dict(self):
+        """Serialise to the on-disk shape, with "" for an empty details list."""
+        data = {"title": self.title}
+        if self.speaker is not None:
+            data["speaker"] = self.speaker
+        if self.relevance is not None:
+            data["relevance"] = self.relevance
+        if self.subsections:
+            data["subsections"] = {sub_id: sub.to_dict() for sub_id, sub in self.subsections.items()}
+        if self.details is not None:
+            data["details"] = self.details if self.details else ""
+        data.update(self.extra)
+        return data
+
+
+@dataclass(slots=True, eq=False)
+class Section(AgendaItem):
+    pass
+
+
+@dataclass(slots=True, eq=False)
+class Subsection(AgendaItem):
+    section_id: str = ""  # Id of the containing item, e.g. "2" for "2.1" or "4.5" for "4.5.1"
+
+
+class Agenda:
+    """Ordered agenda with O(1) lookup by id and next-topic pointers.
+
+    Topics are the items the minutes are organised by: sections without subsections, and the
+    first-level subsections of sections that have them, in numeric id order.
+    """
+
+    __slots__ = ("sections", "items", "topics")
+
+    def __init__(self, sections):
+        self.sections = sections  # Section id -> Section, in on-disk order
+        self.items = {}  # Any item id ("2", "2.1", "4.5.1") -> item
+        self.topics = []  # Topics in meeting order
+        self._index()
+
+    def _index_item(self, item):
+        self.items[item.id] = item
+        for subsection in item.subsections.values():
+            self._index_item(subsection)
+
+    def _index(self):
+        for section in self.sections.values():
+            self._index_item(section)
+
+        for section_id in sorted(self.sections, key=agenda_sort_key):
+            section = self.sections[section_id]
+            if section.subsections:
+                subsections = [section.subsections[sub_id] for sub_id in sorted(section.subsections, key=agenda_sort_key)]
+                # The section itself is not a topic; what follows it is its first subsection
+                section.next_topic = subsections[0]
+                self.topics.extend(subsections)
+            else:
+                self.topics.append(section)
+
+        for topic, next_topic in zip(self.topics, self.topics[1:] + [None]):
+            topic.next_topic = next_topic
+
+    @classmethod
+    def from_dict(cls, agenda):
+        return cls({section_id: Section.from_dict(section_id, data) for section_id, data in agenda.items()})
+
+    def to_dict(self):
+        return {section_id: section.to_dict() for section_id, section in self.sections.items()}
+
+    def get(self, item_id):
+        """Return the item with the given id, or None."""
+        return self.items.get(item_id)
+
+    def get_topic(self, section_id, subsection_id=None):
+        """Return the section, or its subsection if given, or None if it is not in the agenda."""
+        section = self.sections.get(section_id)
+        if section is None or not subsection_id:
+            return section
+        return section.subsections.get(subsection_id)
+
+    def __iter__(self):
+        return iter(self.sections.values())
+
+    def __len__(self):
+        return len(self.items)
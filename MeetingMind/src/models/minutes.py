@@ -0,0 +1,57 @@
+# Typed minutes model: meeting metadata plus the indexed Agenda.
+# Loaded once from the minutes JSON and serialised back to the same shape for snapshots.
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.models.agenda import Agenda
+
+_KNOWN_KEYS = ("date", "time", "attendees", "absences", "agenda")
+
+
+@dataclass(slots=True, eq=False)
+class Minutes:
+    """Meeting minutes; keys other than the known ones (e.g. "nextMeeting") are kept in extra."""
+    agenda: Agenda
+    date: Optional[str] = None
+    time: Optional[str] = None
+    attendees: List[str] = field(default_factory=list)
+    absences: List[str] = field(default_factory=list)
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            agenda=Agenda.from_dict(data.get("agenda", {})),
+            date=data.get("date"),
+            time=data.get("time"),
+            attendees=data.get("attendees", []),
+            absences=data.get("absences", []),
+            extra={key: value for key, value in data.items() if key not in _KNOWN_KEYS},
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_dict(self):
+        data = {}
+        if self.date is not None:
+            data["date"] = self.date
+        if self.time is not None:
+            data["time"] = self.time
+        data["attendees"] = self.attendees
+        data["absences"] = self.absences
+        data["agenda"] = self.agenda.to_dict()
+        data.update(self.extra)
+        return data
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def add_detail(self, section_id, subsection_id, detail):
+        """Append a detail to a section or subsection; returns the item, or None if it is not in the agenda."""
+        item = self.agenda.get_topic(section_id, subsection_id)
+        if item is not None:
+            item.add_detail(detail)
+        return item
@@ -0,0 +1,110 @@
+# Content-addressed cache for LLM responses.
+# A bounded in-memory LRU sits in front of an on-disk SQLite store, so replaying a transcript
+# or re-running a meeting after a crash does not pay for the same requests twice.
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def make_cache_key(model, messages, temperature, max_tokens, **kwargs):
+    """Hash the parts of a request that determine its response."""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        **kwargs
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier response cache keyed by make_cache_key.
+
+    Args:
+        path: SQLite file for the on-disk tier, or None to keep the cache in memory only.
+        max_memory_entries: Size of the in-memory LRU.
+        bypass: When True, lookups always miss and nothing is stored (non-deterministic runs).
+    """
+
+    def __init__(self, path=None, max_memory_entries=1024, bypass=False):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.bypass = bypass
+        self.memory = OrderedDict()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+        self.db = None
+        self.db_lock = threading.Lock()  # The SQLite connection is used from worker threads
+
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self.db.commit()
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _read_disk(self, key):
+        with self.db_lock:
+            row = self.db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write_disk(self, key, value):
+        with self.db_lock:
+            self.db.execute("INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)",
+                            (key, json.dumps(value)))
+            self.db.commit()
+
+    async def get(self, key):
+        """Return the cached value for key, or None."""
+        if self.bypass:
+            return None
+
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.stats["hits"] += 1
+            return self.memory[key]
+
+        if self.db is not None:
+            value = await asyncio.to_thread(self._read_disk, key)
+            if value is not None:
+                self._remember(key, value)
+                self.stats["disk_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key, value):
+        """Store a JSON-serialisable value under key in both tiers."""
+        if self.bypass:
+            return
+        self._remember(key, value)
+        self.stats["writes"] += 1
+        if self.db is not None:
+            await asyncio.to_thread(self._write_disk, key, value)
+
+    def clear(self):
+        """Drop every cached response from both tiers."""
+        self.memory.clear()
+        if self.db is not None:
+            with self.db_lock:
+                self.db.execute("DELETE FROM responses")
+                self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
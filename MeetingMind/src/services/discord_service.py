@@ -0,0 +1,95 @@
+# Discord webhook client.
+# Posts messages to DISCORD_WEBHOOK_URL over one pooled async HTTP connection and follows Discord's
+# rate limits: X-RateLimit-Remaining / X-RateLimit-Reset-After hold back the next request before the
+# bucket runs out, and a 429 reports how long to wait (retry_after) to whoever is retrying.
+import asyncio
+import os
+import time
+
+DISCORD_MESSAGE_LIMIT = 2000  # Characters per message
+
+
+class DiscordError(Exception):
+    """A failed webhook request, with the status code and the server's retry_after if any."""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        # Connection errors have no status code
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class DiscordWebhook:
+    """Async client for a Discord webhook.
+
+    Args:
+        webhook_url: Defaults to the DISCORD_WEBHOOK_URL environment variable.
+        max_connections: Size of the HTTP connection pool.
+        timeout: Seconds per request.
+    """
+
+    def __init__(self, webhook_url=None, max_connections=4, timeout=10.0):
+        self.webhook_url = webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.client = None
+        self.blocked_until = 0.0  # time.monotonic() when the rate-limit bucket has room again
+        self.stats = {"requests": 0, "rate_limited": 0}
+
+    def _get_client(self):
+        # Created on first use so the HTTP pool is bound to the running event loop
+        if self.client is None:
+            import httpx
+
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self.client
+
+    def _track_limits(self, response):
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset_after = response.headers.get("x-ratelimit-reset-after")
+        if remaining == "0" and reset_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + float(reset_after))
+
+    async def send(self, content):
+        """Post one message. Raises DiscordError on failure."""
+        if not self.webhook_url:
+            raise DiscordError("DISCORD_WEBHOOK_URL is not set", status_code=400)
+        import httpx
+
+        wait = self.blocked_until - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        self.stats["requests"] += 1
+        try:
+            response = await self._get_client().post(
+                self.webhook_url, json={"content": content, "allowed_mentions": {"parse": ["users"]}}
+            )
+        except httpx.HTTPError as e:
+            raise DiscordError(str(e)) from e
+        self._track_limits(response)
+
+        if response.status_code == 429:
+            self.stats["rate_limited"] += 1
+            try:
+                retry_after = float(response.json().get("retry_after"))
+            except (ValueError, TypeError, AttributeError):
+                retry_after = float(response.headers.get("retry-after", 1.0))
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            raise DiscordError("Rate limited by Discord", status_code=429, retry_after=retry_after)
+        if response.status_code >= 400:
+            raise DiscordError(f"Discord webhook returned {response.status_code}: {response.text[:200]}",
+                               status_code=response.status_code)
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
@@ -0,0 +1,352 @@
+# Coalescing, batched writer for the minutes Google Doc.
+# Details are queued without blocking the minutes agent; a flush loop merges everything pending
+# into one documents().batchUpdate per interval, using an index of where each section ends
+# (SectionIndex) instead of re-reading and scanning the document for every bullet.
+import asyncio
+import re
+from contextlib import nullcontext
+
+from src.services.telemetry_service import get_telemetry
+
+MAIN_HEADING_PATTERN = re.compile(r'^### \*\*(\d+)\. ')
+SUBSECTION_HEADING_PATTERN = re.compile(r'^#### (\d+(?:\.\d+)+) ')
+# Statuses of a failed write that a later flush may get past; anything else fails the same way every time
+RETRYABLE_WRITE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def utf16_length(text):
+    """Length of text in Google Docs index units (UTF-16 code units)."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def paragraph_text(element):
+    """Concatenate the text runs of a structural element, or return None if it is not a paragraph."""
+    if 'paragraph' not in element:
+        return None
+    return "".join(run['textRun']['content'] for run in element['paragraph']['elements'] if 'textRun' in run)
+
+
+def normalize_section_id(section_id):
+    """Main sections may be given as "2" or "2."; the index uses "2."."""
+    return section_id if '.' in section_id else f"{section_id}."
+
+
+def heading_section_id(text):
+    """Return the section id ("2." or "2.1") of a minutes heading paragraph, or None."""
+    match = MAIN_HEADING_PATTERN.match(text)
+    if match:
+        return f"{match.group(1)}."
+    match = SUBSECTION_HEADING_PATTERN.match(text)
+    if match:
+        return match.group(1)
+    return None
+
+
+class SectionIndex:
+    """Index of the minutes headings in a Google Doc.
+
+    Maps each section id to [heading endIndex, last bullet endIndex]; a section without bullets
+    has both equal to the heading's endIndex. The index is built with one linear pass over the
+    document and then shifted locally after each insert, so finding where the next bullet goes
+    does not depend on the size of the document. revision_id records the document revision the
+    index describes; writes are made conditional on it so edits by anyone else are detected.
+    """
+
+    def __init__(self, sections, revision_id=None):
+        self.sections = sections
+        self.revision_id = revision_id
+
+    @classmethod
+    def from_document(cls, document):
+        """Build the index from a documents().get response."""
+        sections = {}
+        current = None
+        for element in document.get('body').get('content'):
+            text = paragraph_text(element)
+            if text is None:
+                continue
+            section_id = heading_section_id(text)
+            if section_id is not None:
+                current = sections[section_id] = [element.get('endIndex'), element.get('endIndex')]
+            elif text.startswith("### **") or text.startswith("#### "):
+                current = None
+            elif current is not None and text.strip().startswith("- "):
+                current[1] = element.get('endIndex')
+        return cls(sections, document.get('revisionId'))
+
+    def insert_position(self, section_id):
+        """Index where the next bullet of section_id goes, or None if the heading is not in the doc."""
+        entry = self.sections.get(normalize_section_id(section_id))
+        return entry[1] if entry else None
+
+    def build_requests(self, bullets):
+        """Merge (section_id, detail) bullets into insertText requests.
+
+        Returns the requests, the (index, length) of each insert and the number of bullets
+        dropped because their section is unknown.
+        """
+        texts = {}
+        dropped = 0
+        for section_id, detail in bullets:
+            section_id = normalize_section_id(section_id)
+            if section_id not in self.sections:
+                print(f"Could not find section {section_id}")
+                dropped += 1
+                continue
+            texts.setdefault(section_id, []).append(f"- {detail}\n")
+
+        inserts = sorted(((self.insert_position(section_id), "".join(lines)) for section_id, lines in texts.items()),
+                         reverse=True)
+        # Insert from the end of the document backwards so earlier indexes stay valid
+        requests = [{'insertText': {'location': {'index': index}, 'text': text}} for index, text in inserts]
+        return requests, [(index, utf16_length(text)) for index, text in inserts], dropped
+
+    def apply_inserts(self, inserts, revision_id=None):
+        """Shift the index for text inserted at the given (index, length) positions."""
+        for entry in self.sections.values():
+            heading_end, last_end = entry
+            # Text inserted exactly at a heading's end belongs to that section, after the heading
+            entry[0] = heading_end + sum(length for index, length in inserts if index < heading_end)
+            entry[1] = last_end + sum(length for index, length in inserts if index <= last_end)
+        self.revision_id = revision_id
+
+
+def load_section_index(service, doc_id):
+    """Fetch the document once and index its headings."""
+    document = service.documents().get(documentId=doc_id).execute()
+    return SectionIndex.from_document(document)
+
+
+def _error_status(error):
+    return getattr(error, 'status_code', None) or getattr(getattr(error, 'resp', None), 'status', None)
+
+
+def is_revision_conflict(error):
+    """True if a batchUpdate was rejected because the document changed since our revision.
+
+    The Docs API answers a stale requiredRevisionId with a 400 whose message names the revision; other
+    400s (a bad index, a malformed request) are real errors and are not retried.
+    """
+    if _error_status(error) != 400:
+        return False
+    message = " ".join(str(part) for part in (error, getattr(error, 'reason', None) or "") if part)
+    return "revision" in message.lower()
+
+
+def is_retryable_write_error(error):
+    """True for rate limits, server errors and lost connections.
+
+    Missing credentials, 4xx rejections and invalid requests (e.g. a bad index) are not retried.
+    """
+    status = _error_status(error)
+    if status is not None:
+        return int(status) in RETRYABLE_WRITE_STATUSES
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ == "TransportError"
+
+
+def write_bullets(service, doc_id, index, bullets):
+    """Append (section_id, detail) bullets with one conditional batchUpdate.
+
+    The update requires the revision the index was built from; if someone else edited the doc
+    the index is rebuilt and the write retried once. Returns the (possibly rebuilt) index and
+    the number of bullets dropped because their section was not found.
+    """
+    if index is None:
+        index = load_section_index(service, doc_id)
+
+    for attempt in range(2):
+        requests, inserts, dropped = index.build_requests(bullets)
+        if not requests:
+            return index, dropped
+
+        body = {'requests': requests}
+        if index.revision_id:
+            body['writeControl'] = {'requiredRevisionId': index.revision_id}
+        try:
+            response = service.documents().batchUpdate(documentId=doc_id, body=body).execute()
+        except Exception as e:
+            if attempt == 0 and index.revision_id and is_revision_conflict(e):
+                index = load_section_index(service, doc_id)
+                continue
+            raise
+
+        index.apply_inserts(inserts, response.get('writeControl', {}).get('requiredRevisionId'))
+        return index, dropped
+
+
+class GoogleDocWriter:
+    """Asynchronously appends minutes details to a Google Doc in batches.
+
+    Args:
+        doc_id: The Google Doc ID.
+        service: Docs API client; defaults to the cached client from google_doc_service.
+        flush_interval: Seconds between flushes of pending details.
+        max_attempts: Flushes a batch gets after retryable errors before its details are dropped;
+            non-retryable errors drop it at once.
+        service_lock: Lock held while using service, when it is shared with other writers (the Docs
+            client is not thread-safe).
+    """
+
+    def __init__(self, doc_id, service=None, flush_interval=2.0, max_attempts=5, service_lock=None):
+        self.doc_id = doc_id
+        self.service = service
+        self.service_lock = service_lock
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.failed_attempts = 0  # Consecutive failed flushes of the pending details
+        self.pending = []  # (section_id, detail) in arrival order
+        self.index = None  # SectionIndex, built from one documents().get and shifted after each write
+        self.flush_lock = asyncio.Lock()
+        self.flush_task = None
+        # dropped: section not found; failed: given up after write errors
+        self.stats = {"index_builds": 0, "batch_update_calls": 0, "bullets": 0, "dropped": 0, "failed": 0}
+        self.telemetry = get_telemetry()
+
+    def append_detail(self, section_id, detail):
+        """Queue a detail for the given section id ("2." or "2.1"). Never blocks."""
+        self.pending.append((section_id, detail))
+
+    def start(self):
+        """Start the background flush loop."""
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_loop())
+            self.telemetry.set_gauge("docs_pending_details", lambda: len(self.pending), doc=self.doc_id)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error updating Google Doc: {e}")
+
+    def _get_service(self):
+        if self.service is not None:
+            return self.service
+        from src.services.google_doc_service import get_docs_service
+        return get_docs_service()
+
+    def _write(self, pending):
+        previous = self.index
+        with self.service_lock or nullcontext():
+            self.index, dropped = write_bullets(self._get_service(), self.doc_id, self.index, pending)
+        if self.index is not previous:
+            self.stats["index_builds"] += 1
+        if dropped < len(pending):
+            self.stats["batch_update_calls"] += 1
+        self.stats["bullets"] += len(pending) - dropped
+        self.stats["dropped"] += dropped
+
+    async def flush(self):
+        """Write every pending detail with at most one batchUpdate.
+
+        Raises on a retryable error, keeping the details for the next flush (up to max_attempts);
+        details that cannot be written are dropped and counted in stats["failed"].
+        """
+        async with self.flush_lock:
+            if not self.pending:
+                return
+            pending, self.pending = self.pending, []
+            try:
+                with self.telemetry.span("docs.write", details=len(pending)):
+                    await asyncio.to_thread(self._write, pending)
+            except Exception as e:
+                # Re-read the document before writing again
+                self.index = None
+                self.failed_attempts += 1
+                if is_retryable_write_error(e) and self.failed_attempts < self.max_attempts:
+                    self.pending = pending + self.pending
+                    raise
+                print(f"Dropping {len(pending)} details for Google Doc {self.doc_id} "
+                      f"after {self.failed_attempts} failed attempt(s): {e!r}")
+                self.stats["failed"] += len(pending)
+                self.telemetry.inc("docs_failed_details_total", len(pending), doc=self.doc_id)
+            self.failed_attempts = 0
+
+    async def close(self):
+        """Stop the flush loop and write anything still pending."""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+            self.flush_task = None
+            self.telemetry.remove_gauge("docs_pending_details", doc=self.doc_id)
+        try:
+            await self.flush()
+        except Exception as e:
+            # Shutting down: log what is lost rather than abort the caller's shutdown
+            print(f"Could not write {len(self.pending)} details to Google Doc {self.doc_id} on close: {e!r}")
+            self.stats["failed"] += len(self.pending)
+            self.pending = []
+
+
+class FakeDocsService:
+    """In-memory stand-in for the Google Docs API client (documents().get / batchUpdate).
+
+    The body is kept as UTF-16 so indexes behave like the real API, starting at 1.
+    edit() simulates someone else changing the document.
+    """
+
+    def __init__(self, paragraphs=()):
+        self.body = "".join(paragraphs).encode('utf-16-le')
+        self.revision = 1
+        self.calls = {"get": 0, "batchUpdate": 0}
+
+    def text(self):
+        return self.body.decode('utf-16-le')
+
+    def documents(self):
+        return self
+
+    def edit(self, index, text):
+        """Insert text as another user would, bumping the revision."""
+        self._apply(None, {'requests': [{'insertText': {'location': {'index': index}, 'text': text}}]})
+
+    def _content(self):
+        content = [{'startIndex': 0, 'endIndex': 1, 'sectionBreak': {}}]
+        index = 1
+        for line in re.findall(r'[^\n]*\n|[^\n]+$', self.text()):
+            end = index + utf16_length(line)
+            content.append({'startIndex': index, 'endIndex': end,
+                            'paragraph': {'elements': [{'startIndex': index, 'endIndex': end,
+                                                        'textRun': {'content': line}}]}})
+            index = end
+        return content
+
+    def get(self, documentId, fields=None):
+        self.calls["get"] += 1
+        if fields == "revisionId":
+            return _FakeRequest(lambda: {'revisionId': str(self.revision)})
+        return _FakeRequest(lambda: {'documentId': documentId, 'revisionId': str(self.revision),
+                                     'body': {'content': self._content()}})
+
+    def batchUpdate(self, documentId, body):
+        self.calls["batchUpdate"] += 1
+        return _FakeRequest(lambda: self._apply(documentId, body))
+
+    def _apply(self, documentId, body):
+        required = body.get('writeControl', {}).get('requiredRevisionId')
+        if required is not None and required != str(self.revision):
+            raise FakeDocsError(400, f"Revision {required} is not the current revision {self.revision}")
+        for request in body['requests']:
+            insert = request['insertText']
+            offset = 2 * (insert['location']['index'] - 1)
+            self.body = self.body[:offset] + insert['text'].encode('utf-16-le') + self.body[offset:]
+        self.revision += 1
+        return {'documentId': documentId, 'writeControl': {'requiredRevisionId': str(self.revision)}}
+
+
+class FakeDocsError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _FakeRequest:
+    def __init__(self, run):
+        self.run = run
+
+    def execute(self):
+        return self.run()
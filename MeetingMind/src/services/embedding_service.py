@@ -0,0 +1,134 @@
+# Text embeddings for relevance scoring.
+# OpenAIEmbedder calls the embeddings API; HashingEmbedder is a local, deterministic TF-IDF
+# stand-in (feature hashing, no vocabulary to store) for offline runs and tests. Vectors are
+# L2-normalised so relevance is a plain dot product, and can be cached to disk in an .npz file.
+# numpy is imported on first use, like the openai client, to keep it off the startup path.
+import hashlib
+import math
+import os
+from collections import Counter
+
+from src.agents.keyword_monitor import keywords
+
+
+def _bucket(feature, dim):
+    """Stable (process-independent) hash of a feature into a bucket and a sign."""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+def normalize_rows(matrix):
+    import numpy as np
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class HashingEmbedder:
+    """Deterministic TF-IDF embeddings via feature hashing of keywords and keyword bigrams.
+
+    Args:
+        dim: Number of hash buckets (vector size).
+        corpus: Optional texts to fit inverse document frequencies on; without it every feature weighs 1.
+    """
+
+    def __init__(self, dim=1024, corpus=None):
+        self.dim = dim
+        self.idf = {}
+        self.default_idf = 1.0
+        self.name = f"hashing-{dim}"
+        if corpus:
+            self.fit(corpus)
+
+    @staticmethod
+    def _features(text):
+        tokens = keywords(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def fit(self, corpus):
+        """Weight features by inverse document frequency over the corpus."""
+        corpus = list(corpus)
+        document_frequency = Counter(feature for text in corpus for feature in set(self._features(text)))
+        self.idf = {feature: math.log((1 + len(corpus)) / (1 + count)) + 1
+                    for feature, count in document_frequency.items()}
+        fingerprint = hashlib.sha256("\n".join(corpus).encode("utf-8")).hexdigest()[:12]
+        self.name = f"hashing-{self.dim}-{fingerprint}"
+        # Unseen features weigh as much as the rarest seen ones
+        self.default_idf = math.log(1 + len(corpus)) + 1
+
+    def embed_one(self, text):
+        import numpy as np
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in Counter(self._features(text)).items():
+            bucket, sign = _bucket(feature, self.dim)
+            weight = (1 + math.log(count)) * self.idf.get(feature, self.default_idf)
+            vector[bucket] += sign * weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def embed(self, texts):
+        import numpy as np
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed_one(text) for text in texts])
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API, normalised to unit length."""
+
+    def __init__(self, model="text-embedding-3-small", api_key=None):
+        self.model = model
+        self.name = model
+        self.api_key = api_key
+        self.client = None
+
+    async def embed(self, texts):
+        import numpy as np
+        if self.client is None:
+            from openai import AsyncOpenAI
+            self.client = AsyncOpenAI(api_key=self.api_key or os.getenv("API_KEY"))
+        response = await self.client.embeddings.create(model=self.model, input=list(texts))
+        return normalize_rows(np.array([item.embedding for item in response.data], dtype=np.float32))
+
+
+class EmbeddingCache:
+    """Vectors keyed by (embedder name, text), kept in memory and saved to an .npz file.
+
+    Args:
+        path: The .npz file, or None for an in-memory cache.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.vectors = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            import numpy as np
+            with np.load(path) as data:
+                self.vectors = dict(zip(data["keys"].tolist(), data["vectors"]))
+
+    @staticmethod
+    def key(embedder, text):
+        return hashlib.sha256(f"{embedder.name}\n{text}".encode("utf-8")).hexdigest()
+
+    async def embed(self, embedder, texts):
+        """Return a row per text, embedding only the texts not seen before in one call."""
+        import numpy as np
+        keys = [self.key(embedder, text) for text in texts]
+        missing = list(dict.fromkeys(text for key, text in zip(keys, texts) if key not in self.vectors))
+        if missing:
+            for text, vector in zip(missing, await embedder.embed(missing)):
+                self.vectors[self.key(embedder, text)] = vector
+            self.dirty = True
+        return np.vstack([self.vectors[key] for key in keys])
+
+    def save(self):
+        """Write the cache to disk (atomically) if it changed."""
+        if not self.path or not self.dirty:
+            return
+        import numpy as np
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        keys = list(self.vectors)
+        np.savez(tmp_path, keys=np.array(keys), vectors=np.vstack([self.vectors[key] for key in keys]))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
@@ -1,12 +1,12 @@
 import os
 import json
-import openai
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+import asyncio
 import pickle
 import re
+import threading
+from src.services.llm_service import get_llm_service
+from src.services.doc_writer_service import MAIN_HEADING_PATTERN, SUBSECTION_HEADING_PATTERN, write_bullets
+from src.services.snapshot_service import write_text_atomic
 
 # Define the scopes
 SCOPES = ['https://www.googleapis.com/auth/documents']
@@ -15,8 +15,55 @@ SCOPES = ['https://www.googleapis.com/auth/documents']
 minutes_doc_id = '1W6BTAWwDpQL_X3dD02Z4j9AbHHTDSek0iOWc0f6MkDM'  # minutes template doc ID
 roles_doc_id = '1Zibfc1Q8uLayySoMTbW6sZS1RhVEV6giWVShoZ450pU'  # roles doc ID
 
+# Credentials are loaded from token.pickle once per process and refreshed in memory when they expire
+_credentials = None
+_credentials_lock = threading.Lock()
+# The Docs client is not thread-safe, so each worker thread builds and keeps its own
+_thread_local = threading.local()
+# SectionIndex per document ID, used by append_detail_to_doc
+_section_indexes = {}
+_section_indexes_lock = threading.Lock()
+# Minutes structures by document ID, each with the revision it was extracted from
+STRUCTURE_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache", "minutes_structures.json"
+)
+
+# Template metadata lines such as "Date: March 8, 2025" or "**Attendees:** Rohan, Adi"
+METADATA_PATTERN = re.compile(
+    r'^[*_\s]*(date|time|attendees|present|absences|absent|apologies|next meeting)[*_\s]*:[*_\s]*(.*?)[*_\s]*$',
+    re.IGNORECASE
+)
+METADATA_KEYS = {"date": "date", "time": "time", "attendees": "attendees", "present": "attendees",
+                 "absences": "absences", "absent": "absences", "apologies": "absences", "next meeting": "nextMeeting"}
+
 def get_google_credentials():
     """Get or refresh credentials for Google API access."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials and _credentials.valid:
+            return _credentials
+        if _credentials and _credentials.expired and _credentials.refresh_token:
+            from google.auth.transport.requests import Request
+            _credentials.refresh(Request())
+            return _credentials
+        _credentials = _load_google_credentials()
+        return _credentials
+
+def get_docs_service():
+    """Return a cached Google Docs API client for the calling thread."""
+    service = getattr(_thread_local, "docs_service", None)
+    if service is None:
+        # The Google API stack is slow to import; load it only when a document is actually used
+        from googleapiclient.discovery import build
+        service = build('docs', 'v1', credentials=get_google_credentials())
+        _thread_local.docs_service = service
+    return service
+
+def _load_google_credentials():
+    """Load credentials from token.pickle, running the OAuth flow if needed."""
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     # Get the directory where google_doc_service.py is located
     service_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -44,26 +91,31 @@ def get_google_credentials():
     
     return creds
 
-def get_document_content(doc_id):
+def get_document(doc_id, service=None):
+    """Retrieve a Google Doc (documents().get response) by its ID."""
+    service = service or get_docs_service()
+    return service.documents().get(documentId=doc_id).execute()
+
+def get_document_revision(doc_id, service=None):
+    """Retrieve only the revision ID of a Google Doc, without its content."""
+    service = service or get_docs_service()
+    return service.documents().get(documentId=doc_id, fields="revisionId").execute().get('revisionId')
+
+def document_text(document):
+    """Concatenate the text runs of a documents().get response."""
+    return "".join(
+        para_elem['textRun']['content']
+        for elem in document.get('body').get('content') if 'paragraph' in elem
+        for para_elem in elem['paragraph']['elements'] if 'textRun' in para_elem
+    )
+
+def get_document_content(doc_id, service=None):
     """Retrieve the content of a Google Doc by its ID."""
-    creds = get_google_credentials()
-    service = build('docs', 'v1', credentials=creds)
-    
-    document = service.documents().get(documentId=doc_id).execute()
-    doc_content = document.get('body').get('content')
-    
-    text_content = ""
-    for elem in doc_content:
-        if 'paragraph' in elem:
-            for para_elem in elem['paragraph']['elements']:
-                if 'textRun' in para_elem:
-                    text_content += para_elem['textRun']['content']
-    
-    return text_content
+    return document_text(get_document(doc_id, service))
 
-def extract_structure_with_llm(text_content):
+async def extract_structure_with_llm(text_content, llm=None):
     """Use an LLM to extract the meeting structure from text content."""
-    openai.api_key = os.getenv("API_KEY")  # Make sure your API key is set
+    llm = llm or get_llm_service()
     
     prompt = f"""
     Extract the meeting structure from the following meeting minutes template:
@@ -106,35 +158,31 @@ def extract_structure_with_llm(text_content):
     Return only the JSON structure with no additional text.
     """
     
+    messages = [
+        {"role": "system", "content": "You are a helper that extracts structured data from meeting minutes templates."},
+        {"role": "user", "content": prompt}
+    ]
+
     try:
-        response = openai.chat.completions.create(
+        structure_json = await llm.chat(
+            messages,
             model="gpt-3.5-turbo-1106",
-            messages=[
-                {"role": "system", "content": "You are a helper that extracts structured data from meeting minutes templates."},
-                {"role": "user", "content": prompt}
-            ],
             temperature=0.2,
+            max_tokens=2000,
             response_format={"type": "json_object"}
         )
-        
-        structure_json = response.choices[0].message.content
         return json.loads(structure_json)
     except Exception as e:
         print(f"Error with OpenAI API: {e}")
         # Fall back to simpler API call without response_format
-        response = openai.chat.completions.create(
+        content = await llm.chat(
+            messages,
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helper that extracts structured data from meeting minutes templates."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2
+            temperature=0.2,
+            max_tokens=2000
         )
         
-        content = response.choices[0].message.content
-        
         # Try to extract JSON from the response
-        import re
         json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
         if json_match:
             content = json_match.group(1)
@@ -146,6 +194,59 @@ def extract_structure_with_llm(text_content):
         
         return json.loads(content)
 
+def _heading_title(text):
+    return text.strip().strip("*").strip()
+
+def _split_names(text):
+    return [name.strip() for name in re.split(r',|;|\band\b', text) if name.strip()]
+
+def extract_structure_from_text(text_content):
+    """Parse a minutes template that uses the "### **N. Title**" / "#### N.M Title" headings.
+
+    One pass over the lines; produces the structure extract_structure_with_llm asks for. Returns None
+    if the text has no such headings or a subsection heading has no parent, so the caller can fall
+    back to the LLM.
+    """
+    structure = {"date": "", "time": "", "attendees": [], "absences": [], "agenda": {}, "nextMeeting": ""}
+    items = {}  # Every agenda item by id, for nesting subsections
+    list_key = None  # Attendees or absences given as a bullet list under their label
+    for line in text_content.splitlines():
+        line = line.strip()
+        match = MAIN_HEADING_PATTERN.match(line)
+        if match:
+            section_id = match.group(1)
+            items[section_id] = structure["agenda"][section_id] = {"title": _heading_title(line[match.end():]),
+                                                                   "details": ""}
+            list_key = None
+            continue
+        match = SUBSECTION_HEADING_PATTERN.match(line)
+        if match:
+            subsection_id = match.group(1)
+            parent = items.get(subsection_id.rsplit(".", 1)[0])
+            if parent is None:
+                return None
+            # Items with subsections keep their details in the subsections
+            parent.pop("details", None)
+            items[subsection_id] = parent.setdefault("subsections", {})[subsection_id] = {
+                "title": _heading_title(line[match.end():]), "details": ""
+            }
+            list_key = None
+            continue
+        match = METADATA_PATTERN.match(line)
+        if match:
+            key = METADATA_KEYS[match.group(1).lower()]
+            if key in ("attendees", "absences"):
+                structure[key].extend(_split_names(match.group(2)))
+                list_key = key
+            else:
+                structure[key] = match.group(2)
+                list_key = None
+        elif list_key and line[:2] in ("- ", "* ", "• "):
+            structure[list_key].extend(_split_names(line[2:]))
+        elif line:
+            list_key = None
+    return structure if structure["agenda"] else None
+
 def extract_roles_data_from_text(text_content):
     """Extract role data directly from text content using regex parsing."""
     import re
@@ -191,13 +292,43 @@ def generate_roles_data(doc_id, output_path=None):
     
     return roles_data
 
-def generate_minutes_structure(doc_id=minutes_doc_id, output_path=None):
-    """Generate meeting minutes structure from Google Doc and save to file."""
-    # Get document content
-    content = get_document_content(doc_id)
-    
-    # Extract structure using LLM
-    structure = extract_structure_with_llm(content)
+def _load_structure_cache(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _save_structure_cache(path, cache):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_text_atomic(path, json.dumps(cache, indent=2))
+
+async def generate_minutes_structure(doc_id=minutes_doc_id, output_path=None, service=None,
+                                     cache_path=STRUCTURE_CACHE_PATH, llm=None):
+    """Generate meeting minutes structure from Google Doc and save to file.
+
+    The structure is cached against the document's revision ID, so an unchanged template is neither
+    fetched nor extracted again (cache_path=None disables the cache). Templates using the
+    "### **N. " / "#### N.M " headings are parsed locally; only other documents go to the LLM.
+    """
+    revision_id = await asyncio.to_thread(get_document_revision, doc_id, service)
+    cache = await asyncio.to_thread(_load_structure_cache, cache_path) if cache_path else {}
+    entry = cache.get(doc_id)
+    if revision_id and entry and entry.get("revision_id") == revision_id:
+        structure = entry["structure"]
+        print(f"Minutes structure of revision {revision_id} loaded from cache")
+    else:
+        document = await asyncio.to_thread(get_document, doc_id, service)
+        content = document_text(document)
+        structure = extract_structure_from_text(content)
+        if structure is None:
+            # Not the usual heading convention: extract the structure using LLM
+            print("Template headings not recognised; extracting the minutes structure with the LLM")
+            structure = await extract_structure_with_llm(content, llm)
+        # Revision IDs are opaque and may change without an edit; that only costs a re-extraction
+        if cache_path and document.get('revisionId'):
+            cache[doc_id] = {"revision_id": document['revisionId'], "structure": structure}
+            await asyncio.to_thread(_save_structure_cache, cache_path, cache)
     
     # Save to file if output path provided
     if output_path:
@@ -213,7 +344,7 @@ def get_project_root():
     current_file_dir = os.path.dirname(os.path.abspath(__file__))
     return os.path.dirname(os.path.dirname(current_file_dir))
 
-def generate_required_files():
+async def generate_required_files():
     """Generate all required structure files."""
     project_root = get_project_root()
     
@@ -226,7 +357,7 @@ def generate_required_files():
     )
     
     # Generate minutes structure
-    generate_minutes_structure(doc_id=minutes_doc_id, output_path=minutes_path)
+    await generate_minutes_structure(doc_id=minutes_doc_id, output_path=minutes_path)
     
     # Generate roles data
     generate_roles_data(doc_id=roles_doc_id, output_path=roles_path)
@@ -236,86 +367,28 @@ def generate_required_files():
         "roles_path": roles_path
     }
 
-def append_detail_to_doc(doc_id, section_id, detail):
+def append_detail_to_doc(doc_id, section_id, detail, service=None):
     """Append a detail to a specific section or subsection in the Google Doc.
     
+    The heading positions are indexed once per document and shifted after each insert;
+    the document is only re-read when someone else has edited it.
+
     Args:
         doc_id: The Google Doc ID
-        section_id: The section identifier (e.g., "2.1")
+        section_id: The section identifier (e.g., "2.1", or "2." for a main section)
         detail: The detail text to add
+        service: Docs API client to use, defaults to the cached one
     """
-    creds = get_google_credentials()
-    service = build('docs', 'v1', credentials=creds)
+    service = service or get_docs_service()
     
-    # Get the document
-    document = service.documents().get(documentId=doc_id).execute()
+    with _section_indexes_lock:
+        index, dropped = write_bullets(service, doc_id, _section_indexes.get(doc_id), [(section_id, detail)])
+        _section_indexes[doc_id] = index
     
-    # Define the pattern to search for based on section_id
-    if '.' in section_id and not section_id.endswith('.'):
-        # It's a subsection like "2.1"
-        pattern = f"#### {section_id} "
-    else:
-        # It's a main section like "2." (strip the dot for matching)
-        section_num = section_id.rstrip('.')
-        pattern = f"### **{section_num}. "
-    
-    # Find the heading in the document
-    content = document.get('body').get('content')
-    found_section = False
-    insert_position = None
-    
-    for i, element in enumerate(content):
-        if not found_section and 'paragraph' in element:
-            paragraph_text = ""
-            
-            for text_run in element['paragraph']['elements']:
-                if 'textRun' in text_run:
-                    paragraph_text += text_run['textRun']['content']
-            
-            if paragraph_text.startswith(pattern):
-                # Found our section heading
-                found_section = True
-                # Start with the position right after this paragraph
-                insert_position = element.get('endIndex', None)
-                continue
-        
-        if found_section and 'paragraph' in element:
-            paragraph_text = ""
-            
-            for text_run in element['paragraph']['elements']:
-                if 'textRun' in text_run:
-                    paragraph_text += text_run['textRun']['content']
-            
-            # If we find a new section or subsection heading, stop looking
-            if (paragraph_text.startswith("### **") or 
-                paragraph_text.startswith("#### ")):
-                break
-            
-            # If we're still in bullet points, update our insert position
-            # to the end of this paragraph
-            if paragraph_text.strip().startswith("- "):
-                insert_position = element.get('endIndex', None)
-                continue
-    
-    if insert_position:
-        # Insert the bullet point at the position we found
-        requests = [{
-            'insertText': {
-                'location': {'index': insert_position},
-                'text': f"- {detail}\n"
-            }
-        }]
-        
-        service.documents().batchUpdate(
-            documentId=doc_id,
-            body={'requests': requests}
-        ).execute()
-        
-        print(f"Added bullet point to {section_id}")
-        return True
-    else:
-        print(f"Could not find section {section_id}")
+    if dropped:
         return False
+    print(f"Added bullet point to {section_id}")
+    return True
 
 if __name__ == "__main__":
-    generate_required_files()
\ No newline at end of file
+    asyncio.run(generate_required_files())
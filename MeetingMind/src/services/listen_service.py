@@ -0,0 +1,232 @@
+# Live speech-to-text ingestion.
+# Audio arrives in short PCM frames (from a microphone, a WAV file or a network stream) and is fed to a
+# streaming ASR engine, which answers with partial hypotheses that keep changing and, at the end of each
+# utterance, a final one. Partials are coalesced away so only finalized utterances reach
+# TranscriptProcessor.add_transcript_line. The audio itself is kept in a fixed-size ring buffer, so
+# memory stays bounded however long the meeting runs.
+# Engines and transcript sources that already produce text (a websocket or stdin stand-in sending
+# JSON Lines) plug into the same pipeline.
+import asyncio
+import datetime
+import json
+import sys
+import wave
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Hypothesis:
+    """One ASR result. start/end are seconds of audio since the stream started."""
+    text: str
+    final: bool = False
+    speaker: str = None
+    start: float = None
+    end: float = None
+
+    def to_line(self, start_time, default_speaker="Speaker"):
+        """The transcript line dict TranscriptProcessor expects."""
+        spoken = start_time + datetime.timedelta(seconds=self.end or 0)
+        return {"timestamp": spoken.strftime("%I:%M:%S %p"), "speaker": self.speaker or default_speaker,
+                "message": self.text}
+
+
+class AudioRingBuffer:
+    """The most recent capacity bytes of an audio stream, addressed by absolute stream offset."""
+
+    def __init__(self, capacity):
+        self.buffer = bytearray(capacity)
+        self.capacity = capacity
+        self.total = 0  # Bytes written since the stream started
+
+    def write(self, data):
+        if len(data) > self.capacity:
+            self.total += len(data) - self.capacity  # Bytes that never made it into the buffer
+            data = data[-self.capacity:]
+        start = self.total % self.capacity
+        first = min(len(data), self.capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        self.buffer[:len(data) - first] = data[first:]
+        self.total += len(data)
+
+    @property
+    def oldest(self):
+        """Stream offset of the oldest byte still buffered."""
+        return max(0, self.total - self.capacity)
+
+    def get(self, start, end=None):
+        """Bytes between two stream offsets, or None if they have already been overwritten."""
+        end = self.total if end is None else min(end, self.total)
+        if start < self.oldest or start > end:
+            return None
+        first = start % self.capacity
+        length = end - start
+        if first + length <= self.capacity:
+            return bytes(self.buffer[first:first + length])
+        return bytes(self.buffer[first:] + self.buffer[:first + length - self.capacity])
+
+
+class VoskEngine:
+    """Streaming recognition with a local Vosk model (pip install vosk)."""
+
+    def __init__(self, model_path, sample_rate=16000):
+        from vosk import KaldiRecognizer, Model
+        self.recognizer = KaldiRecognizer(Model(model_path), sample_rate)
+
+    def accept(self, frame):
+        if self.recognizer.AcceptWaveform(frame):
+            return [Hypothesis(json.loads(self.recognizer.Result()).get("text", ""), final=True)]
+        return [Hypothesis(json.loads(self.recognizer.PartialResult()).get("partial", ""))]
+
+    def flush(self):
+        return [Hypothesis(json.loads(self.recognizer.FinalResult()).get("text", ""), final=True)]
+
+
+class ScriptedEngine:
+    """Offline engine for tests: reveals a script word by word as the audio plays.
+
+    Args:
+        script: (end_seconds, text) per utterance, in order. Each utterance is emitted as growing
+            partials while its audio plays and as a final once end_seconds of audio have been received.
+        bytes_per_second: Audio rate of the frames passed to accept().
+    """
+
+    def __init__(self, script, bytes_per_second):
+        self.script = list(script)
+        self.bytes_per_second = bytes_per_second
+        self.received = 0
+        self.utterance_start = 0.0
+
+    def accept(self, frame):
+        self.received += len(frame)
+        now = self.received / self.bytes_per_second
+        results = []
+        while self.script and now >= self.script[0][0]:
+            self.utterance_start, text = self.script.pop(0)
+            results.append(Hypothesis(text, final=True))
+        if self.script:
+            end, text = self.script[0]
+            words = text.split()
+            heard = int(len(words) * (now - self.utterance_start) / (end - self.utterance_start))
+            if heard:
+                results.append(Hypothesis(" ".join(words[:heard])))
+        return results
+
+    def flush(self):
+        results = [Hypothesis(text, final=True) for _, text in self.script]
+        self.script = []
+        return results
+
+
+async def wav_frames(path, frame_ms=20, realtime=False):
+    """PCM frames of a WAV file, frame_ms long; with realtime=True they arrive at the speed of the audio."""
+    with wave.open(path, 'rb') as wav:
+        frames_per_chunk = max(1, wav.getframerate() * frame_ms // 1000)
+        while True:
+            frame = wav.readframes(frames_per_chunk)
+            if not frame:
+                break
+            yield frame
+            await asyncio.sleep(frame_ms / 1000 if realtime else 0)
+
+
+async def read_hypotheses(reader):
+    """Hypotheses sent as JSON Lines ({"text", "final", "speaker"}) over an asyncio StreamReader.
+
+    Stand-in for a websocket transcription feed; see stdin_reader() for piping one in locally.
+    """
+    while True:
+        raw = await reader.readline()
+        if not raw:
+            break
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            print(f"Skipping malformed transcription message: {raw[:50]!r}")
+            continue
+        yield Hypothesis(data.get("text", ""), final=bool(data.get("final")), speaker=data.get("speaker"),
+                         start=data.get("start"), end=data.get("end"))
+
+
+async def stdin_reader():
+    """An asyncio StreamReader over stdin."""
+    reader = asyncio.StreamReader()
+    await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    return reader
+
+
+class ListenService:
+    """Turns audio frames or raw hypotheses into finalized transcript lines.
+
+    Args:
+        engine: Streaming ASR engine with accept(frame) and flush(), each returning Hypotheses.
+        sample_rate, sample_width, channels: Format of the PCM frames.
+        buffer_seconds: Audio kept in the ring buffer.
+        speaker: Speaker for hypotheses that do not name one.
+        offload: Run the engine in a worker thread (for engines that block for long per frame).
+    """
+
+    def __init__(self, engine=None, sample_rate=16000, sample_width=2, channels=1, buffer_seconds=30,
+                 speaker="Speaker", offload=False):
+        self.engine = engine
+        self.bytes_per_second = sample_rate * sample_width * channels
+        self.audio = AudioRingBuffer(int(buffer_seconds * self.bytes_per_second))
+        self.speaker = speaker
+        self.offload = offload
+        self.partial = ""  # Latest partial hypothesis, for live display
+        self.utterance_offset = 0  # Stream offset where the current utterance started
+        self.stats = {"frames": 0, "partials": 0, "finals": 0}
+
+    async def _accept(self, frame):
+        if self.offload:
+            return await asyncio.to_thread(self.engine.accept, frame)
+        return self.engine.accept(frame)
+
+    def _timed(self, hypothesis):
+        """Fill in start/end from the audio position."""
+        now = self.audio.total / self.bytes_per_second
+        if hypothesis.start is None:
+            hypothesis.start = self.utterance_offset / self.bytes_per_second
+        if hypothesis.end is None:
+            hypothesis.end = now
+        if hypothesis.final:
+            self.utterance_offset = self.audio.total
+        return hypothesis
+
+    async def transcribe(self, frames):
+        """Feed audio frames to the engine and yield its hypotheses, partial and final."""
+        async for frame in frames:
+            self.audio.write(frame)
+            self.stats["frames"] += 1
+            for hypothesis in await self._accept(frame):
+                yield self._timed(hypothesis)
+        for hypothesis in self.engine.flush():
+            yield self._timed(hypothesis)
+
+    async def utterances(self, hypotheses):
+        """Coalesce partial hypotheses; yield only finalized, non-empty utterances."""
+        async for hypothesis in hypotheses:
+            if not hypothesis.final:
+                self.partial = hypothesis.text
+                self.stats["partials"] += 1
+                continue
+            self.partial = ""
+            if hypothesis.text.strip():
+                self.stats["finals"] += 1
+                yield hypothesis
+
+    def utterance_audio(self, utterance):
+        """PCM audio of an utterance, or None if it has already left the ring buffer."""
+        return self.audio.get(int(utterance.start * self.bytes_per_second),
+                              int(utterance.end * self.bytes_per_second))
+
+    async def run(self, processor, frames=None, hypotheses=None):
+        """Stream finalized utterances into a TranscriptProcessor, then signal the end of the stream.
+
+        Pass audio frames (decoded by the engine) or hypotheses that are already text.
+        """
+        if processor.start_time is None:
+            processor.start_time = datetime.datetime.now().replace(microsecond=0)
+        source = self.transcribe(frames) if frames is not None else hypotheses
+        async for utterance in self.utterances(source):
+            await processor.add_transcript_line(utterance.to_line(processor.start_time, self.speaker))
+        await processor.end_of_stream()
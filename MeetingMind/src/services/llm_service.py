@@ -0,0 +1,456 @@
+# Shared async LLM client used by all agents.
+# One native-async client with a pooled HTTP connection, a concurrency cap, token-bucket
+# rate limiting (requests/min and tokens/min) and jittered retries on 429/5xx.
+import asyncio
+import datetime
+import email.utils
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+
+from src.services.cache_service import make_cache_key
+from src.services.telemetry_service import get_telemetry
+
+DEFAULT_MODEL = "gpt-4o"  # Supports structured outputs (json_schema response_format)
+
+# Status codes worth retrying: rate limiting and server-side errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header: delay-seconds or an HTTP-date (RFC 9110); None if unusable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def estimate_tokens(text):
+    """Rough token estimate (about 4 characters per token) used for budgets and rate limits."""
+    return max(1, len(text) // 4)
+
+
+def estimate_message_tokens(messages):
+    """Estimate the prompt tokens of a list of chat messages."""
+    return sum(estimate_tokens(message.get("content") or "") + 4 for message in messages)
+
+
+class LLMError(Exception):
+    """Error raised by an LLM backend.
+
+    status_code is None for connection errors, which are retried like 5xx responses.
+    """
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status_code is None or self.status_code in RETRYABLE_STATUS_CODES
+
+
+@dataclass
+class LLMResponse:
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class OpenAIBackend:
+    """Backend for the OpenAI chat completions API using the native async client."""
+
+    def __init__(self, api_key=None, max_connections=20, timeout=60.0):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.client = None
+
+    def _get_client(self):
+        # Created on first use so the HTTP pool is bound to the running event loop
+        if self.client is None:
+            import httpx
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            self.client = AsyncOpenAI(
+                api_key=self.api_key or os.getenv("API_KEY"),
+                max_retries=0,  # Retries are handled by LLMService
+                timeout=self.timeout,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    )
+                ),
+            )
+        return self.client
+
+    async def complete(self, model, messages, temperature, max_tokens, stop_when=None, **kwargs):
+        import openai
+
+        client = self._get_client()
+        try:
+            if stop_when is not None:
+                return await self._stream(client, model, messages, temperature, max_tokens, stop_when, **kwargs)
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs
+            )
+        except openai.APIStatusError as e:
+            retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+            raise LLMError(str(e), status_code=e.status_code,
+                           retry_after=parse_retry_after(retry_after)) from e
+        except openai.APIConnectionError as e:
+            raise LLMError(str(e)) from e
+
+        usage = response.usage
+        return LLMResponse(
+            content=response.choices[0].message.content or "",
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def _stream(self, client, model, messages, temperature, max_tokens, stop_when, **kwargs):
+        """Stream the completion and stop reading as soon as stop_when(content so far) is true."""
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+        content = ""
+        usage = None
+        try:
+            async for chunk in stream:
+                usage = chunk.usage or usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    content += chunk.choices[0].delta.content
+                    if stop_when(content):
+                        break
+        finally:
+            # Closing the response ends generation early; no usage chunk arrives then
+            await stream.close()
+        return LLMResponse(
+            content=content,
+            prompt_tokens=usage.prompt_tokens if usage else estimate_message_tokens(messages),
+            completion_tokens=usage.completion_tokens if usage else estimate_tokens(content),
+        )
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+
+class FakeBackend:
+    """Local backend for offline runs and tests.
+
+    Args:
+        responder: Callable taking the messages and returning the response text,
+            or a list of response texts returned in order.
+        latency: Seconds to sleep per request.
+        failures: Status codes to raise, one per request, before answering normally.
+        token_latency: Seconds per generated token (4 characters); with stop_when the response is
+            streamed token by token and generation stops once stop_when(content so far) is true.
+    """
+
+    def __init__(self, responder=None, latency=0.0, failures=None, token_latency=0.0):
+        self.responder = responder if responder is not None else (lambda messages: "")
+        self.latency = latency
+        self.failures = list(failures or [])
+        self.token_latency = token_latency
+        self.calls = []
+
+    async def complete(self, model, messages, temperature, max_tokens, stop_when=None, **kwargs):
+        self.calls.append({"model": model, "messages": messages, "temperature": temperature,
+                           "max_tokens": max_tokens, **kwargs})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failures:
+            raise LLMError("Injected failure", status_code=self.failures.pop(0))
+
+        if callable(self.responder):
+            content = self.responder(messages)
+        else:
+            content = self.responder.pop(0)
+        content = content[:max_tokens * 4]
+        if stop_when is not None:
+            for end in range(4, len(content) + 4, 4):
+                if self.token_latency:
+                    await asyncio.sleep(self.token_latency)
+                if stop_when(content[:end]):
+                    content = content[:end]
+                    break
+        elif self.token_latency:
+            await asyncio.sleep(self.token_latency * estimate_tokens(content))
+        return LLMResponse(content=content, prompt_tokens=estimate_message_tokens(messages),
+                           completion_tokens=estimate_tokens(content))
+
+    async def aclose(self):
+        pass
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute, holding at most capacity tokens."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        """Wait until amount tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        async with self.lock:  # First come, first served
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+
+class LLMService:
+    """Async chat completion client shared across agents.
+
+    Args:
+        backend: Object with an async complete(model, messages, temperature, max_tokens, **kwargs)
+            method returning an LLMResponse. Defaults to OpenAIBackend.
+        max_concurrency: Maximum number of requests in flight at once.
+        requests_per_minute: Request rate limit, or None for no limit.
+        tokens_per_minute: Token rate limit (prompt estimate + max_tokens), or None for no limit.
+        max_retries: Retries for 429/5xx/connection errors before giving up.
+        base_delay: Initial backoff in seconds, doubled per attempt with full jitter.
+        max_delay: Upper bound for a single backoff.
+        cache: Optional LLMResponseCache consulted before every request.
+    """
+
+    def __init__(self, backend=None, max_concurrency=8, requests_per_minute=500,
+                 tokens_per_minute=80000, max_retries=5, base_delay=0.5, max_delay=20.0, cache=None):
+        self.backend = backend or OpenAIBackend(max_connections=max_concurrency)
+        self.cache = cache
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"requests": 0, "retries": 0, "failures": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0}
+        self.telemetry = get_telemetry()
+
+    def _backoff(self, attempt, error):
+        if error.retry_after is not None:
+            return min(self.max_delay, error.retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def complete(self, messages, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300,
+                       use_cache=True, stop_when=None, **kwargs):
+        """Send a chat completion request and return the LLMResponse.
+
+        Identical requests are answered from the cache when one is configured, unless use_cache is False.
+        stop_when(content so far) makes the backend stream the response and stop early once it is true.
+        """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = make_cache_key(model, messages, temperature, max_tokens, **kwargs)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                self.telemetry.inc("llm_cache_hits_total")
+                return LLMResponse(**cached)
+
+        if stop_when is not None:
+            kwargs["stop_when"] = stop_when
+        response = await self._request(messages, model, temperature, max_tokens, **kwargs)
+        if cache_key is not None:
+            await self.cache.set(cache_key, asdict(response))
+        return response
+
+    async def _request(self, messages, model, temperature, max_tokens, **kwargs):
+        attempt = 0
+        telemetry = self.telemetry
+        while True:
+            queued = time.perf_counter()
+            if self.request_bucket:
+                await self.request_bucket.acquire(1)
+            if self.token_bucket:
+                await self.token_bucket.acquire(estimate_message_tokens(messages) + max_tokens)
+
+            try:
+                async with self.semaphore:
+                    # Time spent in the rate limiters and waiting for a concurrency slot
+                    telemetry.observe("llm_wait_seconds", time.perf_counter() - queued)
+                    self.stats["requests"] += 1
+                    with telemetry.span("llm.call", model=model, attempt=attempt):
+                        response = await self.backend.complete(model, messages, temperature, max_tokens, **kwargs)
+            except LLMError as e:
+                telemetry.inc("llm_errors_total", status=e.status_code or "connection")
+                if not e.retryable or attempt >= self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+
+            self.stats["prompt_tokens"] += response.prompt_tokens
+            self.stats["completion_tokens"] += response.completion_tokens
+            telemetry.inc("llm_requests_total", model=model)
+            telemetry.inc("llm_prompt_tokens_total", response.prompt_tokens, model=model)
+            telemetry.inc("llm_completion_tokens_total", response.completion_tokens, model=model)
+            return response
+
+    async def chat(self, messages, model=DEFAULT_MODEL, temperature=0.7, max_tokens=300,
+                   use_cache=True, **kwargs):
+        """Send a chat completion request and return the stripped response text."""
+        response = await self.complete(messages, model=model, temperature=temperature,
+                                       max_tokens=max_tokens, use_cache=use_cache, **kwargs)
+        return response.content.strip()
+
+    async def aclose(self):
+        await self.backend.aclose()
+        if self.cache is not None:
+            self.cache.close()
+
+
+class FairScheduler:
+    """Admits requests from many tenants (e.g. meetings) round-robin under a global concurrency limit.
+
+    A tenant with a long backlog gets one slot per turn, so it cannot starve the others.
+
+    Args:
+        max_concurrency: Requests in flight across all tenants.
+        max_per_tenant: Requests in flight per tenant, or None for no per-tenant limit.
+    """
+
+    def __init__(self, max_concurrency=8, max_per_tenant=None):
+        self.available = max_concurrency
+        self.max_per_tenant = max_per_tenant
+        self.running = {}  # Tenant -> requests in flight
+        self.waiters = OrderedDict()  # Tenant -> deque of futures, in round-robin order
+
+    def _can_run(self, tenant):
+        return self.max_per_tenant is None or self.running.get(tenant, 0) < self.max_per_tenant
+
+    def _grant(self, tenant):
+        self.available -= 1
+        self.running[tenant] = self.running.get(tenant, 0) + 1
+
+    async def acquire(self, tenant):
+        if self.available > 0 and not self.waiters and self._can_run(tenant):
+            self._grant(tenant)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(tenant, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(tenant)  # Granted just as we were cancelled
+            else:
+                queue = self.waiters.get(tenant)
+                if queue is not None and future in queue:
+                    queue.remove(future)
+                    if not queue:
+                        del self.waiters[tenant]
+            raise
+
+    def release(self, tenant):
+        self.available += 1
+        self.running[tenant] -= 1
+        if not self.running[tenant]:
+            del self.running[tenant]
+        self._dispatch()
+
+    def _dispatch(self):
+        skipped = 0
+        while self.available > 0 and self.waiters and skipped < len(self.waiters):
+            tenant, queue = next(iter(self.waiters.items()))
+            if not self._can_run(tenant):
+                self.waiters.move_to_end(tenant)
+                skipped += 1
+                continue
+            future = queue.popleft()
+            if queue:
+                self.waiters.move_to_end(tenant)  # Next turn goes to the next tenant
+            else:
+                del self.waiters[tenant]
+            if future.cancelled():
+                continue
+            self._grant(tenant)
+            future.set_result(None)
+            skipped = 0
+
+    @asynccontextmanager
+    async def slot(self, tenant):
+        await self.acquire(tenant)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+
+class ScopedLLM:
+    """A tenant's view of a shared LLMService whose requests are admitted by a FairScheduler."""
+
+    def __init__(self, service, scheduler, tenant):
+        self.service = service
+        self.scheduler = scheduler
+        self.tenant = tenant
+        self.stats = {"requests": 0}
+
+    @property
+    def backend(self):
+        return self.service.backend
+
+    async def complete(self, messages, **kwargs):
+        async with self.scheduler.slot(self.tenant):
+            self.stats["requests"] += 1
+            return await self.service.complete(messages, **kwargs)
+
+    async def chat(self, messages, **kwargs):
+        async with self.scheduler.slot(self.tenant):
+            self.stats["requests"] += 1
+            return await self.service.chat(messages, **kwargs)
+
+
+_shared_service = None
+
+
+def get_llm_service():
+    """Return the LLMService shared by all agents, creating it on first use."""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = LLMService()
+    return _shared_service
+
+
+def set_llm_service(service):
+    """Replace the shared LLMService, e.g. with one using a FakeBackend."""
+    global _shared_service
+    _shared_service = service
@@ -0,0 +1,202 @@
+# Runs many meetings in one process.
+# Each session is its own TranscriptProcessor -> MinutesAgent pipeline, but every session shares one
+# LLMService (connection pool, retries, global request/token budgets). A Google Docs client given to
+# the manager is shared too, behind a lock since the client is not thread-safe; without one, each doc
+# writer thread builds its own client. Sessions may bring their own minutes template.
+# LLM requests are admitted through a FairScheduler, one tenant per meeting, so a busy meeting cannot
+# starve a quiet one. Stopping a session drains its queues and cancels its worker tasks.
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from src.agents.keyword_monitor import KeywordMonitor
+from src.agents.minutes_agent import MinutesAgent
+from src.agents.relevance_service import RelevanceService
+from src.services.doc_writer_service import GoogleDocWriter
+from src.models.minutes import Minutes
+from src.services.llm_service import FairScheduler, ScopedLLM, get_llm_service
+from src.transcript.processor import TranscriptProcessor
+
+STARTING = "starting"
+RUNNING = "running"
+FINISHED = "finished"
+STOPPED = "stopped"
+FAILED = "failed"
+
+
+def percentiles(values):
+    """p50, p99 and max of a list of numbers (all None when empty)."""
+    values = sorted(values)
+    if not values:
+        return {"p50": None, "p99": None, "max": None}
+    return {
+        "p50": values[len(values) // 2],
+        "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+        "max": values[-1],
+    }
+
+
+@dataclass(slots=True, eq=False)
+class MeetingSession:
+    session_id: str
+    processor: TranscriptProcessor
+    agent: MinutesAgent
+    llm: ScopedLLM
+    relevance_service: RelevanceService = None
+    task: asyncio.Task = None
+    status: str = STARTING
+    error: str = None
+    drain_on_stop: bool = True
+    started: float = field(default_factory=time.monotonic)
+
+    def info(self):
+        """Status line for list_sessions()."""
+        latency = percentiles(self.agent.line_latencies)
+        return {
+            "session_id": self.session_id,
+            "status": self.status,
+            "error": self.error,
+            "lines": len(self.processor.transcript),
+            "queued": self.agent.transcript_queue.qsize(),
+            "llm_requests": self.llm.stats["requests"],
+            "skipped_lines": self.agent.skipped_lines,
+            "latency_p50": latency["p50"],
+            "latency_p99": latency["p99"],
+            "uptime": time.monotonic() - self.started,
+        }
+
+
+class MeetingManager:
+    """Starts, lists and stops concurrent meeting sessions over shared clients.
+
+    Args:
+        llm: Shared LLMService; defaults to the process-wide one.
+        docs_service: Shared Google Docs client for the sessions' doc writers, used under a lock; by
+            default every writer thread uses its own client.
+        max_concurrency: LLM requests in flight across all meetings.
+        max_per_meeting: LLM requests in flight per meeting, or None for no per-meeting limit.
+        output_dir: Where each session writes {id}_minutes.json and {id}_transcript.json.
+        keyword_monitor: Optional KeywordMonitor shared by every session.
+        profiles, role_descriptions, relevance_engine: If profiles are given, each session gets a
+            RelevanceService over them; the engine (and its embedding cache) is shared.
+        agent_options: Extra keyword arguments for every MinutesAgent.
+    """
+
+    def __init__(self, llm=None, docs_service=None, max_concurrency=16, max_per_meeting=None, output_dir=None,
+                 keyword_monitor=None, profiles=None, role_descriptions=None, relevance_engine=None,
+                 agent_options=None):
+        self.llm = llm or get_llm_service()
+        self.docs_service = docs_service
+        self.docs_lock = threading.Lock()  # Serialises calls on the shared, non-thread-safe client
+        self.scheduler = FairScheduler(max_concurrency, max_per_tenant=max_per_meeting)
+        if output_dir is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            output_dir = os.path.join(project_root, "meetings")
+        self.output_dir = output_dir
+        self.keyword_monitor = keyword_monitor
+        self.profiles = profiles
+        self.role_descriptions = role_descriptions or {}
+        self.relevance_engine = relevance_engine
+        self.agent_options = agent_options or {}
+        self.sessions = {}  # Session id -> MeetingSession
+
+    async def start_session(self, session_id, transcript_path, google_doc_id=None, clock=None,
+                            time_limit_seconds=None, subscribers=None, minutes_structure=None):
+        """Start replaying a transcript into a new minutes pipeline. Returns the MeetingSession.
+
+        subscribers: Optional profile name -> callback for the session's listen-in notifications.
+        minutes_structure: The session's minutes template, as a structure dict (e.g. from
+            generate_minutes_structure) or a Minutes model; defaults to the sample template. Keyword
+            matching then uses the session's agenda rather than the shared keyword monitor's.
+        """
+        existing = self.sessions.get(session_id)
+        if existing is not None and existing.task is not None and not existing.task.done():
+            raise ValueError(f"Meeting session {session_id} is already running")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        llm = ScopedLLM(self.llm, self.scheduler, session_id)
+        minutes = keyword_monitor = None
+        if minutes_structure is not None:
+            minutes = minutes_structure if isinstance(minutes_structure, Minutes) else Minutes.from_dict(minutes_structure)
+        if self.keyword_monitor is not None:
+            keyword_monitor = KeywordMonitor(minutes, self.role_descriptions) if minutes else self.keyword_monitor
+        relevance_service = None
+        if self.profiles:
+            relevance_service = RelevanceService(self.profiles, self.role_descriptions, llm=llm,
+                                                 engine=self.relevance_engine, keyword_monitor=keyword_monitor)
+            for name, callback in (subscribers or {}).items():
+                relevance_service.subscribe(name, callback)
+
+        processor = TranscriptProcessor(
+            transcript_file_path=os.path.join(self.output_dir, f"{session_id}_transcript.json"), clock=clock
+        )
+        doc_writer = None
+        if google_doc_id:
+            doc_writer = GoogleDocWriter(google_doc_id, service=self.docs_service,
+                                         service_lock=self.docs_lock if self.docs_service is not None else None)
+        agent = MinutesAgent(
+            name=f"MinutesAgent[{session_id}]",
+            output_path=os.path.join(self.output_dir, f"{session_id}_minutes.json"),
+            llm=llm,
+            doc_writer=doc_writer,
+            keyword_monitor=keyword_monitor,
+            relevance_service=relevance_service,
+            minutes=minutes,
+            **self.agent_options
+        )
+        processor.register_observer(agent)
+
+        session = MeetingSession(session_id, processor, agent, llm, relevance_service=relevance_service)
+        session.task = asyncio.create_task(self._run(session, transcript_path, time_limit_seconds))
+        self.sessions[session_id] = session
+        print(f"Started meeting session {session_id}")
+        return session
+
+    async def _run(self, session, transcript_path, time_limit_seconds):
+        session.status = RUNNING
+        try:
+            await session.processor.simulate_meeting(transcript_path, time_limit_seconds=time_limit_seconds)
+            session.status = FINISHED
+        except asyncio.CancelledError:
+            session.status = STOPPED
+            raise
+        except Exception as e:
+            session.status = FAILED
+            session.error = str(e)
+            print(f"Meeting session {session.session_id} failed: {e}")
+        finally:
+            # Runs on stop too: the agent finishes (or drops) queued lines and its worker is cancelled
+            await session.agent.close(drain=session.drain_on_stop)
+            await session.processor.close()
+
+    async def stop_session(self, session_id, drain=True):
+        """Stop a session's replay, then drain (or drop) its queued lines and shut its pipeline down."""
+        session = self.sessions[session_id]
+        if session.task is not None and not session.task.done():
+            session.drain_on_stop = drain
+            session.task.cancel()
+        await self.wait(session_id)
+        return session.info()
+
+    async def wait(self, session_id):
+        """Wait until a session has finished and shut down."""
+        session = self.sessions[session_id]
+        if session.task is not None:
+            await asyncio.gather(session.task, return_exceptions=True)
+        return session
+
+    async def wait_all(self):
+        await asyncio.gather(*(self.wait(session_id) for session_id in list(self.sessions)))
+
+    def list_sessions(self):
+        return [session.info() for session in self.sessions.values()]
+
+    def latency_report(self):
+        """Line-to-minutes latency percentiles across every session."""
+        return percentiles([latency for session in self.sessions.values() for latency in session.agent.line_latencies])
+
+    async def shutdown(self, drain=True):
+        """Stop every session that is still running."""
+        await asyncio.gather(*(self.stop_session(session_id, drain=drain) for session_id in list(self.sessions)))
@@ -0,0 +1,145 @@
+# Background snapshotting of in-memory state (the minutes structure) to JSON.
+# Updates only mark the state dirty; a background task writes at most one snapshot per interval,
+# atomically (write to a temp file, then rename). An optional delta journal records each change as it
+# happens, so full snapshots can be rarer while a crash still loses at most the last interval.
+import asyncio
+import json
+import os
+import time
+
+JOURNAL_SEQ_KEY = "_journal_seq"  # Last journal entry a snapshot covers
+
+
+def write_text_atomic(path, text):
+    """Write text to path so readers see either the old or the new file, never a partial one."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path, journal_path=None):
+    """Load a snapshot and the journal deltas recorded after it.
+
+    Returns (state, deltas, last_seq); state is None if there is no snapshot, and last_seq is the
+    sequence number new journal entries should continue from.
+    """
+    state = None
+    covered_seq = 0
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            state = json.load(f)
+        covered_seq = state.pop(JOURNAL_SEQ_KEY, 0)
+    last_seq = covered_seq
+
+    deltas = []
+    if journal_path and os.path.exists(journal_path):
+        with open(journal_path, 'r') as f:
+            for raw in f:
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    break  # A torn final record from a crash mid-write
+                if entry["seq"] > covered_seq:
+                    deltas.append(entry["delta"])
+                    last_seq = entry["seq"]
+    return state, deltas, last_seq
+
+
+class SnapshotWriter:
+    """Writes snapshots of get_state() in the background whenever the state is dirty.
+
+    Args:
+        path: Snapshot JSON file.
+        get_state: Callable returning the JSON-serialisable state.
+        interval: Seconds between write passes; bounds what a crash can lose.
+        journal_path: Optional JSON Lines file of deltas, appended every pass.
+        compact_interval: With a journal, seconds between full snapshots (the journal is truncated after each).
+    """
+
+    def __init__(self, path, get_state, interval=1.0, journal_path=None, compact_interval=30.0):
+        self.path = path
+        self.get_state = get_state
+        self.interval = interval
+        self.journal_path = journal_path
+        self.compact_interval = compact_interval
+        self.dirty = False
+        self.pending_deltas = []
+        self.seq = 0  # Sequence number of the last journalled delta
+        self.last_snapshot = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.task = None
+        self.stats = {"snapshots": 0, "journal_writes": 0}
+
+    def mark_dirty(self, delta=None):
+        """Record that the state changed, optionally with a JSON-serialisable delta for the journal."""
+        self.dirty = True
+        if self.journal_path and delta is not None:
+            self.seq += 1
+            self.pending_deltas.append({"seq": self.seq, "delta": delta})
+
+    def start(self, snapshot_now=False):
+        """Start the background loop; with snapshot_now the first snapshot is written right away."""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run(snapshot_now))
+
+    async def _run(self, snapshot_now=False):
+        if snapshot_now:
+            try:
+                await self.flush(force_snapshot=True)
+            except Exception as e:
+                print(f"Error saving snapshot: {e}")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error saving snapshot: {e}")
+
+    def _append_journal(self, entries):
+        with open(self.journal_path, 'a') as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshot(self, text):
+        write_text_atomic(self.path, text)
+        if self.journal_path:
+            # Everything journalled so far is in the snapshot
+            open(self.journal_path, 'w').close()
+
+    async def flush(self, force_snapshot=False):
+        """Write pending journal deltas, and a full snapshot if one is due."""
+        async with self.lock:
+            if self.journal_path and self.pending_deltas:
+                entries, self.pending_deltas = self.pending_deltas, []
+                await asyncio.to_thread(self._append_journal, entries)
+                self.stats["journal_writes"] += 1
+
+            snapshot_due = not self.journal_path or force_snapshot or \
+                time.monotonic() - self.last_snapshot >= self.compact_interval
+            if not self.dirty or not snapshot_due:
+                return
+
+            # Serialise on the event loop so the state cannot change underneath us
+            state = self.get_state()
+            if self.journal_path:
+                state = {**state, JOURNAL_SEQ_KEY: self.seq}
+            text = json.dumps(state, indent=2)
+            self.dirty = False
+            self.last_snapshot = time.monotonic()
+            await asyncio.to_thread(self._write_snapshot, text)
+            self.stats["snapshots"] += 1
+
+    async def close(self):
+        """Stop the background task and write a final snapshot."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush(force_snapshot=True)
@@ -0,0 +1,328 @@
+# Tracing and metrics for the transcript -> minutes -> Docs -> notify path.
+# Recording is cheap and never does I/O: a span end is two clock reads, a histogram bucket update and an
+# append to a bounded ring buffer; counters are dict updates, and gauges can be callables that are only
+# read at scrape time. Export happens off the hot path: TraceWriter drains the span buffer into a JSON
+# trace file (Chrome trace event format, viewable in Perfetto or chrome://tracing) from a background
+# task, and MetricsServer renders the Prometheus text format when /metrics is scraped.
+import asyncio
+import bisect
+import contextvars
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRIC_PREFIX = "meetingmind_"
+# Seconds; covers queue waits of a few ms up to slow LLM and Docs calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Trace id of the transcript line being handled; copied into tasks created while it is set
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] is the number of values <= buckets[i] (last slot: +Inf)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (inf past the last bucket)."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0.0
+
+
+def _label_key(labels):
+    if not labels:
+        return ()
+    return tuple(labels.items()) if len(labels) == 1 else tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Span:
+    """Context manager timing one span; see Telemetry.span."""
+
+    __slots__ = ("telemetry", "name", "trace_id", "attrs", "start", "token")
+
+    def __init__(self, telemetry, name, trace_id, attrs):
+        self.telemetry = telemetry
+        self.name = name
+        self.trace_id = trace_id
+        self.attrs = attrs
+
+    def __enter__(self):
+        if self.trace_id is None:
+            self.trace_id = current_trace.get()
+        self.token = current_trace.set(self.trace_id)
+        self.start = time.perf_counter()
+        return self.attrs
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        current_trace.reset(self.token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.telemetry._record(self.name, self.trace_id, self.start, end, self.attrs)
+        return False
+
+
+class Telemetry:
+    """Counters, gauges, histograms and a ring buffer of finished spans.
+
+    Args:
+        trace_capacity: Finished spans kept until a TraceWriter drains them; older ones are dropped.
+        buckets: Histogram bucket bounds in seconds.
+    """
+
+    def __init__(self, trace_capacity=100_000, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = {}  # (name, label key) -> value
+        self.gauges = {}  # (name, label key) -> value or callable returning it
+        self.histograms = {}  # (name, label key) -> Histogram
+        self.span_histograms = {}  # Span name -> its span_duration_seconds Histogram, for a faster lookup
+        self.spans = deque(maxlen=trace_capacity)  # (name, trace id, start, end, attrs)
+        self.spans_recorded = 0
+        self.next_trace = 0
+        self.epoch = time.perf_counter()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge; a callable value is called at export time (e.g. a queue's qsize)."""
+        self.gauges[(name, _label_key(labels))] = value
+
+    def remove_gauge(self, name, **labels):
+        self.gauges.pop((name, _label_key(labels)), None)
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def new_trace(self):
+        """A new trace id, e.g. for one transcript line."""
+        self.next_trace += 1
+        return self.next_trace
+
+    @contextmanager
+    def use_trace(self, trace_id):
+        """Make trace_id the current trace for the spans (and tasks) started inside the block."""
+        token = current_trace.set(trace_id)
+        try:
+            yield trace_id
+        finally:
+            current_trace.reset(token)
+
+    def record_span(self, name, start, end, trace_id=None, **attrs):
+        """Record a span measured elsewhere (perf_counter start and end)."""
+        if trace_id is None:
+            trace_id = current_trace.get()
+        self._record(name, trace_id, start, end, attrs)
+
+    def _record(self, name, trace_id, start, end, attrs):
+        self.spans.append((name, trace_id, start, end, attrs))
+        self.spans_recorded += 1
+        histogram = self.span_histograms.get(name)
+        if histogram is None:
+            histogram = self.span_histograms[name] = self.histograms[("span_duration_seconds", (("span", name),))] = \
+                Histogram(self.buckets)
+        histogram.observe(end - start)
+
+    def span(self, name, trace_id=None, **attrs):
+        """Time a with block as a span of trace_id (default: the current trace), which it makes current.
+
+        The block gets the attrs dict and may add to it.
+        """
+        return Span(self, name, trace_id, attrs)
+
+    def drain_spans(self):
+        """Remove and return the buffered spans."""
+        spans = []
+        while self.spans:
+            spans.append(self.spans.popleft())
+        return spans
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        out = []
+        for (kind, metrics) in (("counter", self.counters), ("gauge", self.gauges)):
+            for name in sorted({name for name, _ in metrics}):
+                metric = METRIC_PREFIX + name
+                out.append(f"# TYPE {metric} {kind}")
+                for (series, key), value in metrics.items():
+                    if series != name:
+                        continue
+                    if callable(value):
+                        try:
+                            value = value()
+                        except Exception:
+                            continue
+                    out.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+        for name in sorted({name for name, _ in self.histograms}):
+            metric = METRIC_PREFIX + name
+            out.append(f"# TYPE {metric} histogram")
+            for (series, key), histogram in self.histograms.items():
+                if series != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    out.append(f"{metric}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {cumulative}")
+                out.append(f"{metric}_sum{_format_labels(key)} {histogram.sum!r}")
+                out.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(out) + "\n"
+
+
+class TraceWriter:
+    """Appends buffered spans to a JSON trace file from a background task.
+
+    The file is a JSON array of Chrome trace events, written incrementally; the closing bracket is
+    optional in that format, so the file can be opened while the meeting is still running.
+    """
+
+    def __init__(self, telemetry, path, interval=1.0):
+        self.telemetry = telemetry
+        self.path = path
+        self.interval = interval
+        self.task = None
+        self.events_written = 0
+        self.pid = os.getpid()
+        self.lanes = {}  # Span name -> tid, so each stage gets its own row in the viewer
+
+    def start(self):
+        if self.task is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'w') as f:
+                f.write("[\n")
+            self.task = asyncio.create_task(self._run())
+
+    def _events(self, spans):
+        epoch = self.telemetry.epoch
+        for name, trace_id, start, end, attrs in spans:
+            tid = self.lanes.setdefault(name, len(self.lanes) + 1)
+            yield {"name": name, "ph": "X", "ts": round((start - epoch) * 1e6, 1),
+                   "dur": round((end - start) * 1e6, 1), "pid": self.pid, "tid": tid,
+                   "args": {"trace": trace_id, **attrs}}
+
+    def _append(self, events):
+        with open(self.path, 'a') as f:
+            f.write("".join(json.dumps(event, default=str) + ",\n" for event in events))
+
+    async def flush(self):
+        spans = self.telemetry.drain_spans()
+        if spans:
+            # Formatting happens here too, in the worker thread rather than on the event loop
+            await asyncio.to_thread(self._append, list(self._events(spans)))
+            self.events_written += len(spans)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error writing trace: {e}")
+
+    async def close(self):
+        """Stop the background task, write the remaining spans and close the JSON array."""
+        if self.task is None:
+            return
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+        await self.flush()
+        with open(self.path, 'a') as f:
+            # Metadata event naming the process; also gives the last real event a valid successor
+            f.write(json.dumps({"name": "process_name", "ph": "M", "pid": self.pid,
+                                "args": {"name": "MeetingMind"}}) + "\n]\n")
+
+
+class MetricsServer:
+    """Minimal HTTP endpoint serving Telemetry.render_prometheus() at /metrics.
+
+    Port 0 picks a free port; the bound port is in self.port after start().
+    """
+
+    def __init__(self, telemetry, host="127.0.0.1", port=9464):
+        self.telemetry = telemetry
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Serving metrics at http://{self.host}:{self.port}/metrics")
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Skip the headers
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = self.telemetry.render_prometheus().encode("utf-8")
+            else:
+                status = "404 Not Found"
+                body = b"Not found\n"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry():
+    """Return the process-wide Telemetry."""
+    return _telemetry
+
+
+def set_telemetry(telemetry):
+    """Replace the process-wide Telemetry (e.g. a fresh one per test or benchmark)."""
+    global _telemetry
+    _telemetry = telemetry
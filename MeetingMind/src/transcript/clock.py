@@ -0,0 +1,61 @@
+# Clocks for replaying transcripts.
+# simulate_meeting waits on a clock instead of calling asyncio.sleep directly, so the same replay can
+# run in wall-clock time, N times faster, or instantly on a virtual clock for regression and load runs.
+# Times are seconds of meeting time since start().
+import asyncio
+import time
+
+
+class ScaledClock:
+    """Meeting time runs `speed` times faster than wall-clock time."""
+
+    def __init__(self, speed=1.0):
+        if speed <= 0:
+            raise ValueError("speed must be positive; use VirtualClock for instant replay")
+        self.speed = speed
+        self.started = None
+
+    def start(self):
+        self.started = time.monotonic()
+
+    def now(self):
+        return (time.monotonic() - self.started) * self.speed
+
+    async def sleep_until(self, meeting_seconds):
+        wait = (meeting_seconds - self.now()) / self.speed
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RealClock(ScaledClock):
+    """Meeting time is wall-clock time."""
+
+    def __init__(self):
+        super().__init__(speed=1.0)
+
+
+class VirtualClock:
+    """Meeting time jumps straight to whatever is awaited; replays take no wall-clock time."""
+
+    def __init__(self):
+        self.current = 0.0
+
+    def start(self):
+        self.current = 0.0
+
+    def now(self):
+        return self.current
+
+    async def sleep_until(self, meeting_seconds):
+        self.current = max(self.current, meeting_seconds)
+        # Still yield so observers and background tasks get to run between lines
+        await asyncio.sleep(0)
+
+
+def make_clock(speed):
+    """RealClock for speed 1, VirtualClock for 0 (instant), ScaledClock otherwise."""
+    if speed == 0:
+        return VirtualClock()
+    if speed == 1:
+        return RealClock()
+    return ScaledClock(speed)
@@ -0,0 +1,115 @@
+# Per-observer delivery channels used by TranscriptProcessor in fan-out mode.
+# Each observer gets its own bounded queue and worker task, so a slow observer only delays itself.
+# Sync observers run in a bounded thread pool instead of on the event loop.
+import asyncio
+import statistics
+import time
+from collections import deque
+
+from src.services.telemetry_service import current_trace
+
+# Backpressure policies applied when an observer's queue is full
+BLOCK = "block"  # Wait for room; ingestion slows down to the observer's pace
+DROP_OLDEST = "drop-oldest"  # Discard the oldest pending line to make room
+COALESCE = "coalesce"  # Collapse the whole backlog into the newest line
+
+POLICIES = (BLOCK, DROP_OLDEST, COALESCE)
+
+
+class ObserverChannel:
+    """Delivers transcript lines to one observer from a bounded queue.
+
+    Args:
+        observer: Object with an update(transcript_line) method, sync or async.
+        policy: One of BLOCK, DROP_OLDEST or COALESCE.
+        max_pending: Queue size before the policy applies.
+        timeout: Seconds allowed per update call, or None for no limit.
+        executor: Executor for sync observers (None uses the loop's default).
+    """
+
+    def __init__(self, observer, policy=BLOCK, max_pending=100, timeout=None, executor=None, latency_window=1000):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.observer = observer
+        self.name = getattr(observer, "name", type(observer).__name__)
+        self.policy = policy
+        self.timeout = timeout
+        self.executor = executor
+        self.is_async = asyncio.iscoroutinefunction(observer.update)
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.worker = None
+        self.latencies = deque(maxlen=latency_window)  # Enqueue -> update finished, in seconds
+        self.counts = {"delivered": 0, "dropped": 0, "timeouts": 0, "errors": 0}
+
+    def start(self):
+        if self.worker is None:
+            self.worker = asyncio.create_task(self._run())
+
+    def _discard_one(self):
+        self.queue.get_nowait()
+        self.queue.task_done()
+        self.counts["dropped"] += 1
+
+    async def put(self, line):
+        """Queue a line for the observer, applying the backpressure policy if the queue is full."""
+        self.start()
+        item = (time.perf_counter(), line, current_trace.get())
+        if self.queue.full():
+            if self.policy == DROP_OLDEST:
+                self._discard_one()
+            elif self.policy == COALESCE:
+                while not self.queue.empty():
+                    self._discard_one()
+        await self.queue.put(item)
+
+    async def _deliver(self, line):
+        if self.is_async:
+            await asyncio.wait_for(self.observer.update(line), self.timeout)
+        else:
+            loop = asyncio.get_running_loop()
+            await asyncio.wait_for(loop.run_in_executor(self.executor, self.observer.update, line), self.timeout)
+
+    async def _run(self):
+        while True:
+            enqueued, line, trace_id = await self.queue.get()
+            token = current_trace.set(trace_id)  # The worker's spans belong to the line's trace
+            try:
+                await self._deliver(line)
+                self.counts["delivered"] += 1
+            except asyncio.TimeoutError:
+                self.counts["timeouts"] += 1
+                print(f"Observer {self.name} timed out on line {line.get('timestamp')}")
+            except Exception as e:
+                self.counts["errors"] += 1
+                print(f"Observer {self.name} failed on line {line.get('timestamp')}: {e}")
+            finally:
+                current_trace.reset(token)
+                self.latencies.append(time.perf_counter() - enqueued)
+                self.queue.task_done()
+
+    async def drain(self):
+        """Wait until every queued line has been handled."""
+        await self.queue.join()
+
+    async def close(self):
+        """Stop the worker; lines still queued are discarded."""
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    def stats(self):
+        """Delivery counters and latency percentiles (seconds) over the recent window."""
+        latencies = sorted(self.latencies)
+        result = {**self.counts, "pending": self.queue.qsize()}
+        if latencies:
+            result.update({
+                "latency_mean": statistics.fmean(latencies),
+                "latency_p50": latencies[len(latencies) // 2],
+                "latency_p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                "latency_max": latencies[-1],
+            })
+        return result
@@ -0,0 +1,162 @@
+# Compact in-memory transcript.
+# Each line is an integer offset (milliseconds since the meeting started, never decreasing), an
+# interned speaker id and the message. TranscriptStore keeps them column-wise in arrays, so a long
+# meeting costs a few bytes per line plus the message text, and time-range and per-speaker queries are
+# binary searches instead of scans. Lines are materialised as the usual
+# {"timestamp", "speaker", "message"} dicts only when they are read. Reading a line gives back exactly
+# what was appended: a timestamp is normally formatted from the offset, and the original string is kept
+# (sparsely) only for the lines where that would differ, e.g. a line clamped for being out of order or
+# a timestamp without zero padding; keys other than these three are kept the same way.
+import bisect
+import datetime
+from array import array
+
+TIMESTAMP_FORMAT = "%I:%M:%S %p"
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class TranscriptLine:
+    """One transcript line: offset in ms since the meeting started, speaker id and message."""
+
+    __slots__ = ("offset", "speaker_id", "message")
+
+    def __init__(self, offset, speaker_id, message):
+        self.offset = offset
+        self.speaker_id = speaker_id
+        self.message = message
+
+    def __repr__(self):
+        return f"TranscriptLine({self.offset}, {self.speaker_id}, {self.message!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, TranscriptLine) and (self.offset, self.speaker_id, self.message) == \
+            (other.offset, other.speaker_id, other.message)
+
+
+class TranscriptStore:
+    """Array-backed transcript with bisect-based time-range and speaker queries.
+
+    Indexing and iteration yield transcript line dicts, so the store can stand in for a list of them.
+
+    Args:
+        start_time: Meeting start (datetime); offsets are relative to it and timestamps are formatted from it.
+    """
+
+    def __init__(self, start_time=None):
+        self.start_time = start_time
+        self.offsets = array('q')
+        self.speaker_ids = array('l')
+        self.messages = []
+        self.speakers = []  # Speaker id -> name
+        self.speaker_index = {}  # Name -> speaker id
+        self.speaker_offsets = []  # Speaker id -> array of that speaker's offsets
+        self.speaker_lines = []  # Speaker id -> array of that speaker's line indexes
+        self.timestamp_overrides = {}  # Line index -> appended timestamp, where formatting the offset differs
+        self.extras = {}  # Line index -> extra keys of the appended line
+
+    def intern(self, speaker):
+        """The id of a speaker name, assigning the next one to a new name."""
+        speaker_id = self.speaker_index.get(speaker)
+        if speaker_id is None:
+            speaker_id = self.speaker_index[speaker] = len(self.speakers)
+            self.speakers.append(speaker)
+            self.speaker_offsets.append(array('q'))
+            self.speaker_lines.append(array('l'))
+        return speaker_id
+
+    def append(self, offset, speaker, message, timestamp=None, extra=None):
+        """Add a line; offsets earlier than the last line's are clamped so the order stays sorted.
+
+        timestamp is the line's original timestamp, returned as is when read back (queries still use the
+        clamped offset); extra is a dict of any other keys of the line.
+        """
+        if self.offsets and offset < self.offsets[-1]:
+            offset = self.offsets[-1]
+        speaker_id = self.intern(speaker)
+        index = len(self.messages)
+        self.offsets.append(offset)
+        self.speaker_ids.append(speaker_id)
+        self.messages.append(message)
+        self.speaker_offsets[speaker_id].append(offset)
+        self.speaker_lines[speaker_id].append(index)
+        if timestamp is not None and self.start_time is not None and timestamp != self.timestamp(index):
+            self.timestamp_overrides[index] = timestamp
+        if extra:
+            self.extras[index] = dict(extra)
+        return index
+
+    def offset_of(self, timestamp):
+        """Offset (ms) of a "%I:%M:%S %p" timestamp.
+
+        The timestamp only carries the time of day, so the occurrence nearest the last line is used; this
+        lets a meeting run past midnight.
+        """
+        clock = datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT).time()
+        spoken = datetime.datetime.combine(self.start_time.date(), clock)
+        offset = int((spoken - self.start_time).total_seconds() * 1000)
+        if self.offsets:
+            offset += round((self.offsets[-1] - offset) / DAY_MS) * DAY_MS
+        return offset
+
+    def line(self, index):
+        """The slotted line at an index."""
+        return TranscriptLine(self.offsets[index], self.speaker_ids[index], self.messages[index])
+
+    def timestamp(self, index):
+        """The "%I:%M:%S %p" timestamp of the line's offset (see to_dict for the appended one)."""
+        start = self.start_time
+        seconds = (start.hour * 3600 + start.minute * 60 + start.second + self.offsets[index] // 1000) % 86400
+        hour, seconds = divmod(seconds, 3600)
+        # Same as strftime(TIMESTAMP_FORMAT) on start_time + offset, without building a datetime per line
+        return f"{(hour - 1) % 12 + 1:02d}:{seconds // 60:02d}:{seconds % 60:02d} {'AM' if hour < 12 else 'PM'}"
+
+    def to_dict(self, index):
+        """The line at an index as appended, in the {"timestamp", "speaker", "message"} shape."""
+        timestamp = self.timestamp_overrides.get(index)
+        line = {"timestamp": timestamp if timestamp is not None else self.timestamp(index),
+                "speaker": self.speakers[self.speaker_ids[index]], "message": self.messages[index]}
+        if self.extras:
+            extra = self.extras.get(index)
+            if extra:
+                line.update(extra)
+        return line
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.to_dict(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript index out of range")
+        return self.to_dict(index)
+
+    def __iter__(self):
+        return (self.to_dict(i) for i in range(len(self)))
+
+    def index_range(self, start=None, end=None):
+        """(first, last + 1) indexes of the lines with start <= offset < end (ms; None is open)."""
+        first = 0 if start is None else bisect.bisect_left(self.offsets, start)
+        last = len(self) if end is None else bisect.bisect_left(self.offsets, end)
+        return first, max(first, last)
+
+    def between(self, start=None, end=None):
+        """Lines (dicts) with start <= offset < end."""
+        first, last = self.index_range(start, end)
+        return [self.to_dict(i) for i in range(first, last)]
+
+    def since(self, timestamp):
+        """Lines (dicts) from a timestamp on, e.g. since a topic started."""
+        return self.between(self.offset_of(timestamp))
+
+    def by_speaker(self, speaker, start=None, end=None):
+        """Lines (dicts) of one speaker with start <= offset < end."""
+        speaker_id = self.speaker_index.get(speaker)
+        if speaker_id is None:
+            return []
+        offsets = self.speaker_offsets[speaker_id]
+        first = 0 if start is None else bisect.bisect_left(offsets, start)
+        last = len(offsets) if end is None else bisect.bisect_left(offsets, end)
+        return [self.to_dict(i) for i in self.speaker_lines[speaker_id][first:last]]
@@ -5,22 +5,86 @@ import time
 import datetime
 from typing import List, Dict, Callable, Any
 import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from src.transcript.clock import RealClock
+from src.transcript.dispatch import BLOCK, ObserverChannel
+from src.transcript.models import TranscriptStore
+from src.services.telemetry_service import get_telemetry
+from src.transcript.transcript_log import FSYNC_INTERVAL, TranscriptLog, read_transcript_log, write_transcript_json
+
+def line_offsets(lines, start_time):
+    """Seconds from start_time to each line's timestamp, parsed once.
+
+    Timestamps only carry the time of day, so each line takes the occurrence nearest the previous line
+    (as TranscriptStore.offset_of does): a meeting can run past midnight, while a line a few seconds out
+    of order is clamped to the previous offset instead of being pushed a day ahead.
+    """
+    offsets = []
+    day = 86400.0
+    previous = None
+    for line in lines:
+        spoken = datetime.datetime.combine(
+            start_time.date(), datetime.datetime.strptime(line['timestamp'], "%I:%M:%S %p").time()
+        )
+        offset = (spoken - start_time).total_seconds()
+        if previous is not None:
+            offset += round((previous - offset) / day) * day
+            offset = max(offset, previous)
+        previous = offset
+        offsets.append(offset)
+    return offsets
+
 
 class TranscriptProcessor:
-    def __init__(self, transcript_file_path: str = None):
+    def __init__(self, transcript_file_path: str = None, fanout: bool = False, max_sync_workers: int = 4,
+                 log_path: str = None, fsync_policy: str = FSYNC_INTERVAL, compact_every: int = 500,
+                 clock=None):
         self.observers = []
-        self.transcript = []
+        # Lines are kept column-wise (offset, interned speaker, message) and read back as dicts; see models.py
+        self.transcript = TranscriptStore()
         self.start_time = None
+        self.line_offsets = []  # Seconds from start_time to each loaded line
+        # Replay clock for simulate_meeting: RealClock, ScaledClock(speed) or VirtualClock (instant)
+        self.clock = clock or RealClock()
+        self.stream_ended = asyncio.Event()
         self.transcript_file_path = transcript_file_path
+        # Lines are appended to a JSON Lines log as they arrive; every compact_every lines (and on close)
+        # the log is compacted into transcript_file_path in the {"meeting": {...}} format
+        if transcript_file_path and not log_path:
+            log_path = os.path.splitext(transcript_file_path)[0] + ".jsonl"
+        self.transcript_log = TranscriptLog(log_path, fsync_policy=fsync_policy) if log_path else None
+        self.compact_every = compact_every
+        self.compaction_task = None
+        # In fan-out mode every observer gets its own queue and worker, and sync observers
+        # run in a bounded thread pool, so one slow observer cannot hold up the others
+        self.fanout = fanout
+        self.channels = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_sync_workers, thread_name_prefix="observer") if fanout else None
+        self.telemetry = get_telemetry()
         
-    def register_observer(self, observer):
-        """Register an observer to be notified of new transcript lines."""
+    def register_observer(self, observer, policy: str = BLOCK, max_pending: int = 100, timeout: float = None):
+        """Register an observer to be notified of new transcript lines.
+
+        In fan-out mode, policy ("block", "drop-oldest" or "coalesce") decides what happens when
+        more than max_pending lines are waiting for the observer, and timeout bounds each update call.
+        """
         self.observers.append(observer)
+        if self.fanout:
+            channel = self.channels[id(observer)] = ObserverChannel(
+                observer, policy=policy, max_pending=max_pending, timeout=timeout, executor=self.executor
+            )
+            self.telemetry.set_gauge("observer_queue_depth", channel.queue.qsize, observer=channel.name)
         
     def remove_observer(self, observer):
         """Remove an observer from notification list."""
         if observer in self.observers:
             self.observers.remove(observer)
+            channel = self.channels.pop(id(observer), None)
+            if channel:
+                self.telemetry.remove_gauge("observer_queue_depth", observer=channel.name)
+            if channel and channel.worker:
+                channel.worker.cancel()
 
     async def _notify_observers(self, line):
         """
@@ -34,6 +98,11 @@ class TranscriptProcessor:
         - 'speaker': Name of the speaker
         - 'message': Content of what was said
         """
+        if self.fanout:
+            # Only waits if a "block" observer's queue is full
+            await asyncio.gather(*(channel.put(line) for channel in self.channels.values()))
+            return
+
         for observer in self.observers:
             if asyncio.iscoroutinefunction(observer.update):
                 await observer.update(line)
@@ -50,80 +119,155 @@ class TranscriptProcessor:
         meeting_date = data['meeting']['date']
         self.start_time = datetime.datetime.strptime(f"{meeting_date} {meeting_time}", "%B %d, %Y %I:%M:%S %p")
         
-        return data['meeting']['minutes']
+        # Parse every timestamp once, up front, rather than per line during the replay
+        minutes = data['meeting']['minutes']
+        self.line_offsets = line_offsets(minutes, self.start_time)
+        return minutes
+    
+    def load_transcript_log(self, log_path: str):
+        """Stream transcript lines back from a JSON Lines log and set the start time."""
+        header, lines = read_transcript_log(log_path)
+        if header.get('date') and header.get('time'):
+            self.start_time = datetime.datetime.strptime(f"{header['date']} {header['time']}", "%B %d, %Y %I:%M:%S %p")
+        return lines
+
+    def _meeting_info(self):
+        if self.start_time is None:
+            self.start_time = datetime.datetime.now().replace(microsecond=0)
+        return {
+            "date": self.start_time.strftime("%B %d, %Y"),
+            "time": self.start_time.strftime("%I:%M:%S %p")
+        }
     
     def save_transcript(self):
         """Save current transcript to a JSON file."""
         if not self.transcript_file_path:
             return
-            
-        meeting_data = {
-            "meeting": {
-                "date": self.start_time.strftime("%B %d, %Y"),
-                "time": self.start_time.strftime("%I:%M:%S %p"),
-                "minutes": self.transcript
-            }
-        }
-        
-        with open(self.transcript_file_path, 'w') as f:
-            json.dump(meeting_data, f, indent=4)
+        write_transcript_json(self.transcript_file_path, self._meeting_info(), list(self.transcript))
+
+    async def compact_transcript(self, lines=None):
+        """Write the transcript (or the given snapshot of it) to transcript_file_path, off the event loop."""
+        if not self.transcript_file_path:
+            return
+        lines = list(self.transcript) if lines is None else lines
+        await asyncio.to_thread(write_transcript_json, self.transcript_file_path, self._meeting_info(), lines)
+
+    def _persist(self, line):
+        """Append the line to the transcript log and compact periodically."""
+        if not self.transcript_log:
+            return
+        if self.transcript_log.writer_task is None:
+            self.transcript_log.open(self._meeting_info())
+        self.transcript_log.append(line)
+
+        compaction_running = self.compaction_task and not self.compaction_task.done()
+        if self.compact_every and len(self.transcript) % self.compact_every == 0 and not compaction_running:
+            self.compaction_task = asyncio.create_task(self.compact_transcript(list(self.transcript)))
     
-    async def simulate_meeting(self, transcript_json_path: str, time_limit_seconds=None):
-        """Simulate a meeting by playing transcript lines at appropriate times."""
+    async def simulate_meeting(self, transcript_json_path: str, time_limit_seconds=None, clock=None):
+        """Simulate a meeting by playing transcript lines at appropriate times.
+
+        The clock (default self.clock) sets the pace: real time, N times faster or instant. Once every
+        line is sent, the end of the stream is signalled and the observers are drained, so this returns
+        when processing is finished.
+        """
         minutes = self.load_transcript(transcript_json_path)
-        simulation_start_time = self.start_time
-        real_simulation_start = datetime.datetime.now()
+        clock = clock or self.clock
+        self.stream_ended.clear()
         
-        print(f"Simulating meeting from transcript time: {simulation_start_time.strftime('%I:%M:%S %p')}")
+        print(f"Simulating meeting from transcript time: {self.start_time.strftime('%I:%M:%S %p')}")
         
-        # Process all lines that fall within the time limit
-        for line in minutes:
-            # Get current line's timestamp
-            current_timestamp = datetime.datetime.strptime(line['timestamp'], "%I:%M:%S %p")
-            current_datetime = datetime.datetime.combine(
-                simulation_start_time.date(), 
-                current_timestamp.time()
-            )
-            
-            # Calculate seconds from meeting start to this line
-            simulated_elapsed = (current_datetime - simulation_start_time).total_seconds()
-            
-            # Skip lines that exceed the time limit
+        clock.start()
+        for line, simulated_elapsed in zip(minutes, self.line_offsets):
+            # Lines are in time order, so nothing after the time limit is played
             if time_limit_seconds and simulated_elapsed > time_limit_seconds:
-                continue
+                break
             
-            # Calculate how much real time has passed
-            real_elapsed = (datetime.datetime.now() - real_simulation_start).total_seconds()
-            
-            # Calculate how much time to wait until this line should appear
-            wait_time = max(0, simulated_elapsed - real_elapsed)
-            
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)  # Use asyncio.sleep instead of time.sleep
+            # Wait until this line should appear
+            await clock.sleep_until(simulated_elapsed)
             
             # Now process the line
-            await self.add_transcript_line(line)
+            await self.add_transcript_line(line, offset=simulated_elapsed)
             
             # Print in a clearer format
-            real_time_now = datetime.datetime.now().strftime('%H:%M:%S')
             print(f"Updated line with timestamp {line['timestamp']}: {line['speaker']}: {line['message'][:50]}...")
         
-        # Wait until the full time limit has elapsed if specified
-        if time_limit_seconds:
-            total_elapsed = (datetime.datetime.now() - real_simulation_start).total_seconds()
-            remaining_time = max(0, time_limit_seconds - total_elapsed)
-            
-            if remaining_time > 0:
-                await asyncio.sleep(remaining_time)  # Use asyncio.sleep instead of time.sleep
-            
-            print(f"Time limit of {time_limit_seconds} seconds reached. Simulation complete.")
+        await self.end_of_stream()
+        print(f"Simulation complete after {clock.now():.0f} seconds of meeting time.")
+
+    async def end_of_stream(self):
+        """Signal that no more lines are coming and wait for the observers to finish processing.
+
+        Observers with an async drain() method are awaited after every line has been handed to them.
+        """
+        self.stream_ended.set()
+        await self.drain_observers()
+        drains = [observer.drain() for observer in self.observers if hasattr(observer, "drain")]
+        await asyncio.gather(*drains)
     
-    async def add_transcript_line(self, line):
-        """Add a new line to the transcript and notify observers."""
-        self.transcript.append(line)
-        await self._notify_observers(line)
-        self.save_transcript()
-        
+    async def add_transcript_line(self, line, offset=None):
+        """Add a new line to the transcript and notify observers.
+
+        offset is the line's time in seconds since the meeting started if already known; otherwise it is
+        parsed from the line's timestamp. The transcript keeps the line as given (see TranscriptStore).
+        Observers get a copy of the line with its position in the transcript added as "index".
+        """
+        # Each line starts a trace; observers handling it (and their LLM calls) record spans under it
+        with self.telemetry.span("transcript.add_line", self.telemetry.new_trace()):
+            self._store_line(line, offset)
+            await self._notify_observers({**line, "index": len(self.transcript) - 1})
+            self._persist(line)
+        self.telemetry.inc("transcript_lines_total")
+
+    def _store_line(self, line, offset=None):
+        if not self.transcript:
+            self._meeting_info()  # Sets the start time of a live meeting
+            self.transcript.start_time = self.start_time
+        if offset is not None:
+            offset_ms = round(offset * 1000)
+        elif line.get('timestamp'):
+            offset_ms = self.transcript.offset_of(line['timestamp'])
+        else:
+            offset_ms = self.transcript.offsets[-1] if self.transcript else 0
+        extra = {key: value for key, value in line.items() if key not in ("timestamp", "speaker", "message")}
+        self.transcript.append(offset_ms, line.get('speaker', ""), line.get('message', ""),
+                               timestamp=line.get('timestamp'), extra=extra)
+
     def get_full_transcript(self):
         """Return the full transcript."""
-        return self.transcript
\ No newline at end of file
+        return list(self.transcript)
+
+    def lines_between(self, start_seconds=None, end_seconds=None):
+        """Lines spoken from start_seconds (inclusive) to end_seconds (exclusive) into the meeting."""
+        return self.transcript.between(None if start_seconds is None else round(start_seconds * 1000),
+                                       None if end_seconds is None else round(end_seconds * 1000))
+
+    def lines_since(self, timestamp):
+        """Lines from a "%I:%M:%S %p" timestamp on, e.g. MinutesAgent.current_topic_start_timestamp["timestamp"]."""
+        if not self.transcript:
+            return []
+        return self.transcript.since(timestamp)
+
+    def lines_by_speaker(self, speaker, start_seconds=None, end_seconds=None):
+        """One speaker's lines, optionally limited to a time range as in lines_between."""
+        return self.transcript.by_speaker(speaker, None if start_seconds is None else round(start_seconds * 1000),
+                                          None if end_seconds is None else round(end_seconds * 1000))
+
+    async def drain_observers(self):
+        """Wait until every observer has been handed all lines added so far (fan-out mode)."""
+        await asyncio.gather(*(channel.drain() for channel in self.channels.values()))
+
+    def get_observer_stats(self):
+        """Per-observer delivery counters and latency stats (fan-out mode)."""
+        return {channel.name: channel.stats() for channel in self.channels.values()}
+
+    async def close(self):
+        """Stop the observer workers, flush the transcript log and write the final compacted transcript."""
+        await asyncio.gather(*(channel.close() for channel in self.channels.values()))
+        if self.executor:
+            self.executor.shutdown(wait=False)
+        if self.compaction_task:
+            await self.compaction_task
+        if self.transcript_log and self.transcript:
+            await self.transcript_log.close()
+            await self.compact_transcript()
@@ -0,0 +1,140 @@
+# Append-only JSON Lines persistence for transcripts.
+# Each transcript line is appended to a .jsonl log by a background writer (off the event loop),
+# instead of rewriting the whole transcript JSON for every line. The log starts with a header record
+# holding the meeting date/time, and can be compacted into the {"meeting": {...}} JSON format.
+import asyncio
+import json
+import os
+import time
+
+# fsync policies
+FSYNC_ALWAYS = "always"  # fsync after every write batch; a crash loses nothing that was written
+FSYNC_INTERVAL = "interval"  # fsync at most every fsync_interval seconds
+FSYNC_NEVER = "never"  # leave flushing to the OS
+
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+
+def write_transcript_json(path, meeting_info, lines):
+    """Atomically write a transcript in the {"meeting": {...}} format used by the sample data."""
+    meeting_data = {"meeting": {**meeting_info, "minutes": lines}}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meeting_data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def read_transcript_log(path):
+    """Return the meeting header of a transcript log and an iterator streaming its lines."""
+    f = open(path, 'r')
+    header = json.loads(f.readline() or "{}").get("meeting", {})
+
+    def lines():
+        with f:
+            for raw in f:
+                if raw.strip():
+                    try:
+                        yield json.loads(raw)
+                    except json.JSONDecodeError:
+                        # A torn final record from a crash mid-write
+                        return
+    return header, lines()
+
+
+def compact_transcript_log(log_path, json_path):
+    """Rewrite a transcript log as a {"meeting": {...}} JSON file."""
+    header, lines = read_transcript_log(log_path)
+    write_transcript_json(json_path, header, list(lines))
+
+
+class TranscriptLog:
+    """Background, batched appender for a JSON Lines transcript log.
+
+    Args:
+        path: The .jsonl file; it is truncated when the log is first opened, and appended to if the log
+            is opened again after close().
+        fsync_policy: One of FSYNC_ALWAYS, FSYNC_INTERVAL or FSYNC_NEVER.
+        fsync_interval: Seconds between fsyncs with FSYNC_INTERVAL.
+    """
+
+    def __init__(self, path, fsync_policy=FSYNC_INTERVAL, fsync_interval=1.0):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.file = None
+        self.pending = []
+        self.wakeup = None
+        self.idle = None
+        self.writer_task = None
+        self.last_fsync = 0.0
+        self.bytes_written = 0
+        self.started = False
+
+    def open(self, meeting_info):
+        """Start a new log with a header record and start the background writer.
+
+        After close() this re-opens the same log for appending instead, so nothing written is lost.
+        """
+        if self.started:
+            self.file = open(self.path, 'a')
+        else:
+            self.file = open(self.path, 'w')
+            self.pending.append({"meeting": meeting_info})
+            self.started = True
+        self.wakeup = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.writer_task = asyncio.create_task(self._run())
+        self.wakeup.set()
+
+    def append(self, line):
+        """Queue a transcript line for writing. Never blocks."""
+        self.pending.append(line)
+        self.idle.clear()
+        self.wakeup.set()
+
+    def _write(self, records):
+        data = "".join(json.dumps(record) + "\n" for record in records)
+        self.file.write(data)
+        self.file.flush()
+        self.bytes_written += len(data)
+        now = time.monotonic()
+        if self.fsync_policy == FSYNC_ALWAYS or (
+                self.fsync_policy == FSYNC_INTERVAL and now - self.last_fsync >= self.fsync_interval):
+            os.fsync(self.file.fileno())
+            self.last_fsync = now
+
+    async def _run(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            # Everything queued since the last write goes out in one batch
+            records, self.pending = self.pending, []
+            if records:
+                try:
+                    await asyncio.to_thread(self._write, records)
+                except Exception as e:
+                    print(f"Error writing transcript log: {e}")
+            if not self.pending:
+                self.idle.set()
+
+    async def flush(self):
+        """Wait until every queued line has been written."""
+        if self.writer_task is not None:
+            await self.idle.wait()
+
+    async def close(self):
+        """Write anything pending, fsync and close the file."""
+        if self.writer_task is None:
+            return
+        await self.flush()
+        self.writer_task.cancel()
+        try:
+            await self.writer_task
+        except asyncio.CancelledError:
+            pass
+        self.writer_task = None
+        if self.fsync_policy != FSYNC_NEVER:
+            await asyncio.to_thread(os.fsync, self.file.fileno())
+        self.file.close()
@@ -0,0 +1,590 @@
+import asyncio
+import json
+import os
+import re
+import time
+import zlib
+
+import pytest
+
+from src.agents.context_agent import ContextAgent
+from src.agents.context_window import ContextWindow
+from src.agents.keyword_monitor import KeywordMonitor
+from src.agents.minutes_agent import MinutesAgent
+from src.agents.notify_agent import NotifyAgent
+from src.agents.relevance_engine import RelevanceEngine
+from src.agents.relevance_service import RelevanceService, load_user_profiles
+from src.agents.summary_agent import SummaryAgent, chunk_transcript
+from src.agents.prompt_context import AgendaPromptBuilder
+from src.agents.update_protocol import (
+    UPDATE_MAX_TOKENS, UPDATE_MODEL, UpdateParseError, parse_update, response_format_for, update_schema
+)
+from src.models.minutes import Minutes
+from src.services.discord_service import DiscordWebhook
+from src.services.embedding_service import EmbeddingCache, HashingEmbedder
+from src.services.llm_service import FakeBackend, LLMService, estimate_tokens
+from src.services.telemetry_service import get_telemetry
+from src.transcript.processor import TranscriptProcessor
+
+
+def _line(timestamp, message, speaker="Rohan"):
+    return {"timestamp": timestamp, "speaker": speaker, "message": message}
+
+
+def _fake_llm(responses):
+    return LLMService(backend=FakeBackend(list(responses)), requests_per_minute=None, tokens_per_minute=None)
+
+
+async def _process_and_track(agent, line):
+    """Process a line as the queue worker would and wait for the listen-in check it starts."""
+    await agent._process_transcript_line(line)
+    agent._track_context([line])
+    await agent.context_window.drain()
+
+
+def test_batch_mode_applies_updates_with_line_timestamps(tmp_path):
+    async def run():
+        response = json.dumps({"updates": [
+            {"line": 1, "section": "2", "subsection": "2.1", "details": "Go board for the library"},
+            {"line": 0, "section": "1", "details": "Nothing major"},
+        ]})
+        agent = MinutesAgent(batch_mode=True, output_path=str(tmp_path / "minutes.json"), llm=_fake_llm([response]))
+        # Queue both lines before the processing task gets to run so they form one batch
+        agent.transcript_queue.put_nowait(_line("10:00:35 AM", "Nothing major.", "Adi"))
+        agent.transcript_queue.put_nowait(_line("10:01:00 AM", "Library budget is 100 pounds."))
+        await agent.transcript_queue.join()
+        agent.processing_task.cancel()
+        return agent
+
+    agent = asyncio.run(run())
+    agenda = agent.get_minutes()["agenda"]
+    assert len(agent.llm.backend.calls) == 1
+    assert agenda["1"]["details"] == ["Nothing major"]
+    assert agenda["2"]["subsections"]["2.1"]["details"] == ["Go board for the library"]
+    assert agent.get_current_topic_start_timestamp()["timestamp"] == "10:01:00 AM"
+
+
+def test_prompt_builder_keeps_prefix_stable_and_details_windowed():
+    minutes = Minutes.from_dict({"agenda": {
+        "1": {"title": "Matters Arising", "details": ""},
+        "2": {"title": "President's Update", "subsections": {
+            "2.1": {"title": "Library Budget", "details": [f"Point {i}" for i in range(10)]},
+        }},
+    }})
+    builder = AgendaPromptBuilder(recent_details=3)
+    topic = {"section": "2", "subsection": "2.1"}
+
+    first = builder.build_messages(minutes, topic, "Line A")
+    minutes.add_detail("2", "2.1", "Point 10")
+    second = builder.build_messages(minutes, topic, "Line B")
+
+    assert first[0] == second[0]
+    assert "2.1: Library Budget" in first[0]["content"]
+    assert "Point" not in first[0]["content"]
+    assert "Point 10" in second[1]["content"] and "Point 7" not in second[1]["content"]
+
+
+def test_minutes_model_round_trips_and_orders_topics_numerically():
+    with open("tests/sample_data/sample_minute_structure.json") as f:
+        text = f.read()
+    data = json.loads(text)
+    assert json.dumps(Minutes.from_json(text).to_dict()) == json.dumps(data)
+
+    minutes = Minutes.from_dict({"agenda": {
+        "2": {"title": "Updates", "subsections": {
+            "2.10": {"title": "Tenth", "details": ""},
+            "2.1": {"title": "First", "details": ""},
+            "2.9": {"title": "Ninth", "details": ""},
+        }},
+        "10": {"title": "AOB", "details": ""},
+        "1": {"title": "Matters Arising", "details": ""},
+    }})
+    agenda = minutes.agenda
+    assert [topic.id for topic in agenda.topics] == ["1", "2.1", "2.9", "2.10", "10"]
+    assert agenda.get("2.9").next_topic is agenda.get("2.10")
+    assert agenda.get("2").next_topic is agenda.get("2.1")
+    assert agenda.get("10").next_topic is None
+    assert minutes.add_detail("2", "3.1", "Wrong section") is None
+    minutes.add_detail("2", "2.10", "Point")
+    assert minutes.to_dict()["agenda"]["2"]["subsections"]["2.10"]["details"] == ["Point"]
+
+
+def test_minutes_are_snapshotted_in_background_and_restored_from_journal(tmp_path):
+    output_path = str(tmp_path / "minutes.json")
+    journal_path = str(tmp_path / "minutes.journal")
+
+    async def run():
+        agent = MinutesAgent(output_path=output_path, journal_path=journal_path, llm=_fake_llm([]))
+        agent.update_minutes_structure({"section": "1", "details": "Nothing major"}, "10:00:35 AM")
+        agent.update_minutes_structure({"section": "2", "subsection": "2.1", "details": "Go board"}, "10:01:00 AM")
+        # Not written yet: neither the constructor nor the update writes the minutes file
+        assert not os.path.exists(output_path)
+        # One pass of the snapshot loop journals the deltas; then the process "crashes"
+        await agent.snapshotter.flush()
+        agent.processing_task.cancel()
+
+        recovered = MinutesAgent(output_path=str(tmp_path / "other.json"), journal_path=journal_path,
+                                 llm=_fake_llm([]))
+        recovered.output_path = recovered.snapshotter.path = output_path
+        assert recovered.restore_minutes()
+        await recovered.close()
+        recovered.processing_task.cancel()
+        return recovered
+
+    recovered = asyncio.run(run())
+    agenda = recovered.get_minutes()["agenda"]
+    assert agenda["1"]["details"] == ["Nothing major"]
+    assert agenda["2"]["subsections"]["2.1"]["details"] == ["Go board"]
+    with open(output_path) as f:
+        assert json.load(f)["agenda"]["1"]["details"] == ["Nothing major"]
+    with open(journal_path) as f:
+        assert f.read() == ""
+
+
+def test_keyword_monitor_skips_small_talk_and_wakes_named_profile(tmp_path):
+    monitor = KeywordMonitor.from_files()
+    assert not monitor.scan("Good. Let's move to the main updates.")
+    assert monitor.scan("Eng Café funding: Originally, £200 per café.").topics >= {"4.2"}
+    assert monitor.scan("Should we offer to pay the Careers Service for their venue?").roles >= {"President"}
+
+    async def run():
+        update = json.dumps({"section": "2", "subsection": "2.1", "details": "Go board"})
+        context_agent = ContextAgent("Kriti", llm=_fake_llm(["Yes"]), keyword_monitor=monitor)
+        agent = MinutesAgent(output_path=str(tmp_path / "minutes.json"), llm=_fake_llm([update] * 3),
+                             context_agent=context_agent, keyword_monitor=monitor, listen_in_every_lines=1)
+        agent.processing_task.cancel()
+        await agent._process_transcript_line(_line("10:00:45 AM", "Good. Let's move to the main updates."))
+        # Kriti is on the relevance list of 2.1, so the LLM decides
+        await _process_and_track(agent, _line("10:01:00 AM", "The library budget is 100 pounds."))
+        assert context_agent.listen_in and context_agent.skipped_checks == 0
+        # Named directly: woken without an LLM call
+        await _process_and_track(agent, _line("10:01:35 AM", "Kriti, can you coordinate with the library?"))
+        # Under the active topic a continuation without keywords still reaches the LLM; filler does not
+        await agent._process_transcript_line(_line("10:01:40 AM", "We should definitely ask about discounts for bulk purchases."))
+        await agent._process_transcript_line(_line("10:01:45 AM", "Okay, sounds good."))
+        return agent, context_agent
+
+    agent, context_agent = asyncio.run(run())
+    assert agent.skipped_lines == 2
+    assert len(agent.llm.backend.calls) == 3
+    assert "discounts for bulk purchases" in agent.llm.backend.calls[2]["messages"][-1]["content"]
+    assert context_agent.listen_in and context_agent.skipped_checks == 1
+    assert len(context_agent.llm.backend.calls) == 1
+
+
+def test_relevance_engine_decides_clear_cases_locally_and_caches_vectors(tmp_path):
+    with open("tests/sample_data/sample_minute_structure.json") as f:
+        minutes = Minutes.from_json(f.read())
+    with open("config/role_description.json") as f:
+        role_descriptions = json.load(f)
+    cache_path = str(tmp_path / "embeddings.npz")
+
+    class CountingEmbedder(HashingEmbedder):
+        def __init__(self):
+            super().__init__()
+            self.embedded = 0
+
+        async def embed(self, texts):
+            self.embedded += len(texts)
+            return await super().embed(texts)
+
+    async def run():
+        embedder = CountingEmbedder()
+        engine = RelevanceEngine(role_descriptions, minutes.agenda, embedder=embedder,
+                                 cache=EmbeddingCache(cache_path), low=0.1, high=0.3)
+        agent = ContextAgent("Adi", llm=_fake_llm(["Yes"]), roles=("Vice President",), relevance=engine)
+        assert await agent.should_listen_in(transcript="Great. Lastly, I had a call with EWOR.")
+        assert not await agent.should_listen_in(transcript="Welfare events: gelato bike options.")
+        # "Grants" scores in the uncertain band, so the LLM decides
+        assert await agent.should_listen_in(transcript="Grants – We need to sort out Easter term grants.")
+        assert len(agent.llm.backend.calls) == 1 and agent.skipped_checks == 2
+
+        # A second engine loads the role and agenda vectors from disk instead of embedding them again
+        other = CountingEmbedder()
+        reloaded = RelevanceEngine(role_descriptions, minutes.agenda, embedder=other, cache=EmbeddingCache(cache_path))
+        await reloaded.prepare()
+        assert other.embedded == 0
+        for role in role_descriptions:
+            assert (reloaded.role_vectors[role] == engine.role_vectors[role]).all()
+
+    asyncio.run(run())
+
+
+def test_relevance_service_answers_for_all_profiles_with_one_llm_call_per_scope():
+    with open("tests/sample_data/sample_minute_structure.json") as f:
+        minutes = Minutes.from_json(f.read())
+    with open("config/role_description.json") as f:
+        role_descriptions = json.load(f)
+    profiles = load_user_profiles()
+    assert len(profiles) == 9
+
+    async def run():
+        engine = RelevanceEngine(role_descriptions, minutes.agenda, low=0.1, high=0.3)
+        # The engine is unsure about the people on 2.1's relevance list; the LLM answers for all at once
+        llm = _fake_llm(['{"Rohan": true, "Adi": true, "Kriti": false}'])
+        service = RelevanceService(profiles, role_descriptions, llm=llm, engine=engine,
+                                   keyword_monitor=KeywordMonitor.from_files())
+        notified = []
+
+        async def record(name, relevant, scope_id):
+            notified.append((name, relevant, scope_id))
+
+        for profile in profiles:
+            service.subscribe(profile.name, record)
+
+        line = "First, the library budget 100 pounds allocated for student welfare. Harsh, can you check?"
+        scores = await engine.score_profiles(line, [(profile.name, profile.roles) for profile in profiles])
+        assert scores[1] == await engine.score(line, "Adi", ("Vice President",))
+        relevant = await service.on_scope("2.1", {"title": "Library Budget"}, line)
+        await service.on_scope("2.1", {"title": "Library Budget"}, "Sounds like a good idea.")
+        return service, relevant, notified, llm
+
+    service, relevant, notified, llm = asyncio.run(run())
+    assert len(llm.backend.calls) == 1 and llm.backend.calls[0]["temperature"] == 0
+    schema = llm.backend.calls[0]["response_format"]["json_schema"]["schema"]
+    assert schema["required"] == ["Rohan", "Adi", "Kriti"] and schema["properties"]["Adi"] == {"type": "boolean"}
+    assert "Attendees:\n- Rohan: President\n- Adi: Vice President\n- Kriti: Opportunities Director\n" in llm.backend.calls[0]["messages"][1]["content"]
+    assert {name for name, value in relevant.items() if value} == {"Rohan", "Adi", "Harsh"}
+    assert sorted(notified) == [("Adi", True, "2.1"), ("Harsh", True, "2.1"), ("Rohan", True, "2.1")]
+    assert service.stats["evaluations"] == 1 and service.stats["unchanged_scope"] == 1
+
+
+def test_context_window_debounces_checks_and_cancels_stale_ones():
+    async def run():
+        started, finished = [], []
+
+        async def check(topic_id, scope, lines):
+            started.append((topic_id, [line["message"] for line in lines]))
+            await asyncio.sleep(0.05)
+            finished.append(topic_id)
+
+        window = ContextWindow(check, every_lines=3, max_lines=4)
+        window.add_line("2.1", None, _line("10:01:00 AM", "a"))  # New topic: check starts
+        await asyncio.sleep(0)
+        window.add_line("2.2", None, _line("10:01:10 AM", "b"))  # Topic moved on: the 2.1 check is stale
+        await window.drain()
+        for i in range(6):
+            window.add_line("2.2", None, _line("10:02:00 AM", f"c{i}"))
+            await window.drain()
+        await window.close()
+        return window, started, finished
+
+    window, started, finished = asyncio.run(run())
+    # One check per topic change and one per 3 further lines on the same topic
+    assert started == [("2.1", ["a"]), ("2.2", ["b"]), ("2.2", ["b", "c0", "c1", "c2"]), ("2.2", ["c2", "c3", "c4", "c5"])]
+    assert finished == ["2.2", "2.2", "2.2"]
+    assert window.stats["cancelled"] == 1 and window.lines("2.2")[0]["message"] == "c2"
+
+
+def test_listen_in_checks_do_not_block_minutes_generation(tmp_path):
+    async def run():
+        updates = [json.dumps({"section": "2", "subsection": "2.1", "details": f"Point {i}"}) for i in range(3)]
+        context_llm = LLMService(backend=FakeBackend(lambda messages: "Yes", latency=0.2),
+                                 requests_per_minute=None, tokens_per_minute=None)
+        context_agent = ContextAgent("Adi", llm=context_llm)
+        agent = MinutesAgent(output_path=str(tmp_path / "minutes.json"), llm=_fake_llm(updates),
+                             context_agent=context_agent)
+        start = asyncio.get_running_loop().time()
+        for i in range(3):
+            await agent.update(_line(f"10:01:0{i} AM", f"Library budget point {i}."))
+        await agent.transcript_queue.join()
+        processed_after = asyncio.get_running_loop().time() - start
+        await agent.close()
+        agent.processing_task.cancel()
+        return agent, context_agent, processed_after
+
+    agent, context_agent, processed_after = asyncio.run(run())
+    assert processed_after < 0.2  # The slow listen-in check ran alongside, not inline
+    assert len(agent.get_minutes()["agenda"]["2"]["subsections"]["2.1"]["details"]) == 3
+    # Same topic throughout and fewer than 5 new lines: a single check
+    assert len(context_agent.llm.backend.calls) == 1 and context_agent.listen_in
+
+
+def test_minutes_updates_are_schema_constrained_streamed_and_repaired(tmp_path):
+    with open("tests/sample_data/sample_minute_structure.json") as f:
+        agenda = Minutes.from_json(f.read()).agenda
+    assert parse_update('```json\n{"section": "2", "subsection": "2.1", // budget\n "details": "Go board",}\n```', agenda) \
+        == {"section": "2", "subsection": "2.1", "details": "Go board"}
+    with pytest.raises(UpdateParseError):
+        parse_update('{"section": "2", "subsection": "3.1", "details": "Wrong section"}', agenda)
+
+    responses = [
+        '{"section": null, "subsection": null, "details": null}',
+        '{"section": "12", "subsection": null, "details": "Not on the agenda"}',
+        '{"section": "2", "subsection": "2.1", "details": "Budget approved"}',
+        'Sorry, I cannot help with that.',
+        'Still no JSON.',
+    ]
+
+    async def run():
+        llm = LLMService(backend=FakeBackend(list(responses), token_latency=0.001),
+                         requests_per_minute=None, tokens_per_minute=None)
+        agent = MinutesAgent(output_path=str(tmp_path / "minutes.json"), llm=llm)
+        agent.processing_task.cancel()
+        for i in range(3):
+            await agent._process_transcript_line(_line(f"10:01:0{i} AM", f"Library budget point {i}."))
+        return agent, llm
+
+    agent, llm = asyncio.run(run())
+    calls = llm.backend.calls
+    assert len(calls) == 5 and all(call["max_tokens"] == UPDATE_MAX_TOKENS for call in calls)
+    schema = calls[0]["response_format"]["json_schema"]["schema"]["properties"]
+    assert schema["section"]["enum"][:3] == ["1", "2", "3"] and "2.1" in schema["subsection"]["enum"]
+    # The null answer was cut off once '{"section": null' (4 tokens) had streamed
+    assert llm.stats["completion_tokens"] == 4 + sum(estimate_tokens(response) for response in responses[1:])
+    assert agent.get_minutes()["agenda"]["2"]["subsections"]["2.1"]["details"] == ["Budget approved"]
+    assert agent.parse_stats == {"null_updates": 1, "parse_failures": 3, "retries": 2, "dropped": 1}
+
+
+def test_update_response_format_fits_the_model_and_batch_answers_are_repaired(tmp_path):
+    with open("tests/sample_data/sample_minute_structure.json") as f:
+        schema = update_schema(Minutes.from_json(f.read()).agenda)
+    assert response_format_for(UPDATE_MODEL, schema) is schema
+    assert [(response_format_for(model, schema) or {}).get("type") for model in
+            ("gpt-4o-mini", "gpt-4o-2024-05-13", "gpt-3.5-turbo-1106", "gpt-4")] == \
+        ["json_schema", "json_object", "json_object", None]
+    assert schema["json_schema"]["schema"]["properties"]["section"]["type"] == ["string", "null"]
+
+    batch = json.dumps({"updates": [{"line": 0, "section": "2", "subsection": "2.1", "details": "Budget approved"}]})
+
+    async def run(model):
+        agent = MinutesAgent(batch_mode=True, output_path=str(tmp_path / f"{model}.json"), model=model,
+                             llm=_fake_llm(["No updates here.", batch]))
+        agent.processing_task.cancel()
+        updates = await agent.generate_agenda_batch_update_async(["Library budget approved."], agent.minutes)
+        return agent, updates
+
+    for model in (UPDATE_MODEL, "gpt-4"):
+        agent, updates = asyncio.run(run(model))
+        calls = agent.llm.backend.calls
+        assert updates == [{"section": "2", "subsection": "2.1", "details": "Budget approved", "line": 0}]
+        assert len(calls) == 2 and agent.parse_stats["retries"] == 1
+        assert all(call["model"] == model and call["temperature"] == 0 for call in calls)
+        # Without a schema the example is all the model sees, so it must be plain JSON
+        assert "//" not in calls[0]["messages"][-1]["content"]
+    # gpt-4 rejects any response_format, so it is left out rather than sent and refused with a 400
+    assert "response_format" not in calls[0]
+    assert asyncio.run(run(UPDATE_MODEL))[0].llm.backend.calls[0]["response_format"]["type"] == "json_schema"
+
+
+def test_pipelined_agent_commits_in_transcript_order_and_replays_stale_topic_moves(tmp_path):
+    class SlowEarlyBackend(FakeBackend):
+        """Earlier lines take longer, so results arrive out of order."""
+
+        async def complete(self, model, messages, *args, **kwargs):
+            index = int(re.search(r"Rohan: Point (\d)", messages[-1]["content"]).group(1))
+            await asyncio.sleep(0.01 * (8 - index))
+            return await super().complete(model, messages, *args, **kwargs)
+
+    def answer(messages):
+        index = int(re.search(r"Rohan: Point (\d)", messages[-1]["content"]).group(1))
+        subsection = "2.1" if index < 3 else "2.2"
+        return json.dumps({"section": "2", "subsection": subsection, "details": f"Point {index}"})
+
+    async def run():
+        llm = LLMService(backend=SlowEarlyBackend(answer), requests_per_minute=None, tokens_per_minute=None)
+        agent = MinutesAgent(output_path=str(tmp_path / "minutes.json"), llm=llm, pipeline_depth=4)
+        for i in range(8):
+            await agent.update(_line(f"10:01:0{i} AM", f"Point {i} on the library budget."))
+        await agent.close()
+        return agent, llm
+
+    agent, llm = asyncio.run(run())
+    subsections = agent.get_minutes()["agenda"]["2"]["subsections"]
+    assert subsections["2.1"]["details"] == ["Point 0", "Point 1", "Point 2"]
+    assert subsections["2.2"]["details"] == [f"Point {i}" for i in range(3, 8)]
+    # Line 3 moved the topic on a request sent before 2.1 was current, so it was asked again
+    assert agent.pipeline_stats == {"speculated": 8, "committed": 8, "conflicts": 1, "null_reasks": 0, "max_in_flight": 4}
+    assert len(llm.backend.calls) == 9
+    assert agent.get_current_topic_start_timestamp() == {"section": "2", "subsection": "2.2", "timestamp": "10:01:03 AM"}
+
+
+
+def test_pipelined_agent_only_replays_null_updates_that_may_continue_the_new_topic(tmp_path):
+    answers = {
+        "0": ('{"section": "2", "subsection": "2.1", "details": "Budget approved"}', 0.05),
+        # Names only another agenda item: no update whatever the current topic
+        "1": ('{"section": null, "subsection": null, "details": null}', 0.01),
+        # Names the topic the first line moves to, so it is asked again with that topic current
+        "2": ('{"section": null, "subsection": null, "details": null}', 0.01),
+    }
+
+    class DelayedBackend(FakeBackend):
+        async def complete(self, model, messages, *args, **kwargs):
+            await asyncio.sleep(answers[re.search(r"Rohan: Point (\d)", messages[-1]["content"]).group(1)][1])
+            return await super().complete(model, messages, *args, **kwargs)
+
+    def answer(messages):
+        return answers[re.search(r"Rohan: Point (\d)", messages[-1]["content"]).group(1)][0]
+
+    async def run():
+        llm = LLMService(backend=DelayedBackend(answer), requests_per_minute=None, tokens_per_minute=None)
+        agent = MinutesAgent(output_path=str(tmp_path / "minutes.json"), llm=llm, pipeline_depth=4,
+                             keyword_monitor=KeywordMonitor.from_files())
+        for i, message in enumerate(["Point 0: the library budget is approved.", "Point 1: grants can wait.",
+                                     "Point 2: library opening hours are a separate matter."]):
+            await agent.update(_line(f"10:01:0{i} AM", message))
+        await agent.close()
+        return agent, llm
+
+    agent, llm = asyncio.run(run())
+    assert agent.pipeline_stats == {"speculated": 3, "committed": 3, "conflicts": 0, "null_reasks": 1, "max_in_flight": 3}
+    assert len(llm.backend.calls) == 4
+    assert agent.get_minutes()["agenda"]["2"]["subsections"]["2.1"]["details"] == ["Budget approved"]
+
+class _WebhookStub:
+    """Local HTTP server standing in for a Discord webhook; answers from a list of (status, headers, body)."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []  # (time.monotonic(), JSON body)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/api/webhooks/1/token"
+
+    async def _handle(self, reader, writer):
+        while True:
+            try:
+                header = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+            length = int(re.search(rb"(?i)content-length: (\d+)", header).group(1))
+            self.requests.append((time.monotonic(), json.loads(await reader.readexactly(length))))
+            status, headers, body = self.responses.pop(0) if self.responses else (204, {}, b"")
+            lines = [f"HTTP/1.1 {status} X", f"Content-Length: {len(body)}", "Content-Type: application/json"]
+            lines += [f"{name}: {value}" for name, value in headers.items()]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+            await writer.drain()
+        writer.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def test_notify_agent_batches_dedupes_and_follows_discord_rate_limits():
+    async def run():
+        stub = _WebhookStub([
+            (429, {"Retry-After": "1"}, b'{"retry_after": 0.05, "global": false}'),
+            (204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.1"}, b""),
+        ])
+        agent = NotifyAgent(DiscordWebhook(await stub.start()), batch_window=0.02, cooldown=0.05)
+        await agent.on_relevance("Adi", True, "2.1")
+        await agent.on_relevance("Kriti", True, "2.1")
+        await agent.on_relevance("Adi", True, "2.1")  # Duplicate
+        await agent.on_relevance("Rohan", False, "2.1")
+        agent.notify("Adi", "asked about the budget")
+        await asyncio.sleep(0.2)
+        agent.notify("Kriti", "should listen in on 2.2", key="2.2")
+        await agent.close()
+        await stub.close()
+        return stub, agent
+
+    stub, agent = asyncio.run(run())
+    contents = [body["content"] for _, body in stub.requests]
+    # The burst went out as one message, retried once after the 429
+    assert contents == ["**Adi**: should listen in on 2.1; asked about the budget\n**Kriti**: should listen in on 2.1"] * 2 \
+        + ["**Kriti**: should listen in on 2.2"]
+    assert stub.requests[1][0] - stub.requests[0][0] >= 0.05
+    # The bucket was empty after the second request, so the third waited for its reset
+    assert stub.requests[2][0] - stub.requests[1][0] >= 0.1
+    assert agent.stats == {"notifications": 4, "deduped": 1, "messages": 2, "sent": 2, "retries": 1, "failed": 0}
+
+
+def test_topic_starts_record_line_indexes_for_chunking(tmp_path):
+    responses = ['{"section": "1", "subsection": null, "details": "Nothing arising"}',
+                 '{"section": "2", "subsection": "2.1", "details": "Budget agreed"}',
+                 '{"section": "2", "subsection": "2.2", "details": "Elections in May"}']
+
+    async def run():
+        processor = TranscriptProcessor()
+        agent = MinutesAgent(output_path=str(tmp_path / "minutes.json"), llm=_fake_llm(responses))
+        processor.register_observer(agent)
+        # Not zero-padded (the stored transcript reads "09:00:00 AM"), and two lines share a timestamp
+        for timestamp, message in (("9:00:00 AM", "Nothing arising."), ("9:00:00 AM", "Library budget agreed."),
+                                   ("9:00:05 AM", "Elections in May.")):
+            await processor.add_transcript_line(_line(timestamp, message))
+        await agent.close()
+        return processor, agent
+
+    processor, agent = asyncio.run(run())
+    assert [start["index"] for start in agent.topic_starts] == [0, 1, 2]
+    chunks = chunk_transcript(processor.get_full_transcript(), agent.topic_starts)
+    assert [(chunk.topic_id, [line["message"] for line in chunk.lines]) for chunk in chunks] == [
+        ("1", ["Nothing arising."]), ("2.1", ["Library budget agreed."]), ("2.2", ["Elections in May."])
+    ]
+
+
+def test_notify_agent_forgets_expired_dedupe_keys_and_labels_its_gauge():
+    class NullWebhook:
+        async def send(self, content):
+            pass
+
+        async def aclose(self):
+            pass
+
+    async def run():
+        telemetry = get_telemetry()
+        first = NotifyAgent(NullWebhook(), batch_window=0, dedupe_window=0.05, cooldown=0, name="first")
+        second = NotifyAgent(NullWebhook(), name="second")
+        assert ("notify_outbox_depth", (("agent", "first"),)) in telemetry.gauges
+        assert ("notify_outbox_depth", (("agent", "second"),)) in telemetry.gauges
+        for i in range(50):
+            first.notify("Adi", f"point {i}")
+        assert not first.notify("Adi", "point 0") and len(first.last_seen) == 50
+        await asyncio.sleep(0.06)
+        # Past the window: the old keys are dropped when the next notification is checked
+        assert first.notify("Adi", "point 0") and len(first.last_seen) == 1
+        await first.close()
+        await second.close()
+        return telemetry
+
+    telemetry = asyncio.run(run())
+    assert not any(name == "notify_outbox_depth" for name, _ in telemetry.gauges)
+
+
+def test_summary_agent_maps_chunks_concurrently_and_redoes_only_edited_chunks():
+    with open("tests/sample_data/sample_minute_structure.json") as f:
+        agenda = Minutes.from_json(f.read()).agenda
+    lines = [_line(f"10:{i // 60:02d}:{i % 60:02d} AM", f"Budget point {i} for the library and the next event.")
+             for i in range(40)]
+    topic_starts = [{"section": "2", "subsection": "2.1", "timestamp": "10:00:00 AM"},
+                    {"section": "3", "subsection": "3.1", "timestamp": "10:00:20 AM"}]
+
+    def answer(messages):
+        prompt = messages[-1]["content"]
+        if "Transcript excerpt" in prompt:
+            points = re.findall(r"Budget point (\d+)", prompt)
+            return f"Chunk {','.join(points)} ({zlib.crc32(prompt.encode())})"
+        return f"Merge ({zlib.crc32(prompt.encode())})"
+
+    llm = LLMService(backend=FakeBackend(answer, latency=0.01), max_concurrency=16,
+                     requests_per_minute=None, tokens_per_minute=None)
+    agent = SummaryAgent(llm=llm, max_concurrency=3, chunk_tokens=40)
+
+    chunks = chunk_transcript(lines, topic_starts, chunk_tokens=40)
+    assert [chunk.topic_id for chunk in chunks][0] == "2.1" and chunks[-1].topic_id == "3.1"
+    # Starts recorded with a line index do not depend on the timestamp text, which may not match the
+    # stored transcript's (e.g. "9:00:05 AM" vs "09:00:05 AM") or repeat on several lines
+    by_index = [{**start, "timestamp": "not a match", "index": index} for start, index in zip(topic_starts, (0, 20))]
+    assert [[line["message"] for line in chunk.lines] for chunk in chunk_transcript(lines, by_index, 40)] == \
+        [[line["message"] for line in chunk.lines] for chunk in chunks]
+    assert all(chunk.tokens <= 40 for chunk in chunks) and sum(len(chunk.lines) for chunk in chunks) == 40
+
+    first = asyncio.run(agent.summarise(lines, agenda, topic_starts))
+    requests = agent.stats["requests"]
+    assert [(topic["id"], topic["title"]) for topic in first["topics"]] == [("2.1", "Library Budget"), ("3.1", "Committee Work")]
+    # One request per chunk, plus the merges: per topic (fan-in 4, so two levels) and of the two topics
+    assert first["summary"].startswith("Merge") and requests > len(chunks) + 2
+    assert 1 < agent.stats["max_in_flight"] <= 3
+
+    # Unchanged transcript: everything comes from the cache
+    assert asyncio.run(agent.summarise(lines, agenda, topic_starts)) == first and agent.stats["requests"] == requests
+
+    # An edit in the second topic redoes its chunk and the merges above it, not the first topic
+    lines[30] = _line("10:00:30 AM", "Budget point 30 was moved to the next meeting.")
+    second = asyncio.run(agent.summarise(lines, agenda, topic_starts))
+    assert second["topics"][0] == first["topics"][0] and second["topics"][1] != first["topics"][1]
+    assert agent.stats["requests"] - requests <= 5 < requests
+
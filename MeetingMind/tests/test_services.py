@@ -0,0 +1,473 @@
+import asyncio
+import datetime
+import json
+import subprocess
+import sys
+import time
+import wave
+
+import pytest
+
+from src.agents.minutes_agent import MinutesAgent
+from src.services.cache_service import LLMResponseCache, make_cache_key
+from src.services.doc_writer_service import FakeDocsError, FakeDocsService, GoogleDocWriter, write_bullets
+from src.services.google_doc_service import generate_minutes_structure
+from src.services.listen_service import Hypothesis, ListenService, ScriptedEngine, read_hypotheses, wav_frames
+from src.services.llm_service import FairScheduler, FakeBackend, LLMError, LLMService, TokenBucket, parse_retry_after
+from src.services.meeting_manager import MeetingManager
+from src.services.telemetry_service import MetricsServer, Telemetry, TraceWriter, get_telemetry, set_telemetry
+from src.transcript.clock import ScaledClock, VirtualClock
+from src.transcript.processor import TranscriptProcessor
+
+
+def _service(backend, **kwargs):
+    kwargs.setdefault("requests_per_minute", None)
+    kwargs.setdefault("tokens_per_minute", None)
+    return LLMService(backend=backend, **kwargs)
+
+
+def test_llm_service_retries_rate_limits_and_server_errors():
+    backend = FakeBackend(lambda messages: " Yes ", failures=[429, 503])
+    llm = _service(backend, base_delay=0.001)
+
+    content = asyncio.run(llm.chat([{"role": "user", "content": "Hello"}]))
+
+    assert content == "Yes"
+    assert len(backend.calls) == 3
+    assert llm.stats["retries"] == 2
+
+
+def test_llm_service_does_not_retry_client_errors():
+    backend = FakeBackend(lambda messages: "", failures=[400])
+    llm = _service(backend, base_delay=0.001)
+
+    with pytest.raises(LLMError):
+        asyncio.run(llm.chat([{"role": "user", "content": "Hello"}]))
+    assert len(backend.calls) == 1
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("2.5") == 2.5 and parse_retry_after(None) is None
+    in_a_minute = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+    assert 55 < parse_retry_after(in_a_minute.strftime("%a, %d %b %Y %H:%M:%S GMT")) <= 60
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_llm_service_caps_concurrent_requests():
+    in_flight = 0
+    peak = 0
+
+    class TrackingBackend(FakeBackend):
+        async def complete(self, *args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await super().complete(*args, **kwargs)
+            finally:
+                in_flight -= 1
+
+    async def run():
+        llm = _service(TrackingBackend(latency=0.01), max_concurrency=2)
+        await asyncio.gather(*(llm.chat([{"role": "user", "content": str(i)}]) for i in range(8)))
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_token_bucket_waits_for_refill():
+    async def run():
+        bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 10 tokens per second
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.18
+
+
+def test_llm_service_answers_repeated_requests_from_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    messages = [{"role": "user", "content": "Summarise"}]
+
+    async def run(cache):
+        backend = FakeBackend(lambda messages: "Summary")
+        llm = _service(backend, cache=cache)
+        first = await llm.chat(messages)
+        second = await llm.chat(messages)
+        await llm.aclose()
+        return backend, first, second
+
+    backend, first, second = asyncio.run(run(LLMResponseCache(path)))
+    assert first == second == "Summary"
+    assert len(backend.calls) == 1
+
+    # A fresh process only has the on-disk tier
+    cache = LLMResponseCache(path)
+    backend, _, _ = asyncio.run(run(cache))
+    assert len(backend.calls) == 0
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_response_cache_evicts_least_recently_used_and_honours_bypass():
+    async def run():
+        cache = LLMResponseCache(max_memory_entries=2)
+        await cache.set("a", {"content": "A"})
+        await cache.set("b", {"content": "B"})
+        await cache.get("a")
+        await cache.set("c", {"content": "C"})
+        evicted = await cache.get("b")
+
+        cache.bypass = True
+        bypassed = await cache.get("a")
+        return cache, evicted, bypassed
+
+    cache, evicted, bypassed = asyncio.run(run())
+    assert evicted is None and bypassed is None
+    assert cache.stats["evictions"] == 1
+    assert set(cache.memory) == {"a", "c"}
+
+
+def test_cache_key_depends_on_sampling_parameters():
+    messages = [{"role": "user", "content": "Hi"}]
+    assert make_cache_key("gpt-4", messages, 0.7, 300) == make_cache_key("gpt-4", messages, 0.7, 300)
+    assert make_cache_key("gpt-4", messages, 0.7, 300) != make_cache_key("gpt-4", messages, 0.2, 300)
+    assert make_cache_key("gpt-4", messages, 0.7, 300) != make_cache_key("gpt-4", messages, 0.7, 50)
+
+
+TEMPLATE = [
+    "Meeting Minutes\n",
+    "### **1. Matters Arising**\n",
+    "### **2. President's Update**\n",
+    "#### 2.1 Library Budget\n",
+    "- Existing point\n",
+    "#### 2.2 Elections\n",
+    "### **3. Other Business**\n",
+]
+
+
+def test_doc_writer_coalesces_details_into_one_batch_update():
+    docs = FakeDocsService(TEMPLATE)
+    writer = GoogleDocWriter("doc", service=docs)
+
+    async def run():
+        writer.append_detail("2.1", "Go board 🎉")
+        writer.append_detail("1.", "Nothing major")
+        writer.append_detail("2.1", "Board games")
+        await writer.flush()
+        writer.append_detail("2.2", "Elections in May")
+        writer.append_detail("2.1", "Budget approved")
+        writer.append_detail("9.9", "Unknown section")
+        await writer.close()
+
+    asyncio.run(run())
+    assert docs.text() == "".join([
+        "Meeting Minutes\n",
+        "### **1. Matters Arising**\n",
+        "- Nothing major\n",
+        "### **2. President's Update**\n",
+        "#### 2.1 Library Budget\n",
+        "- Existing point\n",
+        "- Go board 🎉\n",
+        "- Board games\n",
+        "- Budget approved\n",
+        "#### 2.2 Elections\n",
+        "- Elections in May\n",
+        "### **3. Other Business**\n",
+    ])
+    assert docs.calls == {"get": 1, "batchUpdate": 2}
+    assert writer.stats["dropped"] == 1
+
+
+def test_doc_writer_rebuilds_section_index_only_after_external_edits():
+    docs = FakeDocsService(TEMPLATE)
+    writer = GoogleDocWriter("doc", service=docs)
+
+    async def run():
+        writer.append_detail("2.2", "First")
+        await writer.flush()
+        writer.append_detail("2.2", "Second")
+        await writer.flush()
+        # Someone else adds a paragraph above our sections
+        docs.edit(1, "Note from the secretary\n")
+        writer.append_detail("2.2", "Third")
+        writer.append_detail("3", "Any other business")
+        await writer.flush()
+
+    asyncio.run(run())
+    assert docs.text().endswith("#### 2.2 Elections\n- First\n- Second\n- Third\n"
+                                "### **3. Other Business**\n- Any other business\n")
+    assert docs.text().startswith("Note from the secretary\n")
+    assert writer.stats["index_builds"] == 2
+    # The stale write was rejected once and retried against the rebuilt index
+    assert docs.calls == {"get": 2, "batchUpdate": 4}
+
+
+def test_doc_writer_only_refetches_on_revision_conflicts():
+    class RejectingDocs(FakeDocsService):
+        def batchUpdate(self, documentId, body):
+            self.calls["batchUpdate"] += 1
+            raise FakeDocsError(400, "Invalid requests[0].insertText: Index 999 must be less than the end index")
+
+    docs = RejectingDocs(TEMPLATE)
+    with pytest.raises(FakeDocsError):
+        write_bullets(docs, "doc", None, [("2.2", "Elections in May")])
+    # A plain 400 is not a stale revision: no second documents().get and no resend
+    assert docs.calls == {"get": 1, "batchUpdate": 1}
+
+
+def test_doc_writer_gives_up_on_failed_writes_and_closes_cleanly():
+    class FailingDocs(FakeDocsService):
+        def __init__(self, errors):
+            super().__init__(TEMPLATE)
+            self.errors = list(errors)
+
+        def batchUpdate(self, documentId, body):
+            if self.errors:
+                self.calls["batchUpdate"] += 1
+                raise self.errors.pop(0)
+            return super().batchUpdate(documentId, body)
+
+    async def run(errors, flushes):
+        docs = FailingDocs(errors)
+        writer = GoogleDocWriter("doc", service=docs, max_attempts=3)
+        writer.append_detail("2.2", "Elections in May")
+        for _ in range(flushes):
+            try:
+                await writer.flush()
+            except FakeDocsError:
+                pass
+        await writer.close()
+        return docs, writer
+
+    # A server error is retried on the next flush
+    docs, writer = asyncio.run(run([FakeDocsError(503, "Unavailable")], 2))
+    assert docs.text().endswith("#### 2.2 Elections\n- Elections in May\n### **3. Other Business**\n")
+    assert writer.stats["failed"] == 0
+
+    # Permanent errors drop the batch at once; persistent server errors after max_attempts flushes
+    for errors in ([FileNotFoundError("credentials.json")], [FakeDocsError(403, "Forbidden")],
+                   [FakeDocsError(503, "Unavailable")] * 5):
+        docs, writer = asyncio.run(run(errors, 5))
+        assert writer.pending == [] and writer.stats["failed"] == 1
+        assert docs.calls["batchUpdate"] == (3 if len(errors) == 5 else 1)
+
+    # close() logs a final failure instead of raising
+    docs, writer = asyncio.run(run([FakeDocsError(503, "Unavailable")], 0))
+    assert writer.pending == [] and writer.stats["failed"] == 1
+
+
+def test_minutes_structure_is_parsed_locally_and_cached_by_revision(tmp_path):
+    docs = FakeDocsService(["**Date:** 8 March 2025\n", "Time: 6:00 PM\n", "Attendees: Rohan, Adi and Mia\n",
+                            "Apologies:\n", "- Sam\n", *TEMPLATE])
+    backend = FakeBackend(lambda messages: '{"agenda": {"1": {"title": "From the LLM", "details": ""}}}')
+    llm = LLMService(backend=backend)
+    cache_path = tmp_path / "structures.json"
+
+    def generate(service):
+        return asyncio.run(generate_minutes_structure("doc", service=service, cache_path=cache_path, llm=llm))
+
+    structure = generate(docs)
+    assert structure == {
+        "date": "8 March 2025", "time": "6:00 PM", "attendees": ["Rohan", "Adi", "Mia"], "absences": ["Sam"],
+        "agenda": {
+            "1": {"title": "Matters Arising", "details": ""},
+            "2": {"title": "President's Update", "subsections": {
+                "2.1": {"title": "Library Budget", "details": ""},
+                "2.2": {"title": "Elections", "details": ""},
+            }},
+            "3": {"title": "Other Business", "details": ""},
+        },
+        "nextMeeting": "",
+    }
+    assert backend.calls == [] and docs.calls["get"] == 2
+
+    # Unchanged revision: only the revision id is fetched
+    assert generate(docs) == structure
+    assert docs.calls["get"] == 3
+
+    docs.edit(len(docs.text()) + 1, "### **4. Close**\n")
+    assert generate(docs)["agenda"]["4"] == {"title": "Close", "details": ""}
+    assert docs.calls["get"] == 5
+
+    # A document without the heading convention falls back to the LLM
+    other = FakeDocsService(["Agenda\n", "1. Welcome\n"])
+    assert generate(other)["agenda"] == {"1": {"title": "From the LLM", "details": ""}}
+    assert len(backend.calls) == 1
+
+
+def test_fair_scheduler_admits_tenants_round_robin():
+    async def run():
+        scheduler = FairScheduler(max_concurrency=1)
+        order = []
+
+        async def request(tenant, i):
+            async with scheduler.slot(tenant):
+                order.append(f"{tenant}{i}")
+                await asyncio.sleep(0.001)
+
+        # Meeting a queues its whole backlog before b and c arrive
+        await scheduler.acquire("x")
+        tasks = [asyncio.create_task(request("a", i)) for i in range(3)]
+        tasks += [asyncio.create_task(request(tenant, 0)) for tenant in "bc"]
+        await asyncio.sleep(0)
+        scheduler.release("x")
+        await asyncio.gather(*tasks)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(run())
+    assert order == ["a0", "b0", "c0", "a1", "a2"]
+    assert scheduler.available == 1 and not scheduler.running and not scheduler.waiters
+
+
+def test_meeting_manager_runs_sessions_concurrently_and_stops_cleanly(tmp_path):
+    response = '{"section": "2", "subsection": "2.1", "details": "Budget point."}'
+
+    async def run():
+        llm = _service(FakeBackend(lambda messages: response, latency=0.001))
+        manager = MeetingManager(llm=llm, max_concurrency=2, output_dir=str(tmp_path),
+                                 agent_options={"snapshot_interval": 0.01})
+        await manager.start_session("a", "tests/sample_data/sample_transcript.json",
+                                    clock=VirtualClock(), time_limit_seconds=120)
+        long_session = await manager.start_session("b", "tests/sample_data/sample_transcript.json",
+                                                    clock=ScaledClock(speed=50))
+        await manager.wait("a")
+        await asyncio.sleep(0.3)
+        await manager.shutdown()
+        return manager, long_session
+
+    manager, long_session = asyncio.run(run())
+    sessions = {info["session_id"]: info for info in manager.list_sessions()}
+    assert sessions["a"]["status"] == "finished" and sessions["b"]["status"] == "stopped"
+    # Every line handed to an agent was turned into minutes before its worker was cancelled
+    assert sessions["a"]["lines"] == 8 and sessions["a"]["queued"] == 0
+    assert 0 < sessions["b"]["lines"] < 30 and sessions["b"]["queued"] == 0
+    assert long_session.agent.processing_task.cancelled()
+    assert sessions["a"]["llm_requests"] == 8 and sessions["a"]["latency_p99"] is not None
+    with open(tmp_path / "a_minutes.json") as f:
+        assert len(json.load(f)["agenda"]["2"]["subsections"]["2.1"]["details"]) == 8
+    assert (tmp_path / "b_transcript.json").exists()
+    assert manager.latency_report()["p50"] is not None
+
+
+def test_meeting_manager_sessions_get_their_own_template_and_share_the_docs_client_under_a_lock(tmp_path):
+    docs = FakeDocsService(TEMPLATE)
+    structure = {"agenda": {"1": {"title": "Treasurer's Report", "details": ""}}}
+    response = '{"section": "1", "subsection": null, "details": "Accounts balanced."}'
+
+    async def run():
+        manager = MeetingManager(llm=_service(FakeBackend(lambda messages: response)), docs_service=docs,
+                                 output_dir=str(tmp_path), agent_options={"snapshot_interval": 0.01})
+        custom = await manager.start_session("custom", "tests/sample_data/sample_transcript.json",
+                                             google_doc_id="doc", clock=VirtualClock(), time_limit_seconds=30,
+                                             minutes_structure=structure)
+        default = await manager.start_session("default", "tests/sample_data/sample_transcript.json",
+                                              google_doc_id="doc", clock=VirtualClock(), time_limit_seconds=30)
+        await manager.wait_all()
+        return manager, custom, default
+
+    manager, custom, default = asyncio.run(run())
+    assert list(custom.agent.get_minutes()["agenda"]) == ["1"]
+    assert custom.agent.get_minutes()["agenda"]["1"]["title"] == "Treasurer's Report"
+    assert len(default.agent.get_minutes()["agenda"]) > 1
+    for session in (custom, default):
+        assert session.agent.doc_writer.service is docs and session.agent.doc_writer.service_lock is manager.docs_lock
+    details = custom.agent.get_minutes()["agenda"]["1"]["details"]
+    assert details and docs.text().count("- Accounts balanced.\n") == 2 * len(details)
+
+
+def test_listen_service_streams_only_final_utterances_from_a_wav(tmp_path):
+    path = str(tmp_path / "meeting.wav")
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x01\x00" * 16000 * 3)
+    script = [(1.0, "The library budget was approved"), (2.5, "Elections are next week")]
+
+    async def run():
+        processor = TranscriptProcessor()
+        processor.start_time = datetime.datetime(2025, 3, 8, 10, 0, 0)
+        listener = ListenService(ScriptedEngine(script, bytes_per_second=32000), buffer_seconds=1, speaker="Rohan")
+        await listener.run(processor, frames=wav_frames(path))
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'{"text": "Ele", "final": false}\nnot json\n{"text": "Elections", "final": true, "speaker": "Adi"}\n')
+        reader.feed_eof()
+        finals = [hypothesis async for hypothesis in listener.utterances(read_hypotheses(reader))]
+        return processor, listener, finals
+
+    processor, listener, finals = asyncio.run(run())
+    assert list(processor.transcript) == [
+        {"timestamp": "10:00:01 AM", "speaker": "Rohan", "message": "The library budget was approved"},
+        {"timestamp": "10:00:02 AM", "speaker": "Rohan", "message": "Elections are next week"},
+    ]
+    assert listener.stats["frames"] == 150 and listener.stats["partials"] > 10 and listener.stats["finals"] == 3
+    # Only the last second of audio is kept
+    assert len(listener.audio.buffer) == 32000 and listener.audio.total == 96000
+    assert listener.utterance_audio(Hypothesis("", start=0.0, end=1.0)) is None
+    assert listener.utterance_audio(Hypothesis("", start=2.5, end=3.0)) == b"\x01\x00" * 8000
+    assert [(h.text, h.speaker) for h in finals] == [("Elections", "Adi")]
+
+
+def test_telemetry_traces_lines_end_to_end_and_serves_prometheus_text(tmp_path):
+    answer = json.dumps({"section": "2", "subsection": "2.1", "details": "Library budget approved"})
+    trace_path = str(tmp_path / "trace.json")
+
+    async def scrape(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = (await reader.read()).decode()
+        writer.close()
+        return response
+
+    async def run():
+        telemetry = Telemetry()
+        previous = get_telemetry()
+        set_telemetry(telemetry)
+        try:
+            writer = TraceWriter(telemetry, trace_path, interval=0.01)
+            writer.start()
+            server = MetricsServer(telemetry, port=0)
+            await server.start()
+            processor = TranscriptProcessor()
+            llm = _service(FakeBackend(lambda messages: answer, latency=0.01))
+            agent = MinutesAgent(output_path=str(tmp_path / "minutes.json"), llm=llm,
+                                 doc_writer=GoogleDocWriter("doc", service=FakeDocsService()))
+            processor.register_observer(agent)
+            for i in range(3):
+                await processor.add_transcript_line({"timestamp": f"10:00:0{i} AM", "speaker": "Rohan",
+                                                     "message": f"The library budget, point {i}."})
+            await agent.drain()
+            response = await scrape(server.port)
+            await agent.close()
+            await server.close()
+            await writer.close()
+            return telemetry, response
+        finally:
+            set_telemetry(previous)
+
+    telemetry, response = asyncio.run(run())
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "meetingmind_transcript_lines_total 3" in response
+    assert 'meetingmind_llm_requests_total{model="gpt-4o"} 3' in response
+    assert "meetingmind_llm_prompt_tokens_total" in response and "meetingmind_line_latency_seconds_count 3" in response
+    assert 'meetingmind_minutes_queue_depth{agent="MinutesAgent"} 0' in response
+    assert 'meetingmind_span_duration_seconds_bucket{span="llm.call",le="+Inf"} 3' in response
+
+    with open(trace_path) as f:
+        events = [event for event in json.load(f) if event["ph"] == "X"]
+    # Every stage of the first line is in its trace, and the spans nest in time
+    first = {event["name"]: event for event in events if event["args"]["trace"] == 1}
+    assert {"transcript.add_line", "minutes.queue_wait", "minutes.process", "llm.call",
+            "minutes.update_structure"} <= set(first)
+    assert first["minutes.process"]["ts"] <= first["llm.call"]["ts"] and \
+        first["llm.call"]["dur"] <= first["minutes.process"]["dur"]
+    assert any(event["name"] == "docs.write" for event in events)
+
+
+def test_importing_main_defers_heavy_dependencies():
+    check = "import sys, main; print(sorted({'numpy', 'openai', 'googleapiclient'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
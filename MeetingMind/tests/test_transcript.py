@@ -0,0 +1,239 @@
+import asyncio
+import datetime
+import json
+import time
+
+from src.transcript.clock import ScaledClock, VirtualClock
+from src.transcript.dispatch import COALESCE, DROP_OLDEST
+from src.transcript.processor import TranscriptProcessor, line_offsets
+
+
+def _line(i):
+    return {"timestamp": f"10:00:{i:02d} AM", "speaker": "Rohan", "message": f"Line {i}"}
+
+
+class RecordingObserver:
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.lines = []
+
+    async def update(self, transcript_line):
+        await asyncio.sleep(self.delay)
+        self.lines.append(transcript_line["message"])
+
+
+class SlowSyncObserver:
+    name = "SlowSync"
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lines = []
+
+    def update(self, transcript_line):
+        time.sleep(self.delay)
+        self.lines.append(transcript_line["message"])
+
+
+def test_fanout_keeps_slow_observers_from_blocking_others():
+    async def run():
+        processor = TranscriptProcessor(fanout=True)
+        fast = RecordingObserver("Fast")
+        slow = SlowSyncObserver(delay=0.05)
+        processor.register_observer(fast)
+        processor.register_observer(slow)
+
+        start = time.perf_counter()
+        for i in range(5):
+            await processor.add_transcript_line(_line(i))
+        ingest_seconds = time.perf_counter() - start
+        await processor.drain_observers()
+        stats = processor.get_observer_stats()
+        await processor.close()
+        return fast, slow, ingest_seconds, stats
+
+    fast, slow, ingest_seconds, stats = asyncio.run(run())
+    assert ingest_seconds < 0.05
+    assert fast.lines == slow.lines == [f"Line {i}" for i in range(5)]
+    assert stats["SlowSync"]["delivered"] == 5
+    assert stats["SlowSync"]["latency_max"] >= 0.05 * 5
+
+
+def test_fanout_backpressure_policies_and_timeouts():
+    async def run():
+        processor = TranscriptProcessor(fanout=True)
+        dropping = RecordingObserver("Dropping", delay=0.02)
+        coalescing = RecordingObserver("Coalescing", delay=0.02)
+        timing_out = RecordingObserver("TimingOut", delay=1.0)
+        processor.register_observer(dropping, policy=DROP_OLDEST, max_pending=2)
+        processor.register_observer(coalescing, policy=COALESCE, max_pending=2)
+        processor.register_observer(timing_out, max_pending=10, timeout=0.01)
+
+        for i in range(6):
+            await processor.add_transcript_line(_line(i))
+        await processor.drain_observers()
+        stats = processor.get_observer_stats()
+        await processor.close()
+        return dropping, coalescing, stats
+
+    dropping, coalescing, stats = asyncio.run(run())
+    # The first line is already being delivered when the rest arrive
+    assert dropping.lines == ["Line 0", "Line 4", "Line 5"]
+    assert coalescing.lines == ["Line 0", "Line 5"]
+    assert stats["Dropping"]["dropped"] == 3
+    assert stats["Coalescing"]["dropped"] == 4
+    assert stats["TimingOut"]["timeouts"] == 6
+
+
+def test_transcript_is_appended_to_log_and_compacted(tmp_path):
+    output_path = str(tmp_path / "transcript.json")
+
+    async def run():
+        processor = TranscriptProcessor(transcript_file_path=output_path, compact_every=3)
+        for i in range(4):
+            await processor.add_transcript_line(_line(i))
+        await processor.transcript_log.flush()
+        await processor.compaction_task
+        with open(output_path) as f:
+            compacted_early = json.load(f)
+        await processor.close()
+        return processor, compacted_early
+
+    processor, compacted_early = asyncio.run(run())
+    assert len(compacted_early["meeting"]["minutes"]) == 3
+
+    with open(output_path) as f:
+        meeting = json.load(f)["meeting"]
+    assert meeting["minutes"] == [_line(i) for i in range(4)]
+
+    reader = TranscriptProcessor()
+    lines = reader.load_transcript_log(str(tmp_path / "transcript.jsonl"))
+    assert list(lines) == [_line(i) for i in range(4)]
+    assert reader.start_time == processor.start_time
+
+
+
+def test_line_added_after_close_is_appended_to_log(tmp_path):
+    output_path = str(tmp_path / "transcript.json")
+
+    async def run():
+        processor = TranscriptProcessor(transcript_file_path=output_path)
+        for i in range(2):
+            await processor.add_transcript_line(_line(i))
+        await processor.close()
+        await processor.add_transcript_line(_line(2))
+        await processor.close()
+
+    asyncio.run(run())
+    with open(tmp_path / "transcript.jsonl") as f:
+        records = [json.loads(raw) for raw in f]
+    # One header, then every line, including the ones written before the first close
+    assert "meeting" in records[0] and records[1:] == [_line(i) for i in range(3)]
+    with open(output_path) as f:
+        assert json.load(f)["meeting"]["minutes"] == [_line(i) for i in range(3)]
+
+class QueueingObserver:
+    """Queues lines and handles them in a background task, like MinutesAgent."""
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.lines = []
+        self.worker = None
+
+    async def update(self, transcript_line):
+        if self.worker is None:
+            self.worker = asyncio.create_task(self._run())
+        await self.queue.put(transcript_line)
+
+    async def _run(self):
+        while True:
+            line = await self.queue.get()
+            await asyncio.sleep(0.001)
+            self.lines.append(line["timestamp"])
+            self.queue.task_done()
+
+    async def drain(self):
+        await self.queue.join()
+
+
+def test_virtual_clock_replays_instantly_and_drains_observers():
+    async def run():
+        processor = TranscriptProcessor(clock=VirtualClock())
+        observer = QueueingObserver()
+        processor.register_observer(observer)
+        start = time.perf_counter()
+        await processor.simulate_meeting("tests/sample_data/sample_transcript.json", time_limit_seconds=120)
+        elapsed = time.perf_counter() - start
+        observer.worker.cancel()
+        return processor, observer, elapsed
+
+    processor, observer, elapsed = asyncio.run(run())
+    # Every line within the first two minutes, all processed by the time simulate_meeting returns
+    assert elapsed < 1.0
+    assert observer.lines == [line["timestamp"] for line in processor.transcript]
+    assert observer.lines[-1] == "10:01:55 AM"
+    assert processor.stream_ended.is_set() and processor.clock.now() == 115
+
+
+def test_scaled_clock_and_preparsed_offsets():
+    lines = [{"timestamp": t} for t in ("11:59:50 PM", "11:59:59 PM", "12:00:04 AM")]
+    start = datetime.datetime(2025, 3, 8, 23, 59, 40)
+    assert line_offsets(lines, start) == [10.0, 19.0, 24.0]
+    # A line out of order by a second is clamped, not moved to the next day
+    lines = [{"timestamp": t} for t in ("10:00:05 AM", "10:00:15 AM", "10:00:14 AM", "10:00:20 AM")]
+    assert line_offsets(lines, datetime.datetime(2025, 3, 8, 10, 0, 0)) == [5.0, 15.0, 15.0, 20.0]
+
+    async def run():
+        processor = TranscriptProcessor(clock=ScaledClock(speed=200))
+        start = time.perf_counter()
+        await processor.simulate_meeting("tests/sample_data/sample_transcript.json", time_limit_seconds=60)
+        return processor, time.perf_counter() - start
+
+    processor, elapsed = asyncio.run(run())
+    # 60 seconds of meeting at 200x
+    assert len(processor.transcript) == 4
+    assert 0.3 <= elapsed < 1.0
+
+
+def test_transcript_store_queries():
+    async def run():
+        processor = TranscriptProcessor()
+        processor.start_time = datetime.datetime(2025, 3, 8, 23, 59, 0)
+        for i, (timestamp, speaker) in enumerate([("11:59:10 PM", "Rohan"), ("11:59:40 PM", "Adi"),
+                                                  ("11:59:50 PM", "Rohan"), ("12:00:05 AM", "Adi"),
+                                                  ("12:00:20 AM", "Rohan")]):
+            await processor.add_transcript_line({"timestamp": timestamp, "speaker": speaker, "message": f"Line {i}"})
+        return processor
+
+    processor = asyncio.run(run())
+    store = processor.transcript
+    # Past midnight the offsets keep increasing, and speakers are interned
+    assert list(store.offsets) == [10000, 40000, 50000, 65000, 80000]
+    assert store.speakers == ["Rohan", "Adi"] and list(store.speaker_ids) == [0, 1, 0, 1, 0]
+    assert store.line(3).offset == 65000 and store[3] == {"timestamp": "12:00:05 AM", "speaker": "Adi", "message": "Line 3"}
+    assert [line["message"] for line in processor.lines_since("11:59:50 PM")] == ["Line 2", "Line 3", "Line 4"]
+    assert [line["message"] for line in processor.lines_between(40, 65)] == ["Line 1", "Line 2"]
+    assert [line["message"] for line in processor.lines_by_speaker("Rohan", start_seconds=30)] == ["Line 2", "Line 4"]
+    assert processor.lines_by_speaker("Kriti") == [] and processor.lines_since("12:01:00 AM") == []
+    assert processor.get_full_transcript()[-1]["timestamp"] == "12:00:20 AM"
+    assert store.timestamp_overrides == {} and store.extras == {}
+
+
+def test_transcript_store_returns_lines_as_appended():
+    async def run():
+        processor = TranscriptProcessor()
+        processor.start_time = datetime.datetime(2025, 3, 8, 9, 0, 0)
+        lines = [{"timestamp": "9:00:05 AM", "speaker": "Rohan", "message": "Not zero-padded"},
+                 {"timestamp": "09:00:15 AM", "speaker": "Adi", "message": "In order", "confidence": 0.9},
+                 {"timestamp": "09:00:14 AM", "speaker": "Rohan", "message": "One second out of order"},
+                 {"timestamp": "09:00:20 AM", "speaker": "Adi", "message": "In order again"}]
+        for line in lines:
+            await processor.add_transcript_line(dict(line))
+        return processor, lines
+
+    processor, lines = asyncio.run(run())
+    # The saved transcript is built from this, so nothing is rewritten or dropped
+    assert processor.get_full_transcript() == lines
+    # Queries use the clamped offset: the out-of-order line sorts with the one before it
+    assert list(processor.transcript.offsets) == [5000, 15000, 15000, 20000]
+    assert [line["message"] for line in processor.lines_between(15, 16)] == ["In order", "One second out of order"]